@@ -0,0 +1,230 @@
+"""Alpha-Beta-Spieler mit iterativer Vertiefung für 2 Spieler.
+
+Die Suche bleibt innerhalb der laufenden Runde (dort gibt es keinen Zufall) und
+bewertet Blätter mit einer austauschbaren Bewertungsfunktion evaluate(game, player).
+Zugsortierung: Zug aus der Transpositionstabelle, Killerzüge der Tiefe, dann
+endgame.order_moves (passende Musterreihen zuerst, Bodenreihe zuletzt). Ab Tiefe 2
+wird mit einem Aspirationsfenster um den Wert der Vortiefe gesucht.
+
+Die Suche endet spätestens nach time_limit Sekunden und liefert den besten Zug der
+letzten vollständig durchsuchten Tiefe; Tiefe 1 wird immer abgeschlossen.
+"""
+import time
+from typing import Callable, List, Optional
+
+from endgame import order_moves
+from engine import (COL_MASKS, COLOR_MASKS, FLOOR_PENALTY_TOTAL, ROW_MASKS, AzulGame, GamePhase, Move,
+                    wall_tile_score)
+from transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+Evaluation = Callable[[AzulGame, int], float]
+
+_INF = float("inf")
+# Tiefe für Einträge, deren Teilbaum bis zum Rundenende durchsucht wurde
+_COMPLETE = 255
+_BONUS_MASKS = tuple((mask, 2) for mask in ROW_MASKS) + tuple((mask, 7) for mask in COL_MASKS) \
+	+ tuple((mask, 10) for mask in COLOR_MASKS)
+
+
+class ProjectedEvaluation:
+	"""Bewertung einer Spielerablage nach der anstehenden Fliesungsphase
+
+	Wert = Punkte
+	     + tile_weight    * Punkte der vollständigen Musterreihen (wie _calculate_tile_score)
+	     + floor_weight   * Minuspunkte der Bodenreihe inkl. Startspielermarker
+	     + pending_weight * Füllstand x Punkte der unvollständigen Musterreihen
+	     + bonus_weight   * Fortschritt bei Reihen, Spalten und Farben ((Anzahl / 5)^2 x Bonus)
+	evaluate(game, player) ist die Differenz zum besten Gegner.
+	"""
+
+	def __init__(self, tile_weight: float = 1.0, floor_weight: float = 1.0,
+	             pending_weight: float = 0.5, bonus_weight: float = 0.5):
+		self.tile_weight = tile_weight
+		self.floor_weight = floor_weight
+		self.pending_weight = pending_weight
+		self.bonus_weight = bonus_weight
+
+	def board_value(self, board) -> float:
+		bits = board.wall_bits
+		gains = pending = 0.0
+		for i in range(5):
+			count = board.line_counts[i]
+			if not count:
+				continue
+			col = (i + board.line_colors[i]) % 5
+			if count == i + 1:
+				bits |= 1 << (i * 5 + col)
+				gains += wall_tile_score(bits, i, col)
+			else:
+				pending += count / (i + 1) * wall_tile_score(bits | 1 << (i * 5 + col), i, col)
+		floor = FLOOR_PENALTY_TOTAL[min(board.floor_count, 7)] - board.has_first_player_marker
+
+		progress = 0.0
+		for mask, bonus in _BONUS_MASKS:
+			filled = bin(bits & mask).count("1")
+			progress += filled * filled / 25 * bonus
+
+		return (board.score + self.tile_weight * gains + self.floor_weight * floor
+		        + self.pending_weight * pending + self.bonus_weight * progress)
+
+	def __call__(self, game: AzulGame, player: int) -> float:
+		if game.phase == GamePhase.GAME_END:
+			scores = [p.score for p in game.players]
+		else:
+			scores = [self.board_value(p) for p in game.players]
+		return scores[player] - max(s for i, s in enumerate(scores) if i != player)
+
+
+class _Timeout(Exception):
+	pass
+
+
+class SearchInfo:
+	"""Kennzahlen des letzten Zugs"""
+
+	def __init__(self, depth: int = 0, value: float = 0.0, nodes: int = 0, elapsed: float = 0.0):
+		self.depth = depth  # letzte vollständig durchsuchte Tiefe
+		self.value = value
+		self.nodes = nodes
+		self.elapsed = elapsed
+
+	@property
+	def nodes_per_sec(self) -> float:
+		return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+	def __repr__(self):
+		return (f"SearchInfo(depth={self.depth}, value={self.value:.2f}, nodes={self.nodes}, "
+		        f"elapsed={self.elapsed:.3f}s, nodes/s={self.nodes_per_sec:.0f})")
+
+
+class AlphaBetaPlayer:
+	"""Computergegner für 2 Spieler: Alpha-Beta mit iterativer Vertiefung innerhalb der Runde"""
+
+	def __init__(self, time_limit: float = 0.5, max_depth: Optional[int] = None,
+	             evaluate: Optional[Evaluation] = None, aspiration: float = 2.0,
+	             table: Optional[TranspositionTable] = None):
+		self.time_limit = time_limit
+		self.max_depth = max_depth
+		self.evaluate = evaluate if evaluate is not None else ProjectedEvaluation()
+		self.aspiration = aspiration
+		self.table = table if table is not None else TranspositionTable()
+		self.killers: List[List[Move]] = []
+		self.last_stats = SearchInfo()
+
+	def advance(self, move: Move):
+		pass
+
+	def reset(self):
+		self.table.clear()
+
+	def choose_move(self, game: AzulGame) -> Move:
+		"""Bester Zug der tiefsten rechtzeitig abgeschlossenen Suche"""
+		if game.num_players != 2:
+			raise ValueError("AlphaBetaPlayer unterstützt nur 2 Spieler")
+		moves = game.legal_moves()
+		if not moves:
+			raise ValueError("Keine legalen Züge")
+
+		start = time.perf_counter()
+		self._deadline = start + self.time_limit
+		self._round = game.round
+		self._nodes = 0
+		self.table.new_search()
+		max_depth = game.center_total + sum(f.total for f in game.factories)
+		if self.max_depth is not None:
+			max_depth = min(max_depth, self.max_depth)
+		self.killers = [[] for _ in range(max_depth + 1)]
+
+		best_move, value, depth = order_moves(game, moves)[0], 0.0, 0
+		for d in range(1, max_depth + 1):
+			self._check_time = d > 1
+			try:
+				if d == 1:
+					v, move = self._root(game, d, -_INF, _INF)
+				else:
+					# Aspirationsfenster, bei Fehlschlag volle Suche
+					alpha, beta = value - self.aspiration, value + self.aspiration
+					v, move = self._root(game, d, alpha, beta)
+					if v <= alpha or v >= beta:
+						v, move = self._root(game, d, -_INF, _INF)
+			except _Timeout:
+				break
+			best_move, value, depth = move, v, d
+			if self._complete:
+				break
+
+		self.last_stats = SearchInfo(depth, value, self._nodes, time.perf_counter() - start)
+		return best_move
+
+	def _root(self, game: AzulGame, depth: int, alpha: float, beta: float):
+		self._complete = True
+		value = self._negamax(game, depth, 0, alpha, beta, game.current_player)
+		return value, self._root_move
+
+	def _negamax(self, game: AzulGame, depth: int, ply: int, alpha: float, beta: float, player: int) -> float:
+		"""Wert aus Sicht von player (innerhalb der Runde der Spieler am Zug)"""
+		self._nodes += 1
+		if self._check_time and not self._nodes & 15 and time.perf_counter() >= self._deadline:
+			raise _Timeout
+
+		if game.phase == GamePhase.GAME_END or game.round != self._round:
+			return self.evaluate(game, player)
+		moves = game.legal_moves()
+		if not moves:
+			return self.evaluate(game, player)
+		if depth == 0:
+			self._complete = False
+			return self.evaluate(game, player)
+
+		key = game.canonical_hash
+		entry = self.table.lookup(key)
+		hint = None
+		if entry is not None:
+			_, entry_depth, value, flag, hint, _ = entry
+			if entry_depth >= depth and ply:
+				if (flag == EXACT or flag == LOWER_BOUND and value >= beta
+				        or flag == UPPER_BOUND and value <= alpha):
+					if entry_depth != _COMPLETE:
+						self._complete = False
+					return value
+
+		ordered = order_moves(game, moves)
+		front = [m for m in self.killers[ply] if m in moves]
+		if hint is not None and hint in moves:
+			if hint in front:
+				front.remove(hint)
+			front.insert(0, hint)
+		if front:
+			ordered = front + [m for m in ordered if m not in front]
+
+		alpha0 = alpha
+		best, best_move = -_INF, ordered[0]
+		complete_before, self._complete = self._complete, True
+		for move in ordered:
+			game.apply(move)
+			try:
+				value = -self._negamax(game, depth - 1, ply + 1, -beta, -alpha, 1 - player)
+			finally:
+				game.undo(move)
+			if value > best:
+				best, best_move = value, move
+			alpha = max(alpha, value)
+			if alpha >= beta:
+				killers = self.killers[ply]
+				if move not in killers:
+					killers.insert(0, move)
+					del killers[2:]
+				break
+
+		if best <= alpha0:
+			flag = UPPER_BOUND
+		elif best >= beta:
+			flag = LOWER_BOUND
+		else:
+			flag = EXACT
+		self.table.store(key, _COMPLETE if self._complete else depth, best, flag, best_move)
+		self._complete &= complete_before
+		if not ply:
+			# Direkt übernehmen: der TT-Eintrag der Wurzel kann schon überschrieben sein
+			self._root_move = best_move
+		return best
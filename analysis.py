@@ -0,0 +1,168 @@
+"""Hintergrundsuche für die GUI (KI-Züge und Tipps), ohne die Tk-Hauptschleife zu blockieren.
+
+Die Suche läuft in einem eigenen Prozess auf einer gepackten Kopie des
+Spielzustands (AzulGame.to_bytes). Der Worker meldet Zwischenstände über eine
+Queue; AnalysisBridge holt sie zusammen mit dem Ergebnis per root.after ab und
+ruft die Rückruffunktionen im Tk-Thread auf.
+
+Eine neue Suche oder cancel() macht die laufende ungültig: der Worker bricht über
+should_stop nach der aktuellen Iteration ab, verspätete Meldungen werden verworfen.
+Scheitert die Suche (Ausnahme im Worker, abgestürzter Prozess), erhält on_error die
+Ausnahme; nach einem Absturz startet die nächste Suche einen neuen Worker.
+Das Modul importiert kein tkinter, die Worker starten (spawn) entsprechend schnell.
+"""
+import concurrent.futures
+import multiprocessing
+import queue
+import random
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, Tuple
+
+from engine import AzulGame, Move
+from mcts import MCTSNode, MCTSPlayer, SearchStats
+
+# Abstand der Zwischenstände aus dem Worker in Sekunden
+PROGRESS_INTERVAL = 0.1
+
+# Im Worker von _init_worker gesetzt
+_progress = None  # Queue für (Suche, bester Zug, SearchStats)
+_current = None  # Nummer der gültigen Suche, geteilt mit dem GUI-Prozess
+
+Callback = Callable[[int, Optional[Move], SearchStats], None]
+ErrorCallback = Callable[[int, BaseException], None]
+
+
+def _init_worker(progress, current):
+	global _progress, _current
+	_progress, _current = progress, current
+
+
+def _best_move(root: Optional[MCTSNode]) -> Optional[Move]:
+	"""Meistbesuchter Wurzelzug (wie MCTSPlayer.choose_move)"""
+	if root is None or not root.children:
+		return None
+	return max(root.children.items(), key=lambda item: item[1].visits)[0]
+
+
+def _search(job: int, state: bytes, time_limit: float, seed: int) -> Tuple[Optional[Move], SearchStats]:
+	"""Worker: MCTS auf dem übertragenen Zustand, meldet regelmäßig den besten Zug"""
+	rng = random.Random(seed)
+	game = AzulGame.from_bytes(state, random.Random(rng.getrandbits(64)))
+	player = MCTSPlayer(time_limit=time_limit, seed=rng.getrandbits(64))
+	start = time.perf_counter()
+	next_report = start + PROGRESS_INTERVAL
+
+	def should_stop() -> bool:
+		nonlocal next_report
+		if _current.value != job:
+			return True
+		now = time.perf_counter()
+		if now >= next_report:
+			next_report = now + PROGRESS_INTERVAL
+			root = player.root
+			_progress.put((job, _best_move(root), SearchStats(root.visits, now - start)))
+		return False
+
+	root = player.search(game, should_stop)
+	return _best_move(root), player.last_stats
+
+
+class AnalysisBridge:
+	"""Startet Suchen im Hintergrund und liefert Fortschritt und Ergebnis an die GUI
+
+	on_progress(job, move, stats), on_result(job, move, stats) und on_error(job, error)
+	werden im Tk-Thread aufgerufen, und zwar nur für die aktuelle Suche (job ist ihre
+	Nummer aus start()). Ohne on_error bleiben Fehler der Suche unbemerkt. root ist das
+	Tk-Fenster oder ein anderes Objekt mit after() und after_cancel().
+	"""
+
+	def __init__(self, root, on_progress: Callback, on_result: Callback,
+	             on_error: Optional[ErrorCallback] = None, poll_ms: int = 16):
+		self.root = root
+		self.on_progress = on_progress
+		self.on_result = on_result
+		self.on_error = on_error
+		self.poll_ms = poll_ms
+		# spawn statt fork: der GUI-Prozess hat tkinter geladen
+		self._context = multiprocessing.get_context("spawn")
+		self._progress = self._context.Queue()
+		self._current = self._context.Value("i", 0)
+		self._executor = None
+		self._future = None
+		self._job = 0
+		self._poll_id = None
+
+	@property
+	def busy(self) -> bool:
+		"""Läuft gerade eine gültige Suche?"""
+		return self._future is not None
+
+	def _pool(self) -> concurrent.futures.ProcessPoolExecutor:
+		if self._executor is None:
+			self._executor = concurrent.futures.ProcessPoolExecutor(
+				max_workers=1, mp_context=self._context,
+				initializer=_init_worker, initargs=(self._progress, self._current))
+		return self._executor
+
+	def start(self, game: AzulGame, time_limit: float) -> int:
+		"""Sucht im Hintergrund auf einer Kopie von game, gibt die Nummer der Suche zurück
+
+		Eine noch laufende Suche wird dabei abgebrochen.
+		"""
+		self.cancel()
+		self._job += 1
+		self._current.value = self._job
+		self._future = self._pool().submit(_search, self._job, game.to_bytes(), time_limit,
+		                                   random.getrandbits(64))
+		if self._poll_id is None:
+			self._poll_id = self.root.after(self.poll_ms, self._poll)
+		return self._job
+
+	def cancel(self):
+		"""Bricht die laufende Suche ab; ihre Meldungen werden nicht mehr zugestellt"""
+		self._current.value = 0
+		if self._future is not None:
+			self._future.cancel()
+			self._future = None
+
+	def shutdown(self):
+		"""Bricht ab und beendet den Worker-Prozess"""
+		self.cancel()
+		if self._poll_id is not None:
+			self.root.after_cancel(self._poll_id)
+			self._poll_id = None
+		if self._executor is not None:
+			self._executor.shutdown(wait=False)
+			self._executor = None
+
+	def _poll(self):
+		"""Holt Zwischenstände und Ergebnis ab (per root.after, solange eine Suche läuft)"""
+		self._poll_id = None
+		while True:
+			try:
+				job, move, stats = self._progress.get_nowait()
+			except queue.Empty:
+				break
+			if self._future is not None and job == self._job:
+				self.on_progress(job, move, stats)
+
+		future = self._future
+		if future is not None and future.done():
+			self._future = None
+			self._current.value = 0
+			try:
+				move, stats = future.result()
+			except Exception as e:
+				if isinstance(e, BrokenProcessPool):
+					# Der Pool nimmt keine Aufträge mehr an, die nächste Suche braucht einen neuen
+					self._executor.shutdown(wait=False)
+					self._executor = None
+				if self.on_error is not None:
+					self.on_error(self._job, e)
+			else:
+				self.on_result(self._job, move, stats)
+
+		# on_result kann bereits die nächste Suche gestartet (und das Abfragen geplant) haben
+		if self._future is not None and self._poll_id is None:
+			self._poll_id = self.root.after(self.poll_ms, self._poll)
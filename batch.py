@@ -0,0 +1,495 @@
+"""Batch-Engine: viele Azul-Partien gleichzeitig als NumPy-Arrays.
+
+Alle Partien laufen im Gleichschritt: jeder Aufruf von step() zieht für jede noch
+laufende Partie einen zufälligen legalen Zug, danach werden beendete Runden
+vektorisiert gefliest (wie PlayerBoard.move_complete_lines_to_wall), die
+Bodenreihen gewertet (wie PlayerBoard.score_floor_line), das Spielende geprüft
+und die Manufakturen neu befüllt. Beendete Partien werden ausmaskiert und aus den
+Arrays entfernt, sobald höchstens die Hälfte der Partien noch läuft.
+
+Die Regeln entsprechen engine.AzulGame; die Züge werden gleichverteilt aus
+denselben legalen Zügen gezogen, die AzulGame.legal_moves() liefert. Bleiben nach
+dem Nachfüllen keine Fliesen auf dem Tisch (Beutel und Ablage leer), hat
+AzulGame keine legalen Züge mehr und wertet nicht ab; solche Partien gelten hier
+als beendet (done), ebenfalls ohne Endwertung.
+
+Durchsatz (python bench.py batch, 2 Spieler, 20000 Partien): rund 25- bis 27-mal
+so viele Partien/s wie die Objekt-Engine mit take_from_factory/take_from_center.
+Das angestrebte 100-fache wird damit nicht erreicht. Die Zeit verteilt sich auf
+die Array-Operationen von Zug (etwa die Hälfte), Rundenwertung und Nachfüllen;
+selbst ohne Rundenwertung käme nur etwa das Doppelte heraus. Mehr ginge nur mit
+kompiliertem Code statt einzelner NumPy-Aufrufe je Zug.
+
+Intern liegt die Partie-Achse zuletzt (z.B. Wand als (P,5,5,N)), damit Summen
+über Quellen, Farben und Reihen über zusammenhängenden Speicher laufen. Die
+Eigenschaften wall, lines, factories usw. liefern die Arrays mit der
+Partie-Achse vorn.
+
+Benötigt numpy.
+"""
+from typing import Optional
+
+import numpy as np
+
+from engine import FLOOR_PENALTY_TOTAL, PLACEMENT_SCORE, RUN_LENGTH
+
+_RUN_LENGTH = np.array(RUN_LENGTH, dtype=np.int64)  # [5-Bit-Maske][Position]
+_PLACEMENT_SCORE = np.array(PLACEMENT_SCORE, dtype=np.int32)  # [h][v]
+_FLOOR_PENALTY_TOTAL = np.array(FLOOR_PENALTY_TOTAL, dtype=np.int32)
+_WALL_COL = np.array([[(row + c) % 5 for c in range(5)] for row in range(5)])  # [Reihe][Farbe] -> Spalte
+_COLORS = np.arange(5)
+_CAPACITY = np.arange(1, 6, dtype=np.int8)[:, None]  # Plätze je Musterreihe
+_BIT_WEIGHTS = 1 << np.arange(5)
+_CODE_WEIGHTS = 5 ** np.arange(5, dtype=np.int16)  # Manufakturinhalt -> engine.factory_code
+
+# Passende Musterreihen als 25-Bit-Maske: Bit 5 * Farbe + Reihe
+_TARGET_BITS = (1 << np.arange(25, dtype=np.int32)).reshape(5, 5)  # [Farbe][Reihe]
+_COLOR_SHIFT = (5 * _COLORS)[:, None]
+_ROW_BITS = _TARGET_BITS.sum(0)  # [Reihe]: Bits der Reihe für alle Farben
+_POPCOUNT = np.array([bin(mask).count("1") for mask in range(32)], dtype=np.int16)
+# _NTH_ROW[mask, i]: i-te Reihe in der 5-Bit-Maske, 5 (Bodenreihe) wenn i >= Anzahl
+_NTH_ROW = np.array([[([row for row in range(5) if mask >> row & 1] + [5] * 6)[i] for i in range(6)]
+                     for mask in range(32)]).reshape(-1)
+
+# Ziele je Farbe: Musterreihe 0-4, Index 5 = Bodenreihe
+TARGETS = 6
+POLICIES = ("random", "placing")
+
+# Arrays mit der Partie-Achse zuletzt, die bei der Verdichtung mitgenommen werden
+_STATE = ("_wall", "_line_color", "_line_count", "_floor", "_has_marker", "_score", "_sources", "_bag",
+          "_discard", "_marker_taken", "_current", "_done", "_rounds", "_moves", "_targets", "_code",
+          "_on_table", "_waiting")
+
+# Rundenwertung erst, wenn mindestens dieser Anteil der Partien darauf wartet
+END_ROUND_BATCH = 0.1
+
+
+def _line_targets(line_color: np.ndarray, line_count: np.ndarray, wall: np.ndarray) -> np.ndarray:
+	"""Bitmaske der passenden Musterreihen zu Musterreihen (P,5,G) und Wand (P,5,5,G)"""
+	color = line_color[:, None, :, :]
+	fits = ((line_count < _CAPACITY)[:, None, :, :]
+	        & ((color == -1) | (color == _COLORS[:, None, None])))  # (P, Farbe, Reihe, G)
+	# Wandfeld der Farbe c in Reihe row: Spalte (row + c) % 5
+	for row in range(5):
+		fits[:, :, row] &= ~wall[:, row, _WALL_COL[row]]
+	return np.tensordot(_TARGET_BITS, fits, ((0, 1), (1, 2)))
+
+
+def _count(mask: np.ndarray, axis: int = 0) -> np.ndarray:
+	"""Anzahl True entlang axis (höchstens 255)"""
+	return mask.view(np.uint8).sum(axis, dtype=np.uint8)
+
+
+def _index(counts: np.ndarray, r: np.ndarray) -> np.ndarray:
+	"""Index entlang Achse 0, in dessen kumuliertes Intervall von counts r fällt
+
+	Ist r mindestens die Summe, ergibt sich len(counts). Die Schleife über die
+	wenigen Einträge ist deutlich schneller als np.cumsum entlang Achse 0.
+	"""
+	acc = np.zeros(r.shape, dtype=np.int16)
+	index = np.zeros(r.shape, dtype=np.intp)
+	for row in counts:
+		acc += row
+		index += acc <= r
+	return index
+
+
+class BatchAzul:
+	"""N Partien mit num_players Spielern als Arrays
+
+	Sichten mit der Partie-Achse vorn: wall (N,P,5,5) bool, lines (N,P,5,2) mit
+	(Farbindex, Anzahl), floor (N,P,5) Zähler pro Farbe, factories (N,F,5),
+	center/bag/discard (N,5), score (N,P).
+
+	policy "random" zieht gleichverteilt aus allen legalen Zügen, "placing" nur aus
+	Zügen in Musterreihen, solange es solche gibt.
+	"""
+
+	def __init__(self, n_games: int, num_players: int, seed: Optional[int] = None, policy: str = "random"):
+		if policy not in POLICIES:
+			raise ValueError(f"Unbekannte Strategie: {policy}")
+		self.n_games = n_games
+		self.num_players = num_players
+		self.num_factories = {2: 5, 3: 7, 4: 9}[num_players]
+		self.policy = policy
+		self.rng = np.random.default_rng(seed)
+
+		n, p, f = n_games, num_players, self.num_factories
+		self._wall = np.zeros((p, 5, 5, n), dtype=bool)
+		self._line_color = np.full((p, 5, n), -1, dtype=np.int8)
+		self._line_count = np.zeros((p, 5, n), dtype=np.int8)
+		self._floor = np.zeros((p, 5, n), dtype=np.int8)
+		self._has_marker = np.zeros((p, n), dtype=bool)
+		self._score = np.zeros((p, n), dtype=np.int32)
+		# Quellen: Manufakturen 0..F-1, Index F = Tischmitte
+		self._sources = np.zeros((f + 1, 5, n), dtype=np.int8)
+		self._bag = np.full((5, n), 20, dtype=np.int8)
+		self._discard = np.zeros((5, n), dtype=np.int8)
+		self._marker_taken = np.zeros(n, dtype=bool)
+		self._current = np.zeros(n, dtype=np.int64)
+		self._done = np.zeros(n, dtype=bool)
+		self._rounds = np.ones(n, dtype=np.int32)
+		self._moves = np.zeros(n, dtype=np.int32)
+
+		# Inkrementell gepflegt: passende Musterreihen je Spieler als Bitmaske (P,N),
+		# Inhaltscode je Manufaktur (wie engine.factory_code) und Fliesen auf dem Tisch
+		self._targets = np.full((p, n), (1 << 25) - 1, dtype=np.int32)
+		self._code = np.zeros((f + 1, n), dtype=np.int16)  # Zeile F (Tischmitte) bleibt 0
+		self._on_table = np.zeros(n, dtype=np.int16)
+		self._waiting = np.zeros(n, dtype=bool)  # Runde beendet, Wertung steht noch aus
+
+		# Die Arrays enthalten nur die Partien _ids; beendete Partien werden bei der
+		# Verdichtung in _archive (volle Größe) verschoben
+		self._ids = np.arange(n)
+		self._archive = None
+		self._resize()
+
+		self._refill(self._all)
+
+	def _resize(self):
+		self._n = len(self._ids)
+		self._all = np.arange(self._n)
+		self._color_offsets = _COLORS[:, None] * self._n
+
+	def _compact(self):
+		"""Entfernt beendete Partien aus den Arrays, sobald höchstens die Hälfte noch läuft"""
+		live = ~self._done
+		count = int(live.sum())
+		if self._n < 256 or 2 * count > self._n:
+			return
+		if self._archive is None:
+			self._archive = {name: np.zeros(getattr(self, name).shape[:-1] + (self.n_games,),
+			                                dtype=getattr(self, name).dtype) for name in _STATE}
+		retired = self._ids[~live]
+		for name in _STATE:
+			values = getattr(self, name)
+			self._archive[name][..., retired] = values[..., ~live]
+			setattr(self, name, np.ascontiguousarray(values[..., live]))
+		self._ids = self._ids[live]
+		self._resize()
+
+	def _public(self, name: str) -> np.ndarray:
+		"""Array name für alle N Partien (Partie-Achse zuletzt)"""
+		values = getattr(self, name)
+		if self._archive is None:
+			return values
+		full = self._archive[name].copy()
+		full[..., self._ids] = values
+		return full
+
+	# Sichten mit der Partie-Achse vorn (nach einer Verdichtung Kopien)
+
+	@property
+	def wall(self) -> np.ndarray:
+		return np.moveaxis(self._public("_wall"), -1, 0)
+
+	@property
+	def lines(self) -> np.ndarray:
+		return np.stack([self._public("_line_color"), self._public("_line_count")], -1).transpose(2, 0, 1, 3)
+
+	@property
+	def floor(self) -> np.ndarray:
+		return np.moveaxis(self._public("_floor"), -1, 0)
+
+	@property
+	def has_marker(self) -> np.ndarray:
+		return self._public("_has_marker").T
+
+	@property
+	def score(self) -> np.ndarray:
+		return self._public("_score").T
+
+	@property
+	def factories(self) -> np.ndarray:
+		return np.moveaxis(self._public("_sources")[:self.num_factories], -1, 0)
+
+	@property
+	def center(self) -> np.ndarray:
+		return self._public("_sources")[self.num_factories].T
+
+	@property
+	def bag(self) -> np.ndarray:
+		return self._public("_bag").T
+
+	@property
+	def discard(self) -> np.ndarray:
+		return self._public("_discard").T
+
+	@property
+	def marker_taken(self) -> np.ndarray:
+		return self._public("_marker_taken")
+
+	@property
+	def current(self) -> np.ndarray:
+		return self._public("_current")
+
+	@property
+	def done(self) -> np.ndarray:
+		return self._public("_done")
+
+	@property
+	def rounds(self) -> np.ndarray:
+		return self._public("_rounds")
+
+	@property
+	def moves(self) -> np.ndarray:
+		return self._public("_moves")
+
+	@property
+	def active(self) -> np.ndarray:
+		return ~self.done
+
+	def run(self, max_steps: Optional[int] = None) -> np.ndarray:
+		"""Spielt alle Partien zu Ende und gibt die Endpunktzahlen (N,P) zurück"""
+		steps = 0
+		while self.step():
+			steps += 1
+			if max_steps is not None and steps >= max_steps:
+				break
+		return self.score.copy()
+
+	def _sources_and_targets(self):
+		"""Verfügbare (Quelle, Farbe) als (F+1,5,N) und passende Musterreihen des aktuellen Spielers als (Farbe,N) Bitmasken
+
+		Beendete Partien und Partien, deren Rundenwertung aussteht, haben keine
+		Fliesen auf dem Tisch und damit keine Quellen.
+		"""
+		avail = self._sources > 0
+
+		# Manufakturen mit gleichem Inhalt wie eine frühere nur einmal
+		code = self._code
+		for f in range(1, self.num_factories):
+			dup = code[0] == code[f]
+			for e in range(1, f):
+				dup |= code[e] == code[f]
+			avail[f] &= ~dup
+
+		mask = self._targets[0]
+		for p in range(1, self.num_players):
+			mine = -(self._current == p).astype(np.int32)
+			mask = mask ^ ((mask ^ self._targets[p]) & mine)
+		return avail, mask >> _COLOR_SHIFT & 31
+
+	def _floor_allowed(self, avail: np.ndarray, rows: np.ndarray) -> np.ndarray:
+		"""Ob die Bodenreihe als Ziel erlaubt ist, je Partie"""
+		if self.policy == "random":
+			return np.ones(avail.shape[-1], dtype=bool)
+		# Bodenreihe nur, wenn kein Zug in eine Musterreihe möglich ist
+		return ~(avail.any(0) & (rows > 0)).any(0)
+
+	def legal_mask(self, games: Optional[np.ndarray] = None) -> np.ndarray:
+		"""Legale Züge als (G, Quellen, 5 Farben, 6 Ziele); Quelle F = Tischmitte, Ziel 5 = Bodenreihe"""
+		avail, rows = self._sources_and_targets()
+		targets = np.empty((5, TARGETS, self._n), dtype=bool)
+		targets[:, :5] = (rows[:, None, :] >> _COLORS[:, None] & 1).astype(bool)
+		targets[:, 5] = self._floor_allowed(avail, rows)
+		mask = avail.transpose(2, 0, 1)[:, :, :, None] & targets.transpose(2, 0, 1)[:, None, :, :]
+		mask[self._on_table == 0] = False
+		full = np.zeros((self.n_games,) + mask.shape[1:], dtype=bool)
+		full[self._ids] = mask
+		return full if games is None else full[games]
+
+	def step(self) -> bool:
+		"""Führt einen Zug in jeder laufenden Partie aus; False, wenn alle beendet sind
+
+		Gerechnet wird über alle N Partien; Partien ohne Fliesen auf dem Tisch ziehen
+		einen leeren Zug (0 Fliesen aus der Tischmitte), der nichts verändert.
+		"""
+		if self._done.all():
+			return False
+		n = self._n
+		playing = self._on_table > 0
+
+		avail, rows = self._sources_and_targets()
+		floor_allowed = self._floor_allowed(avail, rows)
+
+		# Gleichverteilt unter den legalen Zügen: erst die Farbe gewichtet mit
+		# (Anzahl Quellen x Anzahl Ziele), dann Quelle und Ziel gleichverteilt
+		n_src = _count(avail, 0).astype(np.int16)  # (Farbe, N)
+		n_rows = _POPCOUNT[rows]
+		weights = n_src * (n_rows + floor_allowed)
+
+		u = self.rng.random((3, n))
+		c = np.minimum(_index(weights, np.floor(u[0] * weights.sum(0))), 4)
+		at_color = c * n + self._all
+
+		src_fits = avail.reshape(len(avail), -1)[:, at_color]  # (Quelle, N)
+		source = np.minimum(_index(src_fits, np.floor(u[1] * _count(src_fits, 0))), self.num_factories)
+		# Über die passenden Musterreihen hinaus ergibt sich 5 (Bodenreihe)
+		row_mask = rows.reshape(-1)[at_color]
+		pick = np.floor(u[2] * (n_rows.reshape(-1)[at_color] + floor_allowed)).astype(np.intp)
+		target = _NTH_ROW[row_mask * TARGETS + pick]
+
+		self._apply(source, c, target)
+		self._moves += playing
+
+		# Runde zu Ende, sobald keine Fliesen mehr auf dem Tisch liegen. Die Wertung
+		# läuft gesammelt für viele Partien, bis dahin ziehen sie leere Züge.
+		on_table = self._on_table > 0
+		self._current = (self._current + (playing & on_table)) % self.num_players
+		self._waiting |= playing & ~on_table
+		waiting = int(self._waiting.sum())
+		if waiting and (waiting >= END_ROUND_BATCH * n or not on_table.any()):
+			self._end_round(np.flatnonzero(self._waiting))
+			self._waiting[:] = False
+			self._compact()
+
+		return not self._done.all()
+
+	def _apply(self, source, c, target):
+		"""Nimmt die Fliesen von der Quelle und legt sie auf die Ablage des aktuellen Spielers
+
+		Die Zugriffe laufen über flache Indizes (x * N + Partie), das ist bei NumPy
+		deutlich schneller als mehrdimensionale Indexarrays.
+		"""
+		n = self._n
+		games = self._all
+		cur = self._current
+		sources = self._sources.reshape(-1)
+
+		# Quelle leeren, der Rest kommt in die Tischmitte (aus der Tischmitte: zurück)
+		at_source = source * (5 * n) + games
+		rest = sources[at_source + self._color_offsets]  # (Farbe, N)
+		at_taken = c * n + games
+		taken = rest.reshape(-1)[at_taken]
+		rest.reshape(-1)[at_taken] = 0
+		sources[at_source + self._color_offsets] = 0
+		self._sources[self.num_factories] += rest
+		self._code.reshape(-1)[source * n + games] = 0
+		self._on_table -= taken
+
+		# Tischmitte: Startspielermarker beim ersten Zugriff
+		from_center = (source == self.num_factories) & (taken > 0)
+		at_player = cur * n + games
+		marker = self._has_marker.reshape(-1)
+		marker[at_player] |= from_center & ~self._marker_taken
+		self._marker_taken |= from_center
+
+		# Musterreihe, Überschuss in die Bodenreihe
+		to_line = (target < 5) & (taken > 0)
+		row = np.minimum(target, 4)
+		at_line = (cur * 5 + row) * n + games
+		line_count = self._line_count.reshape(-1)
+		line_color = self._line_color.reshape(-1)
+		count = line_count[at_line]
+		added = (np.minimum(row + 1 - count, taken) * to_line).astype(np.int8)
+		count += added
+		line_count[at_line] = count
+		color = line_color[at_line]
+		line_color[at_line] = color + (c - color) * to_line
+		self._floor.reshape(-1)[(cur * 5 + c) * n + games] += taken - added
+
+		# Die Reihe nimmt nur noch diese Farbe auf, solange sie nicht voll ist
+		targets = self._targets.reshape(-1)
+		mask = targets[at_player] & ~(_ROW_BITS[row] * to_line)
+		targets[at_player] = mask | (to_line & (count <= row)) << (5 * c + row)
+
+	def _end_round(self, games):
+		"""Fliesungsphase, Bodenreihe, Spielende-Prüfung und nächste Runde"""
+		wall = self._wall[..., games]  # (P,5,5,G)
+		line_color = self._line_color[..., games]
+		line_count = self._line_count[..., games]
+		score = self._score[:, games]
+		discard = self._discard[:, games].astype(np.int16)
+
+		# Komplette Musterreihen von oben nach unten an die Wand
+		for row in range(5):
+			pi, gi = np.nonzero(line_count[:, row] == row + 1)
+			if not gi.size:
+				continue
+			c = line_color[pi, row, gi].astype(np.int64)
+			col = (row + c) % 5
+			wall[pi, row, col, gi] = True
+			h = _RUN_LENGTH[wall[pi, row, :, gi] @ _BIT_WEIGHTS, col]
+			v = _RUN_LENGTH[wall[pi, :, col, gi] @ _BIT_WEIGHTS, row]
+			score[pi, gi] += _PLACEMENT_SCORE[h, v]
+			if row:
+				np.add.at(discard, (c, gi), row)
+			line_color[pi, row, gi] = -1
+			line_count[pi, row, gi] = 0
+
+		# Bodenreihe werten und ablegen
+		floor = self._floor[..., games]
+		penalty = _FLOOR_PENALTY_TOTAL[np.minimum(floor.sum(1), 7)] - self._has_marker[:, games]
+		score = np.maximum(0, score + penalty)
+		discard += floor.sum(0)
+		self._floor[..., games] = 0
+
+		self._wall[..., games] = wall
+		self._line_color[..., games] = line_color
+		self._line_count[..., games] = line_count
+		self._score[:, games] = score
+		self._discard[:, games] = discard
+		self._targets[..., games] = _line_targets(line_color, line_count, wall)
+
+		# Spielende, sobald eine Wandreihe vollständig ist
+		ended = wall.all(2).any((0, 1))
+		if ended.any():
+			self._finish(games[ended])
+
+		# Nächste Runde: Inhaber des Startspielermarkers beginnt
+		nxt = games[~ended]
+		if nxt.size:
+			marker = self._has_marker[:, nxt]
+			holder = marker.any(0)
+			self._current[nxt[holder]] = marker[:, holder].argmax(0)
+			self._has_marker[:, nxt] = False
+			self._marker_taken[nxt] = False
+			self._rounds[nxt] += 1
+			self._refill(nxt)
+			# Ohne Fliesen in Beutel und Ablage ist die Partie beendet
+			# (wie AzulGame ohne legale Züge: keine Endwertung)
+			stuck = self._on_table[nxt] == 0
+			if stuck.any():
+				self._finish(nxt[stuck], bonus=False)
+
+	def _finish(self, games, bonus: bool = True):
+		"""Beendet Partien, mit bonus wie AzulGame._end_game samt Endspiel-Bonus"""
+		if bonus:
+			wall = self._wall[..., games]  # (P,5,5,G)
+			rows = wall.all(2).sum(1)
+			cols = wall.all(1).sum(1)
+			colors = np.stack([wall[:, row, _WALL_COL[row]] for row in range(5)], 1).all(1).sum(1)
+			self._score[:, games] += 2 * rows + 7 * cols + 10 * colors
+		self._sources[..., games] = 0
+		self._on_table[games] = 0
+		self._done[games] = True
+
+	def _refill(self, games):
+		"""Befüllt die Manufakturen wie AzulGame._refill_factories
+
+		Fliese für Fliese ohne Zurücklegen (wie AzulGame._draw_tile); ist der Beutel
+		leer, wird die Ablage zum Beutel.
+		"""
+		f = self.num_factories
+		n = len(games)
+		at_game = np.arange(n)
+		# Zeile 5 nimmt die Ziehungen auf, wenn Beutel und Ablage leer sind
+		bag = np.zeros((6, n), dtype=np.int16)
+		bag[:5] = self._bag[:, games]
+		discard = self._discard[:, games].astype(np.int16)
+		total = bag.sum(0)
+		factories = np.zeros((f, 6, n), dtype=np.int8)
+
+		u = self.rng.random((f, 4, n))
+		for i in range(f):
+			for j in range(4):
+				empty = total == 0
+				if empty.any():
+					# Ablage zurück in den Beutel
+					bag[:5, empty] = discard[:, empty]
+					discard[:, empty] = 0
+					total[empty] = bag[:5, empty].sum(0)
+				c = _index(bag[:5], np.floor(u[i, j] * total))
+				at = c * n + at_game
+				bag.reshape(-1)[at] -= 1
+				factories[i].reshape(-1)[at] += 1
+				total -= c < 5
+
+		factories = factories[:, :5]
+		self._bag[:, games] = bag[:5]
+		self._discard[:, games] = discard
+		self._sources[:f, :, games] = factories
+		self._sources[f, :, games] = 0
+		self._code[:f, games] = np.tensordot(_CODE_WEIGHTS, factories, (0, 1))
+		self._on_table[games] = factories.sum((0, 1), dtype=np.int16)
@@ -0,0 +1,229 @@
+"""Benchmarks und Budget-Prüfungen für die Azul-Engine.
+
+Aufruf: python bench.py [name ...]  (ohne Namen laufen alle Benchmarks)
+Der Exit-Code ist ungleich 0, wenn ein Budget überschritten wurde.
+"""
+import os
+import py_compile
+import random
+import subprocess
+import sys
+import time
+from typing import Tuple
+
+# Budget für den kalten Import der Engine in einem frischen Prozess. Es gilt für das, was
+# engine.py selbst kostet: die Module der Standardbibliothek, die es braucht, lädt die Probe
+# vorher; deren Ladezeit hängt stark von der Last der Maschine ab.
+IMPORT_BUDGET_MS = 30.0
+
+_IMPORT_PROBE = (
+	"import sys, time\n"
+	"t0 = time.perf_counter()\n"
+	"import enum, itertools, random, struct, typing\n"
+	"t1 = time.perf_counter()\n"
+	"import engine\n"
+	"t2 = time.perf_counter()\n"
+	"print((t2 - t1) * 1000, (t2 - t0) * 1000, 'tkinter' in sys.modules)\n"
+)
+
+
+def import_time_ms(runs: int = 5) -> Tuple[float, float, bool]:
+	"""Kalter Import von engine.py, bester Wert aus mehreren Prozessen
+
+	Gibt (Engine allein, samt Standardbibliothek, tkinter geladen) zurück, Zeiten in ms.
+	"""
+	root = os.path.dirname(os.path.abspath(__file__))
+	# Bytecode vorab erzeugen, gemessen wird das Laden, nicht das Kompilieren
+	py_compile.compile(os.path.join(root, "engine.py"))
+	own, total, tkinter = [], [], False
+	for _ in range(runs):
+		out = subprocess.run([sys.executable, "-c", _IMPORT_PROBE], capture_output=True,
+		                     text=True, check=True, cwd=root).stdout.split()
+		own.append(float(out[0]))
+		total.append(float(out[1]))
+		tkinter = tkinter or out[2] == "True"
+	return min(own), min(total), tkinter
+
+
+def bench_import(runs: int = 5) -> bool:
+	"""Misst den kalten Import von engine.py gegen IMPORT_BUDGET_MS"""
+	own, total, tkinter = import_time_ms(runs)
+	if tkinter:
+		print("import: engine zieht tkinter nach")
+		return False
+	print(f"import: {own:.1f} ms (Budget {IMPORT_BUDGET_MS:.0f} ms), mit Standardbibliothek {total:.1f} ms")
+	return own <= IMPORT_BUDGET_MS
+
+
+def bench_refill(rounds: int = 20000) -> bool:
+	"""Misst das Befüllen der Manufakturen (4 Spieler, 36 Fliesen pro Runde)"""
+	from engine import AzulGame
+
+	game = AzulGame(4, random.Random(1))
+	start = time.perf_counter()
+	for _ in range(rounds):
+		for factory in game.factories:
+			for c in range(5):
+				game._discard(c, factory.counts[c])
+			factory.clear()
+		game._refill_factories()
+	elapsed = time.perf_counter() - start
+	print(f"refill: {rounds / elapsed:,.0f} Runden/s ({elapsed / rounds / 36 * 1e6:.2f} µs pro Fliese)")
+	return True
+
+
+def bench_mcts(time_limit: float = 2.0) -> bool:
+	"""Misst den Durchsatz der MCTS-Suche (Playouts/s) in der Startstellung"""
+	from engine import AzulGame
+	from mcts import MCTSPlayer
+
+	for num_players in (2, 4):
+		game = AzulGame(num_players, random.Random(1))
+		player = MCTSPlayer(time_limit=time_limit, seed=1)
+		player.choose_move(game)
+		print(f"mcts ({num_players} Spieler): {player.last_stats.playouts_per_sec:,.0f} Playouts/s")
+	return True
+
+
+def bench_mcts_parallel(time_limit: float = 2.0) -> bool:
+	"""Skalierung der parallelen MCTS (Playouts/s je Worker-Anzahl, 2 Spieler)"""
+	import os
+	from engine import AzulGame
+	from mcts_parallel import LeafParallelMCTS, RootParallelMCTS
+
+	counts = []
+	workers = 1
+	while workers <= (os.cpu_count() or 1):
+		counts.append(workers)
+		workers *= 2
+
+	for name, cls in (("root", RootParallelMCTS), ("leaf", LeafParallelMCTS)):
+		base = None
+		for workers in counts:
+			game = AzulGame(2, random.Random(1))
+			with cls(workers=workers, time_limit=time_limit, seed=1) as player:
+				player.choose_move(game)  # Pool starten
+				player.reset()
+				player.choose_move(game)
+				rate = player.last_stats.playouts_per_sec
+			base = base or rate
+			print(f"mcts-parallel {name} ({workers} Worker): {rate:,.0f} Playouts/s, Speedup {rate / base:.2f}")
+	return True
+
+
+def bench_batch(n_games: int = 20000, time_limit: float = 3.0) -> bool:
+	"""Vergleicht die Batch-Engine mit der Objekt-Engine (Partien/s, mittlere Punktzahl, 2 Spieler)
+
+	Die Objekt-Engine zieht über take_from_factory/take_from_center, also ohne die
+	Rücknahme-Informationen von apply(). Schlägt fehl, wenn die mittleren
+	Endpunktzahlen statistisch voneinander abweichen.
+	"""
+	import math
+	from batch import BatchAzul
+	from engine import CENTER, COLORS, AzulGame, GamePhase
+
+	rng = random.Random(1)
+	scores = []
+	start = time.perf_counter()
+	while time.perf_counter() - start < time_limit:
+		game = AzulGame(2, random.Random(len(scores)))
+		while game.phase != GamePhase.GAME_END:
+			moves = game.legal_moves()
+			if not moves:
+				break
+			source, c, line = rng.choice(moves)
+			if source == CENTER:
+				game.take_from_center(game.current_player, COLORS[c], line)
+			else:
+				game.take_from_factory(game.current_player, source, COLORS[c], line)
+		scores.extend(p.score for p in game.players)
+	object_rate = len(scores) / 2 / (time.perf_counter() - start)
+
+	start = time.perf_counter()
+	batch_scores = BatchAzul(n_games, 2, seed=1).run().ravel()
+	batch_rate = n_games / (time.perf_counter() - start)
+
+	mean = sum(scores) / len(scores)
+	var = sum((s - mean) ** 2 for s in scores) / (len(scores) - 1)
+	diff = float(batch_scores.mean()) - mean
+	stderr = math.sqrt(var / len(scores) + float(batch_scores.var()) / len(batch_scores))
+	print(f"batch: {batch_rate:,.0f} Partien/s, Objekt-Engine {object_rate:,.0f} Partien/s, "
+	      f"Faktor {batch_rate / object_rate:.1f} (Ziel 100)")
+	print(f"batch: mittlere Punktzahl {batch_scores.mean():.2f} vs. {mean:.2f} "
+	      f"(Differenz {diff / stderr:+.1f} Standardfehler)")
+	return abs(diff) <= 4 * stderr
+
+
+def bench_endgame(positions: int = 20, tiles: int = 12) -> bool:
+	"""Misst den Endspiel-Löser (Knoten/s) auf späten Stellungen mit höchstens tiles Fliesen"""
+	from endgame import EndgameSolver
+	from engine import AzulGame, GamePhase
+	from mcts import rollout_move
+
+	solver = EndgameSolver(max_nodes=500_000)
+	nodes = elapsed = exact = 0
+	seed = 0
+	while positions:
+		game = AzulGame(2, random.Random(seed))
+		rng = random.Random(seed)
+		seed += 1
+		while game.phase == GamePhase.PATTERN and game.legal_moves():
+			if game.round >= 5 and game.center_total + sum(f.total for f in game.factories) <= tiles:
+				result = solver.solve(game)
+				nodes += result.nodes
+				elapsed += result.elapsed
+				exact += result.exact
+				positions -= 1
+				break
+			game.apply(rollout_move(game, rng))
+	print(f"endgame: {nodes / elapsed:,.0f} Knoten/s, {exact} Stellungen exakt gelöst")
+	return True
+
+
+def bench_clone(copies: int = 20000) -> bool:
+	"""Vergleicht AzulGame.clone() mit copy.deepcopy (4 Spieler, Stellung mitten in der Partie)"""
+	import copy
+	from engine import AzulGame
+	from mcts import rollout_move
+
+	game = AzulGame(4, random.Random(1))
+	rng = random.Random(1)
+	for _ in range(30):
+		game.apply(rollout_move(game, rng))
+	game._undo_stack.clear()  # deepcopy soll nicht mehr kopieren als clone()
+
+	def per_copy(stmt, n: int) -> float:
+		start = time.perf_counter()
+		for _ in range(n):
+			stmt()
+		return (time.perf_counter() - start) / n
+
+	clone_time = per_copy(game.clone, copies)
+	shared_rng_time = per_copy(lambda: game.clone(rng), copies)
+	deepcopy_time = per_copy(lambda: copy.deepcopy(game), copies // 20)
+	print(f"clone: {clone_time * 1e6:.1f} µs ({shared_rng_time * 1e6:.1f} µs mit eigenem rng), "
+	      f"deepcopy: {deepcopy_time * 1e6:.1f} µs ({deepcopy_time / clone_time:.0f}x)")
+	return True
+
+
+BENCHMARKS = {
+	"import": bench_import,
+	"refill": bench_refill,
+	"mcts": bench_mcts,
+	"mcts-parallel": bench_mcts_parallel,
+	"batch": bench_batch,
+	"endgame": bench_endgame,
+	"clone": bench_clone,
+}
+
+
+def main(argv: list) -> int:
+	names = argv or list(BENCHMARKS)
+	ok = True
+	for name in names:
+		ok = BENCHMARKS[name]() and ok
+	return 0 if ok else 1
+
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
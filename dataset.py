@@ -0,0 +1,311 @@
+"""Trainingsdaten aus Self-Play: Merkmalskodierung und memory-mapped .npy-Shards.
+
+FeatureEncoder kodiert Spielzustände stapelweise in vorab angelegte float32-Puffer.
+Die Zustände werden dafür mit AzulGame.pack_into() in einen Byte-Puffer gepackt
+und als strukturiertes Array (packed_dtype) gelesen; die eigentliche Kodierung
+läuft vektorisiert über den ganzen Stapel.
+
+Merkmale aus Sicht des Spielers am Zug (er steht zuerst, die übrigen folgen in
+Sitzreihenfolge), je Spieler P:
+
+	P x 25  Wand (0/1, Bit row * 5 + col)
+	P x 25  Musterreihen: Füllstand (Anzahl / Plätze) je Reihe und Farbe
+	P x 5   Bodenreihe: Anzahl je Farbe
+	P       Startspielermarker liegt beim Spieler
+	1       Startspielermarker liegt noch in der Tischmitte
+	5 x 4   Manufakturen: Anzahl Manufakturen mit genau 1-4 Fliesen je Farbe
+	5       Tischmitte: Anzahl je Farbe
+	P       Punkte
+
+DatasetWriter hängt Stellungen mit Ergebnis (je Spieler, gleiche Reihenfolge wie
+die Merkmale) und Besuchsverteilung (über engine.encode_move) an Shards an;
+Dataset liefert Ausschnitte daraus als Sichten auf die gemappten Dateien.
+
+Benötigt numpy.
+"""
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from engine import FACTORY_COUNT, MOVE_CODES, PACKED, AzulGame, Move, encode_move
+
+_BOARD = np.dtype([
+	("wall", "<u4"), ("score", "<i2"), ("line_colors", "i1", (5,)),
+	("line_counts", "u1", (5,)), ("floor", "u1", (5,)), ("marker", "u1"),
+])
+_WALL_SHIFTS = np.arange(25, dtype=np.uint32)
+_CAPACITY = np.arange(1, 6, dtype=np.float32)  # Plätze je Musterreihe
+_COLORS = np.arange(5, dtype=np.int8)
+_FACTORY_SIZES = np.arange(1, 5, dtype=np.uint8)
+
+
+def packed_dtype(num_players: int) -> np.dtype:
+	"""Strukturierter dtype mit demselben Aufbau wie engine.PACKED"""
+	dtype = np.dtype([
+		("num_players", "u1"), ("current_player", "u1"), ("phase", "u1"), ("marker_taken", "u1"),
+		("round", "<u2"), ("center", "u1", (5,)), ("bag", "u1", (5,)), ("discard", "u1", (5,)),
+		("factories", "u1", (FACTORY_COUNT[num_players], 5)), ("boards", _BOARD, (num_players,)),
+	])
+	assert dtype.itemsize == PACKED[num_players].size
+	return dtype
+
+
+def feature_size(num_players: int) -> int:
+	return 57 * num_players + 26
+
+
+class FeatureEncoder:
+	"""Kodiert Zustände einer Spielerzahl stapelweise in float32-Zeilen der Länge size
+
+	Der Packpuffer wächst nur, wenn ein Stapel größer ist als alle vorherigen.
+	"""
+
+	def __init__(self, num_players: int, capacity: int = 256):
+		self.num_players = num_players
+		self.size = feature_size(num_players)
+		self.dtype = packed_dtype(num_players)
+		self._raw = np.zeros((0, self.dtype.itemsize), dtype=np.uint8)
+		self.reserve(capacity)
+
+	def reserve(self, capacity: int):
+		"""Vergrößert den Packpuffer auf mindestens capacity Zustände (Inhalt bleibt erhalten)"""
+		if capacity <= len(self._raw):
+			return
+		capacity = max(capacity, 2 * len(self._raw))
+		raw = np.zeros((capacity, self.dtype.itemsize), dtype=np.uint8)
+		raw[:len(self._raw)] = self._raw
+		self._raw = raw
+		self._raw_view = memoryview(raw).cast("B")
+		self.packed = raw.view(self.dtype).reshape(capacity)
+
+	def pack_into(self, game: AzulGame, i: int):
+		"""Packt ein Spiel in Eintrag i des Packpuffers"""
+		self.reserve(i + 1)
+		game.pack_into(self._raw_view, i * self.dtype.itemsize)
+
+	def pack(self, games: Sequence[AzulGame]) -> np.ndarray:
+		"""Packt Spiele in den Packpuffer, gibt die belegten Einträge zurück"""
+		self.reserve(len(games))
+		itemsize = self.dtype.itemsize
+		for i, game in enumerate(games):
+			game.pack_into(self._raw_view, i * itemsize)
+		return self.packed[:len(games)]
+
+	def encode(self, games: Sequence[AzulGame], out: Optional[np.ndarray] = None) -> np.ndarray:
+		"""Kodiert Spiele nach out (oder ein neues Array der Form (len(games), size))"""
+		return self.encode_packed(self.pack(games), out)
+
+	def encode_packed(self, states: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+		"""Kodiert gepackte Zustände (packed_dtype oder uint8-Zeilen aus to_bytes())"""
+		if states.dtype != self.dtype:
+			states = states.view(self.dtype).reshape(len(states))
+		n = len(states)
+		p = self.num_players
+		if out is None:
+			out = np.empty((n, self.size), dtype=np.float32)
+		elif out.shape != (n, self.size):
+			raise ValueError(f"out hat Form {out.shape}, erwartet ({n}, {self.size})")
+
+		# Spielerablagen ab dem Spieler am Zug
+		seats = (states["current_player"][:, None] + np.arange(p)) % p
+		boards = states["boards"][np.arange(n)[:, None], seats]
+
+		pos = 0
+		walls = out[:, pos:pos + 25 * p].reshape(n, p, 25)
+		np.bitwise_and(boards["wall"][:, :, None] >> _WALL_SHIFTS, 1, out=walls, casting="unsafe")
+		pos += 25 * p
+
+		lines = out[:, pos:pos + 25 * p].reshape(n, p, 5, 5)
+		np.equal(boards["line_colors"][..., None], _COLORS, out=lines, casting="unsafe")
+		lines *= (boards["line_counts"] / _CAPACITY)[..., None]
+		pos += 25 * p
+
+		out[:, pos:pos + 5 * p] = boards["floor"].reshape(n, 5 * p)
+		pos += 5 * p
+		out[:, pos:pos + p] = boards["marker"]
+		pos += p
+		out[:, pos] = 1 - states["marker_taken"]
+		pos += 1
+
+		factories = out[:, pos:pos + 20].reshape(n, 5, 4)
+		np.sum(states["factories"][..., None] == _FACTORY_SIZES, axis=1, out=factories)
+		pos += 20
+		out[:, pos:pos + 5] = states["center"]
+		pos += 5
+		out[:, pos:pos + p] = boards["score"]
+		return out
+
+
+class DatasetWriter:
+	"""Schreibt Stellungen, Ergebnisse und Besuchsverteilungen in .npy-Shards
+
+	Je Shard gibt es features-NNNNN.npy (N, size), value-NNNNN.npy (N, Spieler)
+	und policy-NNNNN.npy (N, MOVE_CODES); dataset.json hält Spielerzahl und
+	Belegung der Shards. Ein vorhandenes Verzeichnis wird fortgesetzt.
+
+	Ablauf je Partie: add(game, visits) für jede Stellung (der Zustand wird sofort
+	gepackt), am Ende end_game(result) mit dem Ergebnis je Sitzplatz, z.B.
+	mcts.game_result(game).
+	"""
+
+	def __init__(self, directory: str, num_players: int, shard_size: int = 1 << 16):
+		self.directory = directory
+		self.encoder = FeatureEncoder(num_players)
+		self.num_players = num_players
+		self.shard_size = shard_size
+		self.shards: List[int] = []
+
+		os.makedirs(directory, exist_ok=True)
+		meta_path = os.path.join(directory, "dataset.json")
+		if os.path.exists(meta_path):
+			with open(meta_path) as f:
+				meta = json.load(f)
+			if meta["num_players"] != num_players or meta["feature_size"] != self.encoder.size:
+				raise ValueError(f"{directory} enthält Daten für {meta['num_players']} Spieler")
+			self.shard_size = meta["shard_size"]
+			self.shards = meta["shards"]
+
+		self._open = None
+		self._pending = 0
+		self._policy = np.zeros((64, MOVE_CODES), dtype=np.float32)
+		self.positions = sum(self.shards)
+
+	def add(self, game: AzulGame, visits: Optional[Dict[Move, int]] = None):
+		"""Merkt sich die aktuelle Stellung; visits sind die Besuche je Zug (z.B. der MCTS-Wurzel)"""
+		k = self._pending
+		self.encoder.pack_into(game, k)
+		if k == len(self._policy):
+			self._policy = np.concatenate([self._policy, np.zeros_like(self._policy)])
+
+		row = self._policy[k]
+		row[:] = 0
+		if visits:
+			total = sum(visits.values())
+			for move, count in visits.items():
+				row[encode_move(move)] = count / total
+		self._pending = k + 1
+
+	def end_game(self, result: Sequence[float]):
+		"""Schreibt die gemerkten Stellungen der Partie mit ihrem Ergebnis"""
+		done = 0
+		packed = self.encoder.packed[:self._pending]
+		result = np.asarray(result, dtype=np.float32)
+		seats = (packed["current_player"][:, None] + np.arange(self.num_players)) % self.num_players
+		while done < len(packed):
+			index, start = self._shard_with_room()
+			n = min(len(packed) - done, self.shard_size - start)
+			features, value, policy = self._open[1:]
+			rows = slice(start, start + n)
+			self.encoder.encode_packed(packed[done:done + n], features[rows])
+			value[rows] = result[seats[done:done + n]]
+			policy[rows] = self._policy[done:done + n]
+			self.shards[index] = start + n
+			done += n
+		self.positions += done
+		self._pending = 0
+
+	def _shard_with_room(self) -> Tuple[int, int]:
+		"""(Shard-Nummer, erste freie Zeile), legt bei Bedarf einen neuen Shard an"""
+		if not self.shards or self.shards[-1] == self.shard_size:
+			self._close_shard()
+			self.shards.append(0)
+			self._write_meta()
+		index = len(self.shards) - 1
+		if self._open is None or self._open[0] != index:
+			self._close_shard()
+			mode = "r+" if os.path.exists(_shard_path(self.directory, "features", index)) else "w+"
+			shapes = {"features": self.encoder.size, "value": self.num_players, "policy": MOVE_CODES}
+			arrays = [open_memmap(_shard_path(self.directory, name, index), mode=mode, dtype=np.float32,
+			                      shape=(self.shard_size, width) if mode == "w+" else None)
+			          for name, width in shapes.items()]
+			self._open = (index, *arrays)
+		return index, self.shards[index]
+
+	def _close_shard(self):
+		if self._open is not None:
+			for array in self._open[1:]:
+				array.flush()
+			self._open = None
+			self._write_meta()
+
+	def _write_meta(self):
+		meta = {"num_players": self.num_players, "feature_size": self.encoder.size,
+		        "shard_size": self.shard_size, "shards": self.shards}
+		tmp = os.path.join(self.directory, "dataset.json.tmp")
+		with open(tmp, "w") as f:
+			json.dump(meta, f)
+		os.replace(tmp, os.path.join(self.directory, "dataset.json"))
+
+	def close(self):
+		"""Schreibt offene Shards zurück; nicht abgeschlossene Partien gehen verloren"""
+		self._close_shard()
+		self._pending = 0
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+def _shard_path(directory: str, name: str, index: int) -> str:
+	return os.path.join(directory, f"{name}-{index:05d}.npy")
+
+
+class Dataset:
+	"""Liest einen mit DatasetWriter geschriebenen Datensatz über memory-mapped Shards
+
+	dataset[a:b] liefert (features, value, policy); liegt der Ausschnitt in einem
+	Shard, sind das Sichten auf die Datei, sonst Kopien.
+	"""
+
+	def __init__(self, directory: str):
+		with open(os.path.join(directory, "dataset.json")) as f:
+			meta = json.load(f)
+		self.num_players = meta["num_players"]
+		self.feature_size = meta["feature_size"]
+		self.shards = [
+			tuple(np.load(_shard_path(directory, name, i), mmap_mode="r")[:count]
+			      for name in ("features", "value", "policy"))
+			for i, count in enumerate(meta["shards"]) if count
+		]
+		self._starts = np.cumsum([0] + [len(shard[0]) for shard in self.shards])
+
+	def __len__(self) -> int:
+		return int(self._starts[-1])
+
+	def __getitem__(self, index: Union[int, slice]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+		if isinstance(index, slice):
+			start, stop, step = index.indices(len(self))
+			if step != 1:
+				raise ValueError("Nur zusammenhängende Ausschnitte")
+		else:
+			if index < 0:
+				index += len(self)
+			if not 0 <= index < len(self):
+				raise IndexError(index)
+			start, stop = index, index + 1
+		if stop <= start:
+			return (np.empty((0, self.feature_size), np.float32), np.empty((0, self.num_players), np.float32),
+			        np.empty((0, MOVE_CODES), np.float32))
+
+		first = int(np.searchsorted(self._starts, start, side="right")) - 1
+		last = int(np.searchsorted(self._starts, stop - 1, side="right")) - 1
+		parts = [tuple(array[max(start, self._starts[i]) - self._starts[i]:stop - self._starts[i]]
+		               for array in self.shards[i]) for i in range(first, last + 1)]
+		if len(parts) == 1:
+			features, value, policy = parts[0]
+		else:
+			features, value, policy = (np.concatenate(arrays) for arrays in zip(*parts))
+		if not isinstance(index, slice):
+			return features[0], value[0], policy[0]
+		return features, value, policy
+
+	def batches(self, batch_size: int) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+		"""Stapel in Dateireihenfolge, ohne Kopien (der letzte Stapel eines Shards kann kürzer sein)"""
+		for shard in self.shards:
+			for start in range(0, len(shard[0]), batch_size):
+				yield tuple(array[start:start + batch_size] for array in shard)
@@ -0,0 +1,300 @@
+"""Exakter Löser für die letzte Runde.
+
+Innerhalb einer Runde gibt es keinen Zufall mehr; endet die Partie mit dieser
+Runde (eine Wandreihe wird voll) oder gibt es keine Nachfüllung mehr, ist der Rest
+ein Spiel mit vollständiger Information. EndgameSolver durchsucht ihn vollständig:
+
+- 2 Spieler: Alpha-Beta auf den Punktabstand
+- 3-4 Spieler: paranoid (der Spieler am Zug gegen alle anderen, Alpha-Beta auf
+  den Abstand zum besten Gegner) oder max-n (jeder maximiert seinen eigenen
+  Abstand, ohne Schnitte)
+
+Die Suche vertieft iterativ (Halbzüge). Am Horizont und an Rundenenden, nach
+denen die Partie mit zufälliger Nachfüllung weitergeht, wird mit
+PlayerBoard.projected_tiling() geschätzt; das Ergebnis ist dann nicht exakt.
+Stellungen werden über canonical_hash in einer TranspositionTable gespeichert,
+in einem eigenen Schlüsselraum je Suchart; die Tabelle kann daher auch mit
+alphabeta.AlphaBetaPlayer geteilt werden.
+"""
+import time
+from typing import List, Optional, Tuple
+
+from engine import HASH_MASK, AzulGame, GamePhase, Move, CENTER, FLOOR, wall_end_game_bonus
+from transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+# Tiefe für Einträge, deren Teilbaum vollständig durchsucht wurde
+_COMPLETE = 255
+# Eigene Schlüsselräume in der Tabelle: paranoide Suchen je Wurzelspieler (Index 0-3)
+# und max-n (Index 4). Kein Salz ist 0, damit die Einträge des Lösers, die Punktzahlen
+# statt eines einzelnen Werts halten, nie unter den Schlüsseln anderer Suchspieler liegen.
+_ROOT_KEYS = tuple((i + 1) * 0x9E3779B97F4A7C15 & HASH_MASK for i in range(5))
+_MAXN_KEY = _ROOT_KEYS[4]
+
+
+class _BudgetExceeded(Exception):
+	pass
+
+
+class SolveResult:
+	"""Ergebnis von EndgameSolver.solve()
+
+	scores sind die Endpunktzahlen der Hauptvariante, margins je Spieler der
+	Abstand zum besten Mitspieler. exact ist True, wenn alle Blätter Spielenden
+	waren und das Knotenbudget gereicht hat.
+	"""
+
+	def __init__(self, move: Optional[Move], scores: List[int], exact: bool, depth: int,
+	             nodes: int, elapsed: float):
+		self.move = move
+		self.scores = scores
+		self.exact = exact
+		self.depth = depth
+		self.nodes = nodes
+		self.elapsed = elapsed
+
+	@property
+	def margins(self) -> List[int]:
+		return score_margins(self.scores)
+
+	@property
+	def nodes_per_sec(self) -> float:
+		return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+	def __repr__(self):
+		return (f"SolveResult(move={self.move}, scores={self.scores}, exact={self.exact}, "
+		        f"depth={self.depth}, nodes={self.nodes}, nodes/s={self.nodes_per_sec:.0f})")
+
+
+def score_margins(scores: List[int]) -> List[int]:
+	"""Abstand jedes Spielers zum besten anderen Spieler"""
+	return [s - max(scores[:i] + scores[i + 1:]) for i, s in enumerate(scores)]
+
+
+def final_scores(game: AzulGame) -> Tuple[List[int], bool]:
+	"""(Punktzahlen, exakt) für ein Blatt der Suche
+
+	Am Spielende und ohne legale Züge sind die Punkte endgültig; sonst werden sie
+	über projected_tiling() samt Endwertung geschätzt.
+	"""
+	if game.phase == GamePhase.GAME_END or not game.legal_moves():
+		return [p.score for p in game.players], True
+	projected = [p.projected_tiling() for p in game.players]
+	return [score + wall_end_game_bonus(bits) for score, bits in projected], False
+
+
+def order_moves(game: AzulGame, moves: List[Move], first: Optional[Move] = None) -> List[Move]:
+	"""Sortiert Züge nach Aussicht: Reihe vervollständigen, passend legen, Bodenreihe zuletzt
+
+	first (z.B. der beste Zug aus der Transpositionstabelle) kommt an den Anfang.
+	"""
+	player = game.players[game.current_player]
+	center = game.center_counts
+	factories = game.factories
+
+	def priority(move: Move) -> int:
+		source, c, line = move
+		count = center[c] if source == CENTER else factories[source].counts[c]
+		marker = source == CENTER and not game.first_player_marker_taken
+		if line == FLOOR:
+			return -3 * count - marker
+		space = line + 1 - player.line_counts[line]
+		placed = min(count, space)
+		return 4 * (count >= space) + 2 * placed - 3 * (count - placed) - marker
+
+	ordered = sorted(moves, key=priority, reverse=True)
+	if first is not None and first in moves:
+		ordered.remove(first)
+		ordered.insert(0, first)
+	return ordered
+
+
+class EndgameSolver:
+	"""Durchsucht den Rest der laufenden Runde
+
+	max_nodes begrenzt die besuchten Knoten; wird es überschritten, gilt das
+	Ergebnis der letzten vollständigen Iteration (exact = False). mode wählt für
+	3-4 Spieler "paranoid" oder "maxn".
+	"""
+
+	def __init__(self, max_nodes: Optional[int] = 2_000_000, mode: str = "paranoid",
+	             table: Optional[TranspositionTable] = None):
+		if mode not in ("paranoid", "maxn"):
+			raise ValueError(f"Unbekannter Modus: {mode}")
+		self.max_nodes = max_nodes
+		self.mode = mode
+		self.table = table if table is not None else TranspositionTable()
+		self.nodes = 0
+		self.last_result: Optional[SolveResult] = None
+
+	def choose_move(self, game: AzulGame) -> Move:
+		result = self.solve(game)
+		if result.move is None:
+			raise ValueError("Keine legalen Züge")
+		return result.move
+
+	def advance(self, move: Move):
+		pass
+
+	def reset(self):
+		self.table.clear()
+
+	def solve(self, game: AzulGame) -> SolveResult:
+		"""Sucht den besten Zug und die Endpunktzahlen bei bestem Spiel aller Spieler"""
+		start = time.perf_counter()
+		self.nodes = 0
+		self.table.new_search()
+		self._round = game.round
+		self._root = game.current_player
+		maxn = self.mode == "maxn" and game.num_players > 2
+		self._salt = _MAXN_KEY if maxn else _ROOT_KEYS[self._root]
+
+		moves = game.legal_moves()
+		if not moves:
+			scores, exact = final_scores(game)
+			self.last_result = SolveResult(None, scores, exact, 0, 0, time.perf_counter() - start)
+			return self.last_result
+
+		# Obergrenze der Halbzüge: jeder Zug nimmt mindestens eine Fliese
+		max_depth = game.center_total + sum(f.total for f in game.factories)
+
+		result = SolveResult(order_moves(game, moves)[0], [p.score for p in game.players], False, 0, 0, 0.0)
+		for depth in range(1, max_depth + 1):
+			self._exact = True
+			try:
+				if maxn:
+					scores, complete, move = self._maxn(game, depth)
+				else:
+					_, scores, complete, move = self._alphabeta(game, depth, -10 ** 6, 10 ** 6)
+			except _BudgetExceeded:
+				break
+			result = SolveResult(move, scores, complete and self._exact, depth, 0, 0.0)
+			if complete:
+				break
+
+		result.nodes = self.nodes
+		result.elapsed = time.perf_counter() - start
+		self.last_result = result
+		return result
+
+	def _leaf(self, game: AzulGame) -> Optional[Tuple[List[int], bool]]:
+		"""Blattwert, wenn die Runde (oder Partie) vorbei ist, sonst None"""
+		if game.phase == GamePhase.GAME_END or game.round != self._round:
+			if game.phase == GamePhase.GAME_END:
+				return [p.score for p in game.players], True
+			# Partie geht mit neuer Nachfüllung weiter: Punkte nach Endwertung schätzen
+			exact = not game.legal_moves()
+			return [p.score + (0 if exact else p.end_game_bonus) for p in game.players], exact
+		return None
+
+	def _count_node(self):
+		self.nodes += 1
+		if self.max_nodes is not None and self.nodes > self.max_nodes:
+			raise _BudgetExceeded
+
+	def _value(self, scores: List[int]) -> int:
+		"""Wert aus Sicht des Wurzelspielers: Abstand zum besten Gegner"""
+		root = self._root
+		return scores[root] - max(s for i, s in enumerate(scores) if i != root)
+
+	def _alphabeta(self, game: AzulGame, depth: int, alpha: int, beta: int):
+		"""Gibt (Wert, Punktzahlen, vollständig, bester Zug) zurück; Wert aus Sicht des Wurzelspielers"""
+		self._count_node()
+		leaf = self._leaf(game)
+		if leaf is None:
+			moves = game.legal_moves()
+			if not moves:
+				leaf = [p.score for p in game.players], True
+		if leaf is not None:
+			scores, exact = leaf
+			self._exact &= exact
+			return self._value(scores), scores, True, None
+		if depth == 0:
+			scores, _ = final_scores(game)
+			return self._value(scores), scores, False, None
+
+		key = game.canonical_hash ^ self._salt
+		entry = self.table.lookup(key)
+		hint = None
+		if entry is not None:
+			_, entry_depth, (value, scores, exact), flag, hint, _ = entry
+			if entry_depth >= depth:
+				if (flag == EXACT or flag == LOWER_BOUND and value >= beta
+				        or flag == UPPER_BOUND and value <= alpha):
+					self._exact &= exact
+					return value, scores, entry_depth == _COMPLETE, hint
+
+		maximize = game.current_player == self._root
+		alpha0, beta0 = alpha, beta
+		best = best_scores = best_move = None
+		complete = True
+		exact_before, self._exact = self._exact, True
+		for move in order_moves(game, moves, hint):
+			game.apply(move)
+			try:
+				value, scores, child_complete, _ = self._alphabeta(game, depth - 1, alpha, beta)
+			finally:
+				game.undo(move)
+			complete &= child_complete
+			if best is None or (value > best if maximize else value < best):
+				best, best_scores, best_move = value, scores, move
+			if maximize:
+				alpha = max(alpha, value)
+			else:
+				beta = min(beta, value)
+			if alpha >= beta:
+				break
+
+		if best <= alpha0:
+			flag = UPPER_BOUND
+		elif best >= beta0:
+			flag = LOWER_BOUND
+		else:
+			flag = EXACT
+		self.table.store(key, _COMPLETE if complete else depth, (best, best_scores, self._exact), flag, best_move)
+		self._exact &= exact_before
+		return best, best_scores, complete, best_move
+
+	def _maxn(self, game: AzulGame, depth: int):
+		"""Gibt (Punktzahlen, vollständig, bester Zug) zurück; jeder Spieler maximiert seinen Abstand"""
+		self._count_node()
+		leaf = self._leaf(game)
+		if leaf is None:
+			moves = game.legal_moves()
+			if not moves:
+				leaf = [p.score for p in game.players], True
+		if leaf is not None:
+			scores, exact = leaf
+			self._exact &= exact
+			return scores, True, None
+		if depth == 0:
+			scores, _ = final_scores(game)
+			return scores, False, None
+
+		key = game.canonical_hash ^ self._salt
+		entry = self.table.lookup(key)
+		hint = None
+		if entry is not None:
+			_, entry_depth, (scores, exact), _, hint, _ = entry
+			if entry_depth >= depth:
+				self._exact &= exact
+				return scores, entry_depth == _COMPLETE, hint
+
+		player = game.current_player
+		best = best_scores = best_move = None
+		complete = True
+		exact_before, self._exact = self._exact, True
+		for move in order_moves(game, moves, hint):
+			game.apply(move)
+			try:
+				scores, child_complete, _ = self._maxn(game, depth - 1)
+			finally:
+				game.undo(move)
+			complete &= child_complete
+			# Gleichstände unabhängig von der Zugreihenfolge auflösen: höhere eigene Punktzahl, dann kleinerer Zug
+			value = score_margins(scores)[player], scores[player]
+			if best is None or value > best or value == best and move < best_move:
+				best, best_scores, best_move = value, scores, move
+
+		self.table.store(key, _COMPLETE if complete else depth, (best_scores, self._exact), EXACT, best_move)
+		self._exact &= exact_before
+		return best_scores, complete, best_move
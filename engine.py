@@ -0,0 +1,1475 @@
+"""Azul-Spiellogik ohne GUI-Abhängigkeiten.
+
+Das Modul importiert bewusst nur die Standardbibliothek (kein tkinter), damit
+die Regel-Engine auch auf headless Rechnern und in kurzlebigen Worker-Prozessen
+schnell geladen werden kann.
+"""
+import itertools
+import random
+import struct
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class TileColor(Enum):
+	"""Die 5 Fliesenfarben im Spiel"""
+	BLUE = "#0066CC"
+	YELLOW = "#FFD700"
+	RED = "#CC0000"
+	BLACK = "#2C2E3B"
+	WHITE = "#E0E0E0"
+
+
+# Farbindex in Reihenfolge von TileColor; ein Farbindex c liegt in Wandreihe r in Spalte (r + c) % 5
+COLORS = tuple(TileColor)
+COLOR_INDEX = {color: i for i, color in enumerate(COLORS)}
+
+
+class GamePhase(Enum):
+	"""Spielphasen"""
+	PATTERN = "Musterphase"
+	TILING = "Fliesungsphase"
+	PREPARATION = "Vorbereitung"
+	GAME_END = "Spielende"
+
+
+class Tile:
+	"""Repräsentiert eine einzelne Fliese
+
+	Fliesen sind unveränderlich und werden geteilt (Fliegengewicht): Tile(color)
+	liefert für jede Farbe immer dasselbe Objekt.
+	"""
+	__slots__ = ("color",)
+	_instances = {}
+
+	def __new__(cls, color: TileColor):
+		tile = cls._instances.get(color)
+		if tile is None:
+			tile = super().__new__(cls)
+			tile.color = color
+			cls._instances[color] = tile
+		return tile
+
+	def __reduce__(self):
+		return Tile, (self.color,)
+
+
+# TILES[c]: die geteilte Fliese zum Farbindex c
+TILES = tuple(Tile(color) for color in COLORS)
+
+
+def tiles_from_counts(counts: List[int]) -> List[Tile]:
+	"""Erzeugt eine Fliesen-Liste aus Zählern pro Farbe"""
+	return [TILES[c] for c in range(5) for _ in range(counts[c])]
+
+
+class Factory:
+	"""Manufakturplättchen
+
+	Die Fliesen liegen als Zähler pro Farbe vor (counts); tiles ist eine Sicht darauf.
+	"""
+	__slots__ = ("counts", "total")
+
+	def __init__(self):
+		self.counts = [0] * 5
+		self.total = 0
+
+	@property
+	def tiles(self) -> List[Tile]:
+		return tiles_from_counts(self.counts)
+
+	def add_tiles(self, tiles: List[Tile]):
+		for tile in tiles:
+			self.counts[COLOR_INDEX[tile.color]] += 1
+		self.total += len(tiles)
+
+	def take_color(self, color: TileColor) -> Tuple[List[Tile], List[Tile]]:
+		"""Nimmt alle Fliesen einer Farbe, gibt (genommene, übrige) zurück"""
+		c = COLOR_INDEX[color]
+		taken = [TILES[c]] * self.counts[c]
+		self.counts[c] = 0
+		remaining = self.tiles
+		self.clear()
+		return taken, remaining
+
+	def clear(self):
+		self.counts = [0] * 5
+		self.total = 0
+
+	def clone(self) -> "Factory":
+		factory = Factory.__new__(Factory)
+		factory.counts = self.counts[:]
+		factory.total = self.total
+		return factory
+
+
+class WallPattern:
+	"""Das Wandmuster - 5x5 Grid mit festem Farbmuster"""
+	# Festes Muster wie auf der Spielerablage
+	PATTERN = [
+		[TileColor.BLUE, TileColor.YELLOW, TileColor.RED, TileColor.BLACK, TileColor.WHITE],
+		[TileColor.WHITE, TileColor.BLUE, TileColor.YELLOW, TileColor.RED, TileColor.BLACK],
+		[TileColor.BLACK, TileColor.WHITE, TileColor.BLUE, TileColor.YELLOW, TileColor.RED],
+		[TileColor.RED, TileColor.BLACK, TileColor.WHITE, TileColor.BLUE, TileColor.YELLOW],
+		[TileColor.YELLOW, TileColor.RED, TileColor.BLACK, TileColor.WHITE, TileColor.BLUE]
+	]
+
+
+# Züge: (Quelle, Farbindex, Musterreihe); Quelle CENTER = Tischmitte, Musterreihe FLOOR = Bodenreihe
+Move = Tuple[int, int, int]
+CENTER = -1
+FLOOR = -1
+# Anzahl der Zugcodes (encode_move): 10 Quellen x 5 Farben x 6 Ziele
+MOVE_CODES = 10 * 5 * 6
+
+
+def encode_move(move: Move) -> int:
+	"""Zug als Zahl in range(MOVE_CODES)"""
+	source, c, line = move
+	return ((source + 1) * 5 + c) * 6 + line + 1
+
+
+def decode_move(code: int) -> Move:
+	"""Umkehrung von encode_move"""
+	rest, line = divmod(code, 6)
+	source, c = divmod(rest, 5)
+	return source - 1, c, line - 1
+
+
+# Bitboards: Wandfeld (row, col) entspricht Bit row * 5 + col
+FULL_WALL = (1 << 25) - 1
+ROW_MASKS = tuple(0b11111 << (row * 5) for row in range(5))
+COL_MASKS = tuple(sum(1 << (row * 5 + col) for row in range(5)) for col in range(5))
+COLOR_MASKS = tuple(sum(1 << (row * 5 + (row + c) % 5) for row in range(5)) for c in range(5))
+# WALL_BITS[row][c]: Bit der Farbe c in Wandreihe row
+WALL_BITS = tuple(tuple(1 << (row * 5 + (row + c) % 5) for c in range(5)) for row in range(5))
+
+
+def _run_length(mask: int, pos: int) -> int:
+	"""Länge der zusammenhängenden Gruppe um Position pos in einer 5-Bit-Reihe"""
+	start = pos
+	while start > 0 and mask >> (start - 1) & 1:
+		start -= 1
+	end = pos
+	while end < 4 and mask >> (end + 1) & 1:
+		end += 1
+	return end - start + 1
+
+
+# RUN_LENGTH[mask][pos]: Gruppengröße um pos, wenn pos in der 5-Bit-Reihe mask belegt ist
+RUN_LENGTH = tuple(tuple(_run_length(mask | 1 << pos, pos) for pos in range(5)) for mask in range(32))
+# PLACEMENT_SCORE[h][v]: Punkte für eine Fliese mit horizontaler Gruppe h und vertikaler Gruppe v
+PLACEMENT_SCORE = tuple(tuple(1 if h == 1 and v == 1 else (h if h > 1 else 0) + (v if v > 1 else 0)
+                              for v in range(6)) for h in range(6))
+# Spalte col einer Wand: (bits >> col) & COL_MASKS[0] ergibt die Bits 0, 5, ..., 20 -> 5-Bit-Maske
+COLUMN_MASK = {sum(1 << (row * 5) for row in range(5) if mask >> row & 1): mask for mask in range(32)}
+
+
+# WALL_ROW_COLORS[row][mask]: Farbmaske der belegten Felder einer Wandreihe (5-Bit-Reihe mask)
+WALL_ROW_COLORS = tuple(tuple(sum(1 << (col - row) % 5 for col in range(5) if mask >> col & 1) for mask in range(32))
+                        for row in range(5))
+# Ziel-Bitboard (PlayerBoard.target_bits): Bit c * 5 + line = Musterreihe line nimmt Farbe c auf.
+# TARGET_SPREAD[line][colors]: Bits der Musterreihe line für alle Farben der 5-Bit-Maske colors
+TARGET_SPREAD = tuple(tuple(sum(1 << (c * 5 + line) for c in range(5) if colors >> c & 1) for colors in range(32))
+                      for line in range(5))
+TARGET_LINE_MASKS = tuple(spread[31] for spread in TARGET_SPREAD)
+# MASK_LINES[mask]: gesetzte Positionen einer 5-Bit-Maske, z.B. die passenden Musterreihen
+MASK_LINES = tuple(tuple(i for i in range(5) if mask >> i & 1) for mask in range(32))
+
+
+def wall_tile_score(bits: int, row: int, col: int) -> int:
+	"""Punkte für die Fliese (row, col) auf der Wand bits (Fliese bereits gesetzt)"""
+	h = RUN_LENGTH[bits >> (row * 5) & 0b11111][col]
+	v = RUN_LENGTH[COLUMN_MASK[bits >> col & COL_MASKS[0]]][row]
+	return PLACEMENT_SCORE[h][v]
+
+
+def wall_end_game_bonus(bits: int) -> int:
+	"""Endspiel-Bonus einer Wand: 2 je Reihe, 7 je Spalte, 10 je vollständiger Farbe"""
+	bonus = 0
+	for i in range(5):
+		if bits & ROW_MASKS[i] == ROW_MASKS[i]:
+			bonus += 2
+		if bits & COL_MASKS[i] == COL_MASKS[i]:
+			bonus += 7
+		if bits & COLOR_MASKS[i] == COLOR_MASKS[i]:
+			bonus += 10
+	return bonus
+
+
+# Minuspunkte der Bodenreihe, kumuliert nach Anzahl belegter Felder (max. 7)
+FLOOR_PENALTIES = (-1, -1, -2, -2, -2, -3, -3)
+FLOOR_PENALTY_TOTAL = tuple(sum(FLOOR_PENALTIES[:n]) for n in range(8))
+
+
+# Zobrist-Schlüssel (fester Seed, damit Hashes prozessübergreifend gleich sind).
+# Zähler-Tabellen haben für die Anzahl 0 den Schlüssel 0, leere Felder tragen also nichts bei.
+# Alle Schlüssel werden mit einem einzigen getrandbits gezogen (kurze Importzeit): dessen
+# 64-Bit-Blöcke sind, vom niederwertigen Ende an, genau die Werte einzelner getrandbits(64).
+_ZOBRIST_POOL_SIZE = 6000
+_zobrist_pool = iter(struct.unpack(f"<{_ZOBRIST_POOL_SIZE}Q", random.Random(0x5A2B).getrandbits(
+	64 * _ZOBRIST_POOL_SIZE).to_bytes(8 * _ZOBRIST_POOL_SIZE, "little")))
+
+
+def _zobrist_keys(*shape: int):
+	if len(shape) == 1:
+		return tuple(itertools.islice(_zobrist_pool, shape[0]))
+	return tuple(_zobrist_keys(*shape[1:]) for _ in range(shape[0]))
+
+
+def _zobrist_count_keys(*shape: int, counts: int):
+	"""Schlüssel je (..., Anzahl) mit Anzahl 0 -> 0"""
+	if not shape:
+		return (0,) + _zobrist_keys(counts - 1)
+	return tuple(_zobrist_count_keys(*shape[1:], counts=counts) for _ in range(shape[0]))
+
+
+MAX_PLAYERS = 4
+MAX_FACTORIES = 9
+ZOBRIST_WALL = _zobrist_keys(MAX_PLAYERS, 25)
+ZOBRIST_LINE = _zobrist_count_keys(MAX_PLAYERS, 5, 5, counts=6)  # [Spieler][Reihe][Farbe][Anzahl]
+ZOBRIST_FLOOR = _zobrist_count_keys(MAX_PLAYERS, 5, counts=21)  # [Spieler][Farbe][Anzahl]
+ZOBRIST_SCORE = _zobrist_keys(MAX_PLAYERS, 256)  # Punkte modulo 256
+ZOBRIST_MARKER = _zobrist_keys(MAX_PLAYERS)  # Spieler hält den Startspielermarker
+ZOBRIST_FACTORY = _zobrist_count_keys(MAX_FACTORIES, 5, counts=5)  # [Manufaktur][Farbe][Anzahl]
+ZOBRIST_CENTER = _zobrist_count_keys(5, counts=21)  # [Farbe][Anzahl]
+# Reihenfolgefreier Manufaktur-Anteil: Schlüssel je Inhalt (Code zur Basis 5), summiert modulo 2^64
+ZOBRIST_FACTORY_CONTENT = (0,) + _zobrist_keys(5 ** 5 - 1)
+ZOBRIST_CURRENT_PLAYER = _zobrist_keys(MAX_PLAYERS)
+ZOBRIST_MARKER_TAKEN, ZOBRIST_GAME_END = _zobrist_keys(2)
+del _zobrist_pool
+
+HASH_MASK = (1 << 64) - 1
+
+# Gepackter Zustand (AzulGame.to_bytes), feste Länge je Spielerzahl:
+#   <BBBBH  Spieler, aktueller Spieler, Phase, Startspielermarker genommen, Runde
+#   15B     Tischmitte, Beutel, Ablage (Zähler pro Farbe)
+#   5B      je Manufaktur
+#   <Ih5b5B5BB je Spielerablage: Wand, Punkte, Farben und Belegung der Musterreihen,
+#           Bodenreihe pro Farbe, Startspielermarker
+PHASES = tuple(GamePhase)
+PHASE_INDEX = {phase: i for i, phase in enumerate(PHASES)}
+FACTORY_COUNT = {2: 5, 3: 7, 4: 9}
+_PACKED_HEAD = "<BBBBH15B"
+_PACKED_PLAYER = "Ih5b5B5BB"
+PACKED = {n: struct.Struct(_PACKED_HEAD + "5B" * FACTORY_COUNT[n] + _PACKED_PLAYER * n) for n in FACTORY_COUNT}
+_PACKED_PLAYER_OFFSET = {n: struct.calcsize(_PACKED_HEAD + "5B" * FACTORY_COUNT[n]) for n in FACTORY_COUNT}
+_PACKED_PLAYER_SIZE = struct.calcsize("<" + _PACKED_PLAYER)
+
+
+def _packed_players(data) -> int:
+	"""Spielerzahl eines Puffers aus to_bytes(); ValueError, wenn Größe, Phase oder Spieler am Zug nicht passen"""
+	num_players = data[0] if len(data) else 0
+	if num_players not in PACKED or len(data) != PACKED[num_players].size:
+		raise ValueError(f"Kein gepackter Spielzustand ({len(data)} Bytes)")
+	if data[2] >= len(PHASES):
+		raise ValueError(f"Ungültige Phase {data[2]}")
+	if data[1] >= num_players:
+		raise ValueError(f"Ungültiger Spieler am Zug {data[1]} bei {num_players} Spielern")
+	return num_players
+
+
+# Änderungsereignisse (AzulGame.events), je Ereignis ein flaches Tupel (Art, Felder...):
+EVENT_TURN = 0  # Spieler: ist am Zug
+EVENT_FACTORY_TAKEN = 1  # Manufaktur, Farbe, Rest pro Farbe (5): Farbe genommen, Rest in die Tischmitte
+EVENT_CENTER_TAKEN = 2  # Farbe, Anzahl, Spieler mit Startspielermarker (-1 = keiner)
+EVENT_LINE = 3  # Spieler, Reihe, Farbe, Anzahl: Musterreihe gesetzt
+EVENT_FLOOR = 4  # Spieler, Farbe, Anzahl: Bodenreihe der Farbe gesetzt
+EVENT_WALL = 5  # Spieler, Reihe, Farbe, Punkte: Wandfliese gesetzt
+EVENT_SCORE = 6  # Spieler, Punkte: Punktestand gesetzt
+EVENT_ROUND = 7  # Runde, Startspieler: neue Runde, Startspielermarker zurück in die Mitte
+EVENT_REFILL = 8  # Zähler pro Farbe aller Manufakturen (5 je Manufaktur)
+EVENT_SUPPLY = 9  # Beutel pro Farbe (5), Ablage pro Farbe (5)
+EVENT_GAME_END = 10
+# Kompakte Kodierung (encode_events): ein Byte Art, dann die Felder in diesem Format;
+# EVENT_REFILL hat ein Byte Manufakturanzahl und danach ein Byte je Zähler
+EVENT_FORMATS = {
+	EVENT_TURN: "B", EVENT_FACTORY_TAKEN: "BB5B", EVENT_CENTER_TAKEN: "BBb", EVENT_LINE: "BBbB",
+	EVENT_FLOOR: "BBB", EVENT_WALL: "BBBB", EVENT_SCORE: "Bh", EVENT_ROUND: "BB", EVENT_SUPPLY: "10B",
+	EVENT_GAME_END: "",
+}
+_EVENT_STRUCTS = {kind: struct.Struct("<B" + fmt) for kind, fmt in EVENT_FORMATS.items()}
+
+
+def factory_code(counts: List[int]) -> int:
+	"""Kennzahl eines Manufakturinhalts (Zähler pro Farbe zur Basis 5, 0 = leer)"""
+	return counts[0] + 5 * counts[1] + 25 * counts[2] + 125 * counts[3] + 625 * counts[4]
+
+
+def encode_events(events: Iterable[tuple]) -> bytes:
+	"""Kodiert Änderungsereignisse kompakt (siehe EVENT_FORMATS), typisch 10–20 Bytes pro Zug"""
+	out = bytearray()
+	for event in events:
+		if event[0] == EVENT_REFILL:
+			out += bytes((EVENT_REFILL, (len(event) - 1) // 5))
+			out += bytes(event[1:])
+		else:
+			out += _EVENT_STRUCTS[event[0]].pack(*event)
+	return bytes(out)
+
+
+def decode_events(data) -> List[tuple]:
+	"""Gegenstück zu encode_events (bytes, bytearray oder memoryview)"""
+	events = []
+	pos = 0
+	try:
+		while pos < len(data):
+			kind = data[pos]
+			if kind == EVENT_REFILL:
+				end = pos + 2 + 5 * data[pos + 1]
+				if end > len(data):
+					raise ValueError("Änderungsereignisse abgeschnitten")
+				events.append((kind,) + tuple(data[pos + 2:end]))
+				pos = end
+			elif kind in _EVENT_STRUCTS:
+				layout = _EVENT_STRUCTS[kind]
+				events.append(layout.unpack_from(data, pos))
+				pos += layout.size
+			else:
+				raise ValueError(f"Unbekanntes Änderungsereignis {kind}")
+	except (IndexError, struct.error):
+		raise ValueError("Änderungsereignisse abgeschnitten") from None
+	return events
+
+
+class PlayerBoard:
+	"""Spielerablage mit Musterreihen, Wand und Bodenreihe
+
+	Der Zustand ist kompakt gespeichert: die Wand als 25-Bit-Integer, jede
+	Musterreihe als (Farbindex, Anzahl) und die Bodenreihe als Zähler pro Farbe.
+	wall, pattern_lines und floor_line liefern weiterhin die Fliesen-Sicht.
+
+	_hash enthält den inkrementell gepflegten Zobrist-Anteil von Wand, Musterreihen
+	und Bodenreihe; Punkte und Startspielermarker kommen in zobrist_hash hinzu.
+	target_bits hält fest, welche Farben jede Musterreihe aufnehmen kann, und wird nur
+	geändert, wenn eine Reihe sich füllt, geleert wird oder eine Wandfliese dazukommt.
+
+	clone() teilt die Listen der Muster- und Bodenreihe mit dem Original; wer zuerst
+	schreibt, kopiert sie vorher (_shared).
+	"""
+	__slots__ = ("player_idx", "_hash", "wall_bits", "line_colors", "line_counts", "target_bits",
+	             "floor_counts", "floor_count", "score", "end_game_bonus", "has_first_player_marker", "_shared")
+
+	def __init__(self, player_idx: int = 0):
+		self.player_idx = player_idx
+		self._hash = 0
+		self.wall_bits = 0  # 5x5 Wand als Bitboard
+		self.line_colors = [-1] * 5  # Farbindex je Musterreihe (-1 = leer)
+		self.line_counts = [0] * 5  # Belegung je Musterreihe (1-5 Plätze)
+		self.target_bits = FULL_WALL  # Farbe c passt in Musterreihe line: Bit c * 5 + line
+		self.floor_counts = [0] * 5  # Bodenreihe als Zähler pro Farbe
+		self.floor_count = 0
+		self.score = 0
+		self.end_game_bonus = 0  # Wird bei jeder Wandfliese fortgeschrieben
+		self.has_first_player_marker = False
+		self._shared = False
+
+	def clone(self) -> "PlayerBoard":
+		"""Kopie der Spielerablage; die Listen werden erst beim Schreiben kopiert"""
+		board = PlayerBoard.__new__(PlayerBoard)
+		board.player_idx = self.player_idx
+		board._hash = self._hash
+		board.wall_bits = self.wall_bits
+		board.line_colors = self.line_colors
+		board.line_counts = self.line_counts
+		board.target_bits = self.target_bits
+		board.floor_counts = self.floor_counts
+		board.floor_count = self.floor_count
+		board.score = self.score
+		board.end_game_bonus = self.end_game_bonus
+		board.has_first_player_marker = self.has_first_player_marker
+		board._shared = self._shared = True
+		return board
+
+	def _unshare(self):
+		"""Eigene Kopien der geteilten Listen anlegen (vor dem ersten Schreiben)"""
+		self.line_colors = self.line_colors[:]
+		self.line_counts = self.line_counts[:]
+		self.floor_counts = self.floor_counts[:]
+		self._shared = False
+
+	@property
+	def wall(self) -> List[List[Optional[Tile]]]:
+		"""5x5 Wand als Fliesen-Sicht (None = leeres Feld)"""
+		bits = self.wall_bits
+		return [[TILES[(col - row) % 5] if bits >> (row * 5 + col) & 1 else None
+		         for col in range(5)] for row in range(5)]
+
+	@property
+	def pattern_lines(self) -> List[List[Tile]]:
+		"""Musterreihen als Fliesen-Sicht"""
+		return [[TILES[c]] * n for c, n in zip(self.line_colors, self.line_counts)]
+
+	@property
+	def floor_line(self) -> List[Tile]:
+		"""Bodenreihe als Fliesen-Sicht"""
+		return tiles_from_counts(self.floor_counts)
+
+	@property
+	def zobrist_hash(self) -> int:
+		"""Zobrist-Hash der Spielerablage"""
+		h = self._hash ^ ZOBRIST_SCORE[self.player_idx][self.score & 0xFF]
+		if self.has_first_player_marker:
+			h ^= ZOBRIST_MARKER[self.player_idx]
+		return h
+
+	def _get_state(self) -> tuple:
+		return (self.wall_bits, self.line_colors[:], self.line_counts[:], self.floor_counts[:],
+		        self.floor_count, self.score, self.end_game_bonus, self.has_first_player_marker, self._hash,
+		        self.target_bits)
+
+	def _set_state(self, state: tuple):
+		(self.wall_bits, line_colors, line_counts, floor_counts,
+		 self.floor_count, self.score, self.end_game_bonus, self.has_first_player_marker, self._hash,
+		 self.target_bits) = state
+		self.line_colors, self.line_counts, self.floor_counts = line_colors[:], line_counts[:], floor_counts[:]
+		self._shared = False
+
+	def _rehash(self):
+		"""Berechnet _hash, floor_count, end_game_bonus und target_bits aus dem Zustand neu"""
+		player = self.player_idx
+		h = 0
+		bits = self.wall_bits
+		while bits:
+			low = bits & -bits
+			h ^= ZOBRIST_WALL[player][low.bit_length() - 1]
+			bits ^= low
+		for line in range(5):
+			h ^= ZOBRIST_LINE[player][line][self.line_colors[line]][self.line_counts[line]]
+		for c in range(5):
+			h ^= ZOBRIST_FLOOR[player][c][self.floor_counts[c]]
+		self._hash = h
+		self.floor_count = sum(self.floor_counts)
+		self.end_game_bonus = wall_end_game_bonus(self.wall_bits)
+		self.target_bits = 0
+		for line in range(5):
+			self.target_bits |= TARGET_SPREAD[line][self._line_accepts(line)]
+
+	def _line_accepts(self, line_idx: int) -> int:
+		"""Farbmaske der Farben, die Musterreihe line_idx aufnehmen kann"""
+		count = self.line_counts[line_idx]
+		if count > line_idx:
+			return 0
+		if count:
+			return 1 << self.line_colors[line_idx]
+		return 31 ^ WALL_ROW_COLORS[line_idx][self.wall_bits >> (line_idx * 5) & 0b11111]
+
+	def _update_targets(self, line_idx: int):
+		self.target_bits = (self.target_bits & ~TARGET_LINE_MASKS[line_idx]
+		                    | TARGET_SPREAD[line_idx][self._line_accepts(line_idx)])
+
+	def _set_line(self, line_idx: int, c: int, count: int):
+		"""Setzt eine Musterreihe auf (Farbindex, Anzahl) und pflegt den Hash"""
+		if self._shared:
+			self._unshare()
+		keys = ZOBRIST_LINE[self.player_idx][line_idx]
+		old_count = self.line_counts[line_idx]
+		self._hash ^= keys[self.line_colors[line_idx]][old_count] ^ keys[c][count]
+		self.line_colors[line_idx] = c
+		self.line_counts[line_idx] = count
+		# Aufnahmefähigkeit ändert sich nur, wenn die Reihe leer oder voll wird bzw. es war
+		if not old_count or not count or old_count > line_idx or count > line_idx:
+			self._update_targets(line_idx)
+
+	def _set_floor(self, c: int, count: int):
+		"""Setzt die Anzahl der Farbe c in der Bodenreihe und pflegt den Hash"""
+		if self._shared:
+			self._unshare()
+		keys = ZOBRIST_FLOOR[self.player_idx][c]
+		old = self.floor_counts[c]
+		self._hash ^= keys[old] ^ keys[count]
+		self.floor_counts[c] = count
+		self.floor_count += count - old
+
+	def has_wall_tile(self, row: int, col: int) -> bool:
+		"""Prüft ob ein Wandfeld belegt ist"""
+		return bool(self.wall_bits >> (row * 5 + col) & 1)
+
+	def can_add_to_pattern_line(self, line_idx: int, color: TileColor) -> bool:
+		"""Prüft ob Fliesen in eine Musterreihe gelegt werden können"""
+		if line_idx < 0 or line_idx >= 5:
+			return False
+		return self._can_add(line_idx, COLOR_INDEX[color])
+
+	def _can_add(self, line_idx: int, c: int) -> bool:
+		# Reihe nicht voll, leer oder gleiche Farbe, Farbe noch nicht in der Wandreihe
+		return bool(self.target_bits >> (c * 5 + line_idx) & 1)
+
+	def target_lines(self, c: int) -> Tuple[int, ...]:
+		"""Alle Musterreihen, die Fliesen der Farbe c aufnehmen können"""
+		return MASK_LINES[self.target_bits >> (c * 5) & 0b11111]
+
+	def add_to_pattern_line(self, line_idx: int, tiles: List[Tile]) -> List[Tile]:
+		"""Fügt Fliesen zu Musterreihe hinzu, gibt überschüssige zurück"""
+		if not tiles:
+			return []
+
+		space_left = line_idx + 1 - self.line_counts[line_idx]
+		self.add_count_to_pattern_line(line_idx, COLOR_INDEX[tiles[0].color], len(tiles))
+		return tiles[space_left:]
+
+	def add_count_to_pattern_line(self, line_idx: int, c: int, count: int) -> int:
+		"""Fügt count Fliesen der Farbe c zur Musterreihe hinzu, gibt den Überschuss zurück"""
+		space_left = line_idx + 1 - self.line_counts[line_idx]
+		added = min(space_left, count)
+		if added > 0:
+			self._set_line(line_idx, c, self.line_counts[line_idx] + added)
+		return count - added
+
+	def add_to_floor_line(self, tiles: List[Tile]):
+		"""Fügt Fliesen zur Bodenreihe hinzu"""
+		for tile in tiles:
+			self.add_count_to_floor_line(COLOR_INDEX[tile.color], 1)
+
+	def add_count_to_floor_line(self, c: int, count: int):
+		"""Legt count Fliesen der Farbe c in die Bodenreihe"""
+		self._set_floor(c, self.floor_counts[c] + count)
+
+	def clear_floor_line(self) -> List[int]:
+		"""Leert die Bodenreihe, gibt die entfernten Fliesen als Zähler pro Farbe zurück"""
+		removed = self.floor_counts
+		keys = ZOBRIST_FLOOR[self.player_idx]
+		for c in range(5):
+			self._hash ^= keys[c][removed[c]]
+		self.floor_counts = [0] * 5
+		self.floor_count = 0
+		return removed
+
+	def score_floor_line(self):
+		"""Berechnet Minuspunkte für Bodenreihe"""
+		# Alle Strafen sind negativ, daher entspricht eine Klemmung am Ende der schrittweisen
+		penalty = FLOOR_PENALTY_TOTAL[min(self.floor_count, 7)]
+
+		# Startspielermarker zählt auch als -1
+		if self.has_first_player_marker:
+			penalty -= 1
+
+		self.score = max(0, self.score + penalty)
+
+	def move_complete_lines_to_wall(self) -> List[Tile]:
+		"""Bewegt komplette Musterreihen zur Wand, gibt entfernte Fliesen zurück"""
+		removed_tiles = []
+
+		for c, count in self.move_complete_lines_to_wall_counts():
+			removed_tiles.extend([TILES[c]] * count)
+
+		return removed_tiles
+
+	def move_complete_lines_to_wall_counts(self) -> List[Tuple[int, int]]:
+		"""Wie move_complete_lines_to_wall, gibt entfernte Fliesen als (Farbindex, Anzahl) zurück"""
+		removed = []
+
+		for i in range(5):
+			if self.line_counts[i] == i + 1:  # Reihe komplett
+				# Rechte Fliese kommt an die Wand
+				c = self.line_colors[i]
+				self.score += self.place_wall_tile(i, c)
+
+				# Restliche Fliesen werden entfernt
+				if i:
+					removed.append((c, i))
+				self._set_line(i, -1, 0)
+
+		return removed
+
+	def place_wall_tile(self, row: int, c: int) -> int:
+		"""Setzt eine Fliese der Farbe c an die Wand, gibt die Punkte dafür zurück"""
+		col = (row + c) % 5
+		bits = self.wall_bits | WALL_BITS[row][c]
+		self.wall_bits = bits
+		self._hash ^= ZOBRIST_WALL[self.player_idx][row * 5 + col]
+		self._update_targets(row)
+
+		# Endspiel-Bonus fortschreiben
+		if bits & ROW_MASKS[row] == ROW_MASKS[row]:
+			self.end_game_bonus += 2
+		if bits & COL_MASKS[col] == COL_MASKS[col]:
+			self.end_game_bonus += 7
+		if bits & COLOR_MASKS[c] == COLOR_MASKS[c]:
+			self.end_game_bonus += 10
+
+		return wall_tile_score(bits, row, col)
+
+	def _calculate_tile_score(self, row: int, col: int) -> int:
+		"""Berechnet Punkte für neu gesetzte Fliese"""
+		return wall_tile_score(self.wall_bits, row, col)
+
+	def calculate_end_game_bonus(self) -> int:
+		"""Berechnet Endspiel-Bonuspunkte"""
+		return self.end_game_bonus
+
+	def has_complete_row(self) -> bool:
+		"""Prüft ob eine horizontale Reihe vollständig ist"""
+		bits = self.wall_bits
+		return any(bits & mask == mask for mask in ROW_MASKS)
+
+	def projected_tiling(self) -> Tuple[int, int]:
+		"""Punktzahl und Wand (Bitboard) nach der Fliesungsphase, ohne den Zustand zu ändern
+
+		Entspricht move_complete_lines_to_wall_counts() gefolgt von score_floor_line().
+		"""
+		points, bits = self._tiling_points()
+		penalty = FLOOR_PENALTY_TOTAL[min(self.floor_count, 7)] - self.has_first_player_marker
+		return max(0, self.score + points + penalty), bits
+
+	def _tiling_points(self, extra_row: int = -1, extra_color: int = -1) -> Tuple[int, int]:
+		"""Wandpunkte und Wand nach dem Fliesen der vollständigen Musterreihen
+
+		extra_row/extra_color behandeln zusätzlich eine Reihe als vollständig mit dieser Farbe.
+		"""
+		bits = self.wall_bits
+		points = 0
+		for i in range(5):
+			if i == extra_row:
+				c = extra_color
+			elif self.line_counts[i] == i + 1:
+				c = self.line_colors[i]
+			else:
+				continue
+			col = (i + c) % 5
+			bits |= 1 << (i * 5 + col)
+			points += wall_tile_score(bits, i, col)
+		return points, bits
+
+
+class AzulGame:
+	"""Hauptspiellogik
+
+	Beutel, Ablage (discarded), Manufakturen und Tischmitte werden als Zähler
+	pro Farbe geführt; Züge verschieben nur Zählerstände. Alle Zufallsentscheidungen
+	laufen über rng, sodass Partien mit random.Random(seed) reproduzierbar sind.
+
+	fills gibt optional die Manufakturinhalte der Runden vor (je Runde eine Liste
+	mit den Zählern pro Farbe jeder Manufaktur), etwa zum Abspielen einer
+	aufgezeichneten Partie; danach wird wieder zufällig gezogen.
+
+	Ist events eine Liste, hängen Züge, Fliesungsphase und Rundenwechsel ihre
+	Änderungen als Ereignisse an (EVENT_*); apply_events() überträgt sie auf eine
+	Kopie des Zustands. undo() erzeugt keine Ereignisse.
+	"""
+	__slots__ = ("num_players", "rng", "players", "current_player", "phase", "first_player_marker_taken",
+	             "round", "_fills", "_fill_index", "factories", "center_counts", "center_total", "_undo_stack", "_hash",
+	             "_factory_hash", "_factory_sum", "bag_counts", "bag_total", "discard_counts", "discard_total",
+	             "events")
+
+	def __init__(self, num_players: int, rng: Optional[random.Random] = None,
+	             fills: Optional[Iterable[Sequence[Sequence[int]]]] = None):
+		self.num_players = num_players
+		self.rng = rng if rng is not None else random.Random()
+		self.players = [PlayerBoard(i) for i in range(num_players)]
+		self.current_player = 0
+		self.phase = GamePhase.PATTERN
+		self.first_player_marker_taken = False
+		self.round = 1
+		# Als Tupel mit Lesezeiger, damit undo() über ein Rundenende zurückspulen kann
+		self._fills = tuple(fills) if fills is not None else None
+		self._fill_index = 0
+		self.events: Optional[List[tuple]] = None
+
+		# Manufakturen
+		factory_count = FACTORY_COUNT[num_players]
+		self.factories = [Factory() for _ in range(factory_count)]
+		self.center_counts = [0] * 5  # Tischmitte
+		self.center_total = 0
+
+		# Rücknahme-Informationen für apply()/undo()
+		self._undo_stack = []
+
+		# Zobrist-Anteile (inkrementell gepflegt): Tischmitte, Manufakturen nach Position
+		# und Manufakturen unabhängig von ihrer Reihenfolge
+		self._hash = 0
+		self._factory_hash = 0
+		self._factory_sum = 0
+
+		# Fliesenbeutel
+		self.bag_counts = [0] * 5
+		self.bag_total = 0
+		self.discard_counts = [0] * 5
+		self.discard_total = 0
+		self._fill_bag()
+
+		# Fliesen auf Manufakturen verteilen
+		self._refill_factories()
+
+	@property
+	def zobrist_hash(self) -> int:
+		"""Zobrist-Hash des Spielzustands
+
+		Umfasst Wände, Musterreihen, Bodenreihen, Punkte, Manufakturen, Tischmitte,
+		Startspielermarker, aktuellen Spieler und Spielende; Beutel und Ablage nicht.
+		"""
+		return self._common_hash() ^ self._factory_hash
+
+	@property
+	def canonical_hash(self) -> int:
+		"""Wie zobrist_hash, aber unabhängig von der Reihenfolge der Manufakturen
+
+		Stellungen, die sich nur durch vertauschte Manufakturen unterscheiden, erhalten
+		denselben Hash. Geeignet als Schlüssel für Transpositionstabellen.
+		"""
+		return self._common_hash() ^ self._factory_sum
+
+	def _common_hash(self) -> int:
+		h = self._hash ^ ZOBRIST_CURRENT_PLAYER[self.current_player]
+		if self.first_player_marker_taken:
+			h ^= ZOBRIST_MARKER_TAKEN
+		if self.phase == GamePhase.GAME_END:
+			h ^= ZOBRIST_GAME_END
+		for player in self.players:
+			h ^= player.zobrist_hash
+		return h
+
+	def canonical_key(self) -> tuple:
+		"""Normalform des Spielzustands mit sortierten Manufakturinhalten
+
+		Zwei Zustände haben genau dann denselben Schlüssel, wenn sie bis auf die
+		Reihenfolge der Manufakturen übereinstimmen (inklusive Beutel und Ablage).
+		"""
+		return (
+			self.num_players, self.current_player, self.phase.name, self.first_player_marker_taken,
+			tuple(sorted(factory_code(f.counts) for f in self.factories)),
+			tuple(self.center_counts), tuple(self.bag_counts), tuple(self.discard_counts),
+			tuple((p.wall_bits, tuple(p.line_colors), tuple(p.line_counts), tuple(p.floor_counts),
+			       p.score, p.has_first_player_marker) for p in self.players),
+		)
+
+	def canonical_move(self, move: Move) -> Move:
+		"""Ersetzt die Manufaktur eines Zugs durch die erste Manufaktur mit gleichem Inhalt
+
+		legal_moves() liefert bereits nur solche Züge; die Funktion bildet beliebige
+		gleichwertige Züge (z.B. Klicks in der GUI) darauf ab. Vor apply() aufrufen.
+		"""
+		source, c, line = move
+		if source == CENTER:
+			return move
+		counts = self.factories[source].counts
+		for i, factory in enumerate(self.factories[:source]):
+			if factory.counts == counts:
+				return i, c, line
+		return move
+
+	@property
+	def center(self) -> List[Tile]:
+		"""Tischmitte als Fliesen-Sicht"""
+		return tiles_from_counts(self.center_counts)
+
+	@property
+	def bag(self) -> List[Tile]:
+		"""Beutel als Fliesen-Sicht"""
+		return tiles_from_counts(self.bag_counts)
+
+	@property
+	def discarded(self) -> List[Tile]:
+		"""Ablage als Fliesen-Sicht"""
+		return tiles_from_counts(self.discard_counts)
+
+	def _fill_bag(self):
+		"""Füllt den Beutel mit 100 Fliesen (20 pro Farbe)"""
+		self.bag_counts = [20] * 5
+		self.bag_total = 100
+
+	def _discard(self, c: int, count: int):
+		"""Legt Fliesen in die Ablage"""
+		self.discard_counts[c] += count
+		self.discard_total += count
+
+	def _pour_discard(self):
+		"""Ablage zurück in den Beutel (nur bei leerem Beutel)"""
+		self.bag_counts = self.discard_counts
+		self.bag_total = self.discard_total
+		self.discard_counts = [0] * 5
+		self.discard_total = 0
+
+	def _draw_tile(self) -> int:
+		"""Zieht eine zufällige Fliese aus dem Beutel, gibt den Farbindex zurück (-1 = leer)
+
+		Aufeinanderfolgende Ziehungen ergeben eine multivariat-hypergeometrische Stichprobe.
+		Jede Ziehung kostet eine Zufallszahl und höchstens 5 Vergleiche, unabhängig von
+		der Beutelgröße; leert sich der Beutel, wird die Ablage ohne Mischen übernommen.
+		"""
+		if not self.bag_total:
+			if not self.discard_total:
+				return -1
+			self._pour_discard()
+
+		r = self.rng.randrange(self.bag_total)
+		counts = self.bag_counts
+		c = 0
+		while r >= counts[c]:
+			r -= counts[c]
+			c += 1
+		counts[c] -= 1
+		self.bag_total -= 1
+		return c
+
+	def _refill_factories(self):
+		"""Bestückt jedes Manufakturplättchen mit 4 Fliesen"""
+		fills = self._fills
+		if fills is not None and self._fill_index < len(fills):
+			self._refill_preset(fills[self._fill_index])
+			self._fill_index += 1
+			return
+		for i, factory in enumerate(self.factories):
+			keys = ZOBRIST_FACTORY[i]
+			counts = factory.counts
+			self._factory_sum -= ZOBRIST_FACTORY_CONTENT[factory_code(counts)]
+			for _ in range(4):
+				c = self._draw_tile()
+				if c < 0:
+					break
+				n = counts[c]
+				self._factory_hash ^= keys[c][n] ^ keys[c][n + 1]
+				counts[c] = n + 1
+				factory.total += 1
+			self._factory_sum = (self._factory_sum + ZOBRIST_FACTORY_CONTENT[factory_code(counts)]) & HASH_MASK
+
+	def _refill_preset(self, fill: Sequence[Sequence[int]]):
+		"""Bestückt die Manufakturen mit vorgegebenen Zählern pro Farbe
+
+		Beutel und Ablage enden im selben Zustand wie beim zufälligen Ziehen: Eine
+		Manufaktur nimmt zuerst, was der Beutel von ihren Farben hergibt, und erst
+		bei leerem Beutel wird die Ablage umgeschüttet.
+		"""
+		if len(fill) != len(self.factories):
+			raise ValueError(f"Füllung für {len(fill)} statt {len(self.factories)} Manufakturen")
+		for i, factory in enumerate(self.factories):
+			keys = ZOBRIST_FACTORY[i]
+			counts = factory.counts
+			self._factory_sum -= ZOBRIST_FACTORY_CONTENT[factory_code(counts)]
+			wanted = list(fill[i])
+			for _ in range(2):
+				bag = self.bag_counts
+				for c in range(5):
+					n = min(wanted[c], bag[c])
+					if n:
+						bag[c] -= n
+						self.bag_total -= n
+						wanted[c] -= n
+						self._factory_hash ^= keys[c][counts[c]] ^ keys[c][counts[c] + n]
+						counts[c] += n
+						factory.total += n
+				if not any(wanted):
+					break
+				if self.bag_total:
+					raise ValueError(f"Füllung von Manufaktur {i} passt nicht zu Beutel und Ablage")
+				self._pour_discard()
+			else:
+				raise ValueError(f"Füllung von Manufaktur {i} passt nicht zu Beutel und Ablage")
+			self._factory_sum = (self._factory_sum + ZOBRIST_FACTORY_CONTENT[factory_code(counts)]) & HASH_MASK
+
+	def get_available_colors_factory(self, factory_idx: int) -> List[TileColor]:
+		"""Gibt verfügbare Farben einer Manufaktur zurück"""
+		if factory_idx < 0 or factory_idx >= len(self.factories):
+			return []
+		counts = self.factories[factory_idx].counts
+		return [COLORS[c] for c in range(5) if counts[c]]
+
+	def get_available_colors_center(self) -> List[TileColor]:
+		"""Gibt verfügbare Farben aus der Mitte zurück"""
+		return [COLORS[c] for c in range(5) if self.center_counts[c]]
+
+	def take_from_factory(self, player_idx: int, factory_idx: int, color: TileColor, pattern_line_idx: int):
+		"""Spieler nimmt Fliesen von Manufaktur"""
+		if player_idx != self.current_player:
+			return False
+
+		c = COLOR_INDEX[color]
+		if not self.factories[factory_idx].counts[c]:
+			return False
+
+		self._take(factory_idx, c, pattern_line_idx)
+		self._next_turn()
+		return True
+
+	def take_from_center(self, player_idx: int, color: TileColor, pattern_line_idx: int):
+		"""Spieler nimmt Fliesen aus der Mitte"""
+		if player_idx != self.current_player:
+			return False
+
+		c = COLOR_INDEX[color]
+		if not self.center_counts[c]:
+			return False
+
+		self._take(CENTER, c, pattern_line_idx)
+		self._next_turn()
+		return True
+
+	def _take(self, source: int, c: int, pattern_line_idx: int) -> Tuple[int, bool]:
+		"""Führt einen Zug des aktuellen Spielers aus, gibt (Anzahl Fliesen, Startspielermarker genommen) zurück"""
+		player_idx = self.current_player
+		marker = False
+
+		if source == CENTER:
+			taken = self.center_counts[c]
+			self.center_counts[c] = 0
+			self.center_total -= taken
+			self._hash ^= ZOBRIST_CENTER[c][taken]
+
+			# Startspielermarker
+			if not self.first_player_marker_taken:
+				self.players[player_idx].has_first_player_marker = True
+				self.first_player_marker_taken = True
+				marker = True
+		else:
+			factory = self.factories[source]
+			counts = factory.counts
+			taken = counts[c]
+
+			# Übrige Fliesen in die Mitte (die alte Zählerliste bleibt unverändert)
+			factory_keys = ZOBRIST_FACTORY[source]
+			center = self.center_counts
+			h = self._hash
+			fh = self._factory_hash
+			for i in range(5):
+				n = counts[i]
+				if n:
+					fh ^= factory_keys[i][n]
+					if i != c:
+						h ^= ZOBRIST_CENTER[i][center[i]] ^ ZOBRIST_CENTER[i][center[i] + n]
+						center[i] += n
+			self._hash = h
+			self._factory_hash = fh
+			self._factory_sum = (self._factory_sum - ZOBRIST_FACTORY_CONTENT[factory_code(counts)]) & HASH_MASK
+			self.center_total += factory.total - taken
+			factory.clear()
+
+		if self.events is not None:
+			if source == CENTER:
+				self.events.append((EVENT_CENTER_TAKEN, c, taken, player_idx if marker else -1))
+			else:
+				self.events.append((EVENT_FACTORY_TAKEN, source, c) + tuple(0 if i == c else counts[i] for i in range(5)))
+
+		# Fliesen platzieren
+		self._place_tiles(player_idx, c, taken, pattern_line_idx)
+		return taken, marker
+
+	def _place_tiles(self, player_idx: int, c: int, count: int, pattern_line_idx: int):
+		"""Platziert count Fliesen der Farbe c auf Spielerablage"""
+		player = self.players[player_idx]
+
+		if pattern_line_idx == FLOOR:  # Direkt in Bodenreihe
+			overflow = count
+			player.add_count_to_floor_line(c, count)
+		else:
+			overflow = player.add_count_to_pattern_line(pattern_line_idx, c, count)
+			if overflow:
+				player.add_count_to_floor_line(c, overflow)
+
+		if self.events is not None:
+			if pattern_line_idx != FLOOR:
+				self.events.append((EVENT_LINE, player_idx, pattern_line_idx,
+				                    player.line_colors[pattern_line_idx], player.line_counts[pattern_line_idx]))
+			if overflow:
+				self.events.append((EVENT_FLOOR, player_idx, c, player.floor_counts[c]))
+
+	def legal_moves(self) -> List[Move]:
+		"""Alle legalen Züge des aktuellen Spielers als (Quelle, Farbindex, Musterreihe)
+
+		Quelle ist der Manufaktur-Index oder CENTER, Musterreihe FLOOR steht für die
+		Bodenreihe. Manufakturen mit identischem Inhalt liefern nur einmal Züge, und zwar
+		für die erste von ihnen (siehe canonical_move).
+		"""
+		if self.phase != GamePhase.PATTERN:
+			return []
+
+		player = self.players[self.current_player]
+		moves = []
+		seen = set()
+
+		sources = [(CENTER, self.center_counts)] if self.center_total else []
+		for i, factory in enumerate(self.factories):
+			if factory.total:
+				key = factory_code(factory.counts)
+				if key not in seen:
+					seen.add(key)
+					sources.append((i, factory.counts))
+
+		for source, counts in sources:
+			for c in range(5):
+				if counts[c]:
+					for line in player.target_lines(c):
+						moves.append((source, c, line))
+					moves.append((source, c, FLOOR))
+
+		return moves
+
+	def move_score_deltas(self) -> Dict[Move, int]:
+		"""Sofortiger Punktwert jedes legalen Zugs, ohne den Zustand zu ändern
+
+		Wert = zusätzliche Wandpunkte der nächsten Fliesungsphase, falls der Zug eine
+		Musterreihe vervollständigt (samt Auswirkung auf darunterliegende vollständige
+		Reihen), minus zusätzliche Minuspunkte der Bodenreihe durch Überlauf und
+		Startspielermarker. Die Untergrenze von 0 Punkten bleibt unberücksichtigt.
+		"""
+		player = self.players[self.current_player]
+		line_counts = player.line_counts
+		floor_count = player.floor_count
+		base_penalty = FLOOR_PENALTY_TOTAL[min(floor_count, 7)]
+		base_points = player._tiling_points()[0]
+		marker = 0 if self.first_player_marker_taken else 1
+		completions = {}  # (Reihe, Farbe) -> zusätzliche Wandpunkte
+
+		deltas = {}
+		for move in self.legal_moves():
+			source, c, line = move
+			count = self.center_counts[c] if source == CENTER else self.factories[source].counts[c]
+			gain = 0
+			if line == FLOOR:
+				overflow = count
+			else:
+				space = line + 1 - line_counts[line]
+				overflow = count - space if count > space else 0
+				if count >= space:
+					key = line * 5 + c
+					gain = completions.get(key)
+					if gain is None:
+						gain = completions[key] = player._tiling_points(line, c)[0] - base_points
+			gain += FLOOR_PENALTY_TOTAL[min(floor_count + overflow, 7)] - base_penalty
+			if source == CENTER:
+				gain -= marker
+			deltas[move] = gain
+		return deltas
+
+	def apply(self, move: Move):
+		"""Führt einen legalen Zug aus und merkt sich alles, was undo() zum Zurücknehmen braucht"""
+		source, c, line = move
+		player_idx = self.current_player
+		player = self.players[player_idx]
+		old_counts = self.factories[source].counts if source != CENTER else None
+		if line == FLOOR:
+			old_color, old_count = -1, 0
+		else:
+			old_color, old_count = player.line_colors[line], player.line_counts[line]
+
+		taken, marker = self._take(source, c, line)
+		floored = taken if line == FLOOR else taken - (player.line_counts[line] - old_count)
+
+		# Rundenende: Zustand vor der Fliesungsphase sichern
+		snapshot = None
+		if not self.center_total and not any(f.total for f in self.factories):
+			snapshot = self._snapshot()
+
+		self._undo_stack.append((move, player_idx, taken, old_counts, marker, old_color, old_count, floored, snapshot))
+		self._next_turn()
+
+	def undo(self, move: Move):
+		"""Nimmt den zuletzt mit apply() ausgeführten Zug exakt zurück"""
+		last, player_idx, taken, old_counts, marker, old_color, old_count, floored, snapshot = self._undo_stack.pop()
+		if last != move:
+			raise ValueError(f"undo({move}) passt nicht zum letzten Zug {last}")
+
+		if snapshot is not None:
+			self._restore(snapshot)
+
+		source, c, line = move
+		player = self.players[player_idx]
+		self.current_player = player_idx
+		self.phase = GamePhase.PATTERN
+
+		# Fliesen von der Spielerablage zurücknehmen
+		if line != FLOOR:
+			player._set_line(line, old_color, old_count)
+		if floored:
+			player._set_floor(c, player.floor_counts[c] - floored)
+
+		# Fliesen an die Quelle zurücklegen
+		if source == CENTER:
+			self.center_counts[c] = taken
+			self.center_total += taken
+			self._hash ^= ZOBRIST_CENTER[c][taken]
+			if marker:
+				player.has_first_player_marker = False
+				self.first_player_marker_taken = False
+		else:
+			factory = self.factories[source]
+			factory.counts = old_counts
+			factory.total = sum(old_counts)
+			factory_keys = ZOBRIST_FACTORY[source]
+			center = self.center_counts
+			h = self._hash
+			fh = self._factory_hash
+			for i in range(5):
+				n = old_counts[i]
+				if n:
+					fh ^= factory_keys[i][n]
+					if i != c:
+						h ^= ZOBRIST_CENTER[i][center[i]] ^ ZOBRIST_CENTER[i][center[i] - n]
+						center[i] -= n
+			self._hash = h
+			self._factory_hash = fh
+			self._factory_sum = (self._factory_sum + ZOBRIST_FACTORY_CONTENT[factory_code(old_counts)]) & HASH_MASK
+			self.center_total -= factory.total - taken
+
+	def clone(self, rng: Optional[random.Random] = None) -> "AzulGame":
+		"""Schnelle Kopie des Spielzustands, etwa für Suchverfahren (statt copy.deepcopy)
+
+		Die Spielerablagen teilen ihre Listen bis zum ersten Schreibzugriff. rng wird
+		der Zufallsgenerator der Kopie; ohne Angabe erhält sie eine Kopie des Zustands
+		von self.rng. Der Zugverlauf für undo() wird nicht übernommen.
+		"""
+		game = AzulGame.__new__(AzulGame)
+		game.num_players = self.num_players
+		if rng is None:
+			# Ohne __init__, das würde den neuen Generator erst aus os.urandom seeden
+			rng = random.Random.__new__(random.Random)
+			rng.setstate(self.rng.getstate())
+		game.rng = rng
+		game.players = [p.clone() for p in self.players]
+		game.current_player = self.current_player
+		game.phase = self.phase
+		game.first_player_marker_taken = self.first_player_marker_taken
+		game.round = self.round
+		game._fills = self._fills
+		game._fill_index = self._fill_index
+		game.factories = [f.clone() for f in self.factories]
+		game.center_counts = self.center_counts[:]
+		game.center_total = self.center_total
+		game._undo_stack = []
+		game.events = None
+		game._hash = self._hash
+		game._factory_hash = self._factory_hash
+		game._factory_sum = self._factory_sum
+		game.bag_counts = self.bag_counts[:]
+		game.bag_total = self.bag_total
+		game.discard_counts = self.discard_counts[:]
+		game.discard_total = self.discard_total
+		return game
+
+	def apply_events(self, events: Iterable[tuple]):
+		"""Überträgt Änderungsereignisse (aus events bzw. decode_events) auf diesen Zustand
+
+		Gedacht für Clients, die eine Kopie des Spiels mitführen: danach stimmt der
+		Zustand mit dem des Spiels überein, das die Ereignisse erzeugt hat. Es wird
+		nichts geprüft und kein Zufall gezogen; der Zugverlauf für undo() bleibt leer.
+		"""
+		center = self.center_counts
+		for event in events:
+			kind = event[0]
+			if kind == EVENT_TURN:
+				self.current_player = event[1]
+			elif kind == EVENT_FACTORY_TAKEN:
+				factory = self.factories[event[1]]
+				for c in range(5):
+					center[c] += event[3 + c]
+				self.center_total += factory.total - factory.counts[event[2]]
+				factory.clear()
+			elif kind == EVENT_CENTER_TAKEN:
+				_, c, count, marker = event
+				center[c] -= count
+				self.center_total -= count
+				if marker >= 0:
+					self.players[marker].has_first_player_marker = True
+					self.first_player_marker_taken = True
+			elif kind == EVENT_LINE:
+				_, p, line, c, count = event
+				self.players[p]._set_line(line, c, count)
+			elif kind == EVENT_FLOOR:
+				_, p, c, count = event
+				self.players[p]._set_floor(c, count)
+			elif kind == EVENT_WALL:
+				_, p, row, c, points = event
+				self.players[p].place_wall_tile(row, c)
+				self.players[p].score += points
+			elif kind == EVENT_SCORE:
+				self.players[event[1]].score = event[2]
+			elif kind == EVENT_ROUND:
+				self.round, self.current_player = event[1], event[2]
+				for player in self.players:
+					player.has_first_player_marker = False
+				self.first_player_marker_taken = False
+				self.phase = GamePhase.PATTERN
+			elif kind == EVENT_REFILL:
+				for i, factory in enumerate(self.factories):
+					factory.counts = list(event[1 + 5 * i:6 + 5 * i])
+					factory.total = sum(factory.counts)
+			elif kind == EVENT_SUPPLY:
+				self.bag_counts, self.bag_total = list(event[1:6]), sum(event[1:6])
+				self.discard_counts, self.discard_total = list(event[6:11]), sum(event[6:11])
+			elif kind == EVENT_GAME_END:
+				self.phase = GamePhase.GAME_END
+			else:
+				raise ValueError(f"Unbekanntes Änderungsereignis {kind}")
+		self._rehash()  # Zobrist-Anteile von Tischmitte und Manufakturen
+
+	def to_bytes(self) -> bytes:
+		"""Spielzustand als gepackter Puffer fester Länge (siehe PACKED, PackedState)
+
+		Enthält alles außer Zufallsgenerator und Rücknahme-Historie.
+		"""
+		return PACKED[self.num_players].pack(*self._packed_fields())
+
+	def pack_into(self, buffer, offset: int = 0):
+		"""Wie to_bytes(), schreibt aber in einen vorhandenen Puffer ab offset"""
+		PACKED[self.num_players].pack_into(buffer, offset, *self._packed_fields())
+
+	def _packed_fields(self) -> list:
+		fields = [self.num_players, self.current_player, PHASE_INDEX[self.phase],
+		          self.first_player_marker_taken, self.round]
+		fields += self.center_counts
+		fields += self.bag_counts
+		fields += self.discard_counts
+		for factory in self.factories:
+			fields += factory.counts
+		for p in self.players:
+			fields += (p.wall_bits, p.score)
+			fields += p.line_colors
+			fields += p.line_counts
+			fields += p.floor_counts
+			fields.append(p.has_first_player_marker)
+		return fields
+
+	@classmethod
+	def from_bytes(cls, data, rng: Optional[random.Random] = None) -> "AzulGame":
+		"""Stellt ein Spiel aus to_bytes() wieder her (bytes, bytearray oder memoryview)"""
+		num_players = _packed_players(data)
+		fields = PACKED[num_players].unpack(data)
+
+		# Ohne __init__, das würde Manufakturen befüllen und dafür Zufallszahlen ziehen
+		game = cls.__new__(cls)
+		game.num_players = num_players
+		game.rng = rng if rng is not None else random.Random()
+		game.players = [PlayerBoard(i) for i in range(num_players)]
+		game.factories = [Factory() for _ in range(FACTORY_COUNT[num_players])]
+		game._fills = None
+		game._fill_index = 0
+		game._undo_stack = []
+		game.events = None
+		game.current_player = fields[1]
+		game.phase = PHASES[fields[2]]
+		game.first_player_marker_taken = bool(fields[3])
+		game.round = fields[4]
+		game.center_counts = list(fields[5:10])
+		game.bag_counts = list(fields[10:15])
+		game.discard_counts = list(fields[15:20])
+		game.center_total = sum(game.center_counts)
+		game.bag_total = sum(game.bag_counts)
+		game.discard_total = sum(game.discard_counts)
+		pos = 20
+		for factory in game.factories:
+			factory.counts = list(fields[pos:pos + 5])
+			factory.total = sum(factory.counts)
+			pos += 5
+		for p in game.players:
+			p.wall_bits, p.score = fields[pos:pos + 2]
+			p.line_colors = list(fields[pos + 2:pos + 7])
+			p.line_counts = list(fields[pos + 7:pos + 12])
+			p.floor_counts = list(fields[pos + 12:pos + 17])
+			p.has_first_player_marker = bool(fields[pos + 17])
+			p._rehash()
+			pos += 18
+		game._rehash()
+		return game
+
+	def _rehash(self):
+		"""Berechnet die Zobrist-Anteile von Tischmitte und Manufakturen neu"""
+		h = 0
+		for c in range(5):
+			h ^= ZOBRIST_CENTER[c][self.center_counts[c]]
+		self._hash = h
+		self._factory_hash = 0
+		self._factory_sum = 0
+		for i, factory in enumerate(self.factories):
+			for c in range(5):
+				self._factory_hash ^= ZOBRIST_FACTORY[i][c][factory.counts[c]]
+			self._factory_sum = (self._factory_sum + ZOBRIST_FACTORY_CONTENT[factory_code(factory.counts)]) & HASH_MASK
+
+	def _snapshot(self) -> tuple:
+		"""Sichert den gesamten veränderlichen Spielzustand"""
+		return (
+			[p._get_state() for p in self.players],
+			[f.counts[:] for f in self.factories],
+			self.center_counts[:], self.bag_counts[:], self.discard_counts[:],
+			self.current_player, self.phase, self.first_player_marker_taken,
+			self.rng.getstate(), self._hash, self._factory_hash, self._factory_sum, self.round,
+			self._fill_index,
+		)
+
+	def _restore(self, snapshot: tuple):
+		"""Stellt einen mit _snapshot() gesicherten Zustand wieder her"""
+		(boards, factories, center, bag, discard, current, phase, marker_taken, rng_state,
+		 self._hash, self._factory_hash, self._factory_sum, self.round, self._fill_index) = snapshot
+		for player, state in zip(self.players, boards):
+			player._set_state(state)
+		for factory, counts in zip(self.factories, factories):
+			factory.counts = counts[:]
+			factory.total = sum(counts)
+		self.center_counts, self.center_total = center[:], sum(center)
+		self.bag_counts, self.bag_total = bag[:], sum(bag)
+		self.discard_counts, self.discard_total = discard[:], sum(discard)
+		self.current_player = current
+		self.phase = phase
+		self.first_player_marker_taken = marker_taken
+		self.rng.setstate(rng_state)
+
+	def _next_turn(self):
+		"""Wechselt zum nächsten Spieler oder Phase"""
+		# Prüfe ob Musterphase beendet
+		if not self.center_total and not any(f.total for f in self.factories):
+			self._start_tiling_phase()
+		else:
+			self.current_player = (self.current_player + 1) % self.num_players
+			if self.events is not None:
+				self.events.append((EVENT_TURN, self.current_player))
+
+	def _start_tiling_phase(self):
+		"""Startet Fliesungsphase"""
+		self.phase = GamePhase.TILING
+		events = self.events
+
+		for player in self.players:
+			if events is not None:
+				self._record_tiling(player)
+
+			# Verschiebe komplette Reihen zur Wand
+			for c, count in player.move_complete_lines_to_wall_counts():
+				self._discard(c, count)
+
+			# Werte Bodenreihe
+			player.score_floor_line()
+			for c, count in enumerate(player.clear_floor_line()):
+				self._discard(c, count)
+			if events is not None:
+				events.append((EVENT_SCORE, player.player_idx, player.score))
+
+		# Prüfe Spielende
+		if any(p.has_complete_row() for p in self.players):
+			self._end_game()
+		else:
+			self._prepare_next_round()
+		if events is not None:
+			events.append((EVENT_SUPPLY, *self.bag_counts, *self.discard_counts))
+
+	def _record_tiling(self, player: PlayerBoard):
+		"""Ereignisse für das Fliesen einer Spielerablage (vor dem Fliesen aufrufen)"""
+		p = player.player_idx
+		bits = player.wall_bits
+		for i in range(5):
+			if player.line_counts[i] == i + 1:
+				c = player.line_colors[i]
+				col = (i + c) % 5
+				bits |= 1 << (i * 5 + col)
+				self.events.append((EVENT_WALL, p, i, c, wall_tile_score(bits, i, col)))
+				self.events.append((EVENT_LINE, p, i, -1, 0))
+		for c in range(5):
+			if player.floor_counts[c]:
+				self.events.append((EVENT_FLOOR, p, c, 0))
+
+	def _prepare_next_round(self):
+		"""Bereitet nächste Runde vor"""
+		self.phase = GamePhase.PREPARATION
+
+		# Startspieler für nächste Runde
+		for i, player in enumerate(self.players):
+			if player.has_first_player_marker:
+				self.current_player = i
+				player.has_first_player_marker = False
+				break
+
+		self.first_player_marker_taken = False
+		self.round += 1
+		self._refill_factories()
+		self.phase = GamePhase.PATTERN
+
+		if self.events is not None:
+			self.events.append((EVENT_ROUND, self.round, self.current_player))
+			self.events.append((EVENT_REFILL,) + tuple(n for f in self.factories for n in f.counts))
+
+	def _end_game(self):
+		"""Beendet das Spiel und berechnet Endwertung"""
+		self.phase = GamePhase.GAME_END
+
+		for player in self.players:
+			player.score += player.calculate_end_game_bonus()
+
+		if self.events is not None:
+			self.events.append((EVENT_GAME_END,))
+			self.events.extend((EVENT_SCORE, p.player_idx, p.score) for p in self.players)
+
+
+class PackedState:
+	"""Lesesicht auf einen Puffer aus AzulGame.to_bytes(), ohne ihn zu kopieren
+
+	Die Felder werden bei jedem Zugriff direkt aus dem Puffer gelesen. Gleichheit und
+	Hash beziehen sich auf die Bytes, damit eignen sich PackedStates als Schlüssel.
+	"""
+
+	def __init__(self, buffer):
+		self.buffer = memoryview(buffer)
+		self.num_players = _packed_players(self.buffer)
+		self._player_offset = _PACKED_PLAYER_OFFSET[self.num_players]
+
+	@property
+	def current_player(self) -> int:
+		return self.buffer[1]
+
+	@property
+	def phase(self) -> GamePhase:
+		return PHASES[self.buffer[2]]
+
+	@property
+	def first_player_marker_taken(self) -> bool:
+		return bool(self.buffer[3])
+
+	@property
+	def round(self) -> int:
+		return struct.unpack_from("<H", self.buffer, 4)[0]
+
+	@property
+	def center_counts(self) -> List[int]:
+		return list(self.buffer[6:11])
+
+	@property
+	def bag_counts(self) -> List[int]:
+		return list(self.buffer[11:16])
+
+	@property
+	def discard_counts(self) -> List[int]:
+		return list(self.buffer[16:21])
+
+	def factory_counts(self, i: int) -> List[int]:
+		if not 0 <= i < FACTORY_COUNT[self.num_players]:
+			raise IndexError(i)
+		return list(self.buffer[21 + 5 * i:26 + 5 * i])
+
+	def _player(self, p: int) -> int:
+		if not 0 <= p < self.num_players:
+			raise IndexError(p)
+		return self._player_offset + p * _PACKED_PLAYER_SIZE
+
+	def wall_bits(self, p: int) -> int:
+		return struct.unpack_from("<I", self.buffer, self._player(p))[0]
+
+	def score(self, p: int) -> int:
+		return struct.unpack_from("<h", self.buffer, self._player(p) + 4)[0]
+
+	def line_colors(self, p: int) -> List[int]:
+		return list(struct.unpack_from("<5b", self.buffer, self._player(p) + 6))
+
+	def line_counts(self, p: int) -> List[int]:
+		pos = self._player(p) + 11
+		return list(self.buffer[pos:pos + 5])
+
+	def floor_counts(self, p: int) -> List[int]:
+		pos = self._player(p) + 16
+		return list(self.buffer[pos:pos + 5])
+
+	def has_first_player_marker(self, p: int) -> bool:
+		return bool(self.buffer[self._player(p) + 21])
+
+	def to_game(self, rng: Optional[random.Random] = None) -> AzulGame:
+		return AzulGame.from_bytes(self.buffer, rng)
+
+	def __bytes__(self) -> bytes:
+		return self.buffer.tobytes()
+
+	def __len__(self) -> int:
+		return len(self.buffer)
+
+	def __eq__(self, other):
+		return isinstance(other, PackedState) and self.buffer == other.buffer
+
+	def __hash__(self):
+		return hash(self.buffer.tobytes())
+
+	def __repr__(self):
+		return f"PackedState(players={self.num_players}, round={self.round}, phase={self.phase.name})"
@@ -1,398 +1,77 @@
+import argparse
+import collections
+import random
+import sys
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
-import random
-from enum import Enum
-from typing import List, Optional, Tuple
-import math
-
-
-class TileColor(Enum):
-	"""Die 5 Fliesenfarben im Spiel"""
-	BLUE = "#0066CC"
-	YELLOW = "#FFD700"
-	RED = "#CC0000"
-	BLACK = "#2C2E3B"
-	WHITE = "#E0E0E0"
-
-
-class GamePhase(Enum):
-	"""Spielphasen"""
-	PATTERN = "Musterphase"
-	TILING = "Fliesungsphase"
-	PREPARATION = "Vorbereitung"
-	GAME_END = "Spielende"
-
-
-class Tile:
-	"""Repräsentiert eine einzelne Fliese"""
-
-	def __init__(self, color: TileColor):
-		self.color = color
-
-
-class Factory:
-	"""Manufakturplättchen"""
-
-	def __init__(self):
-		self.tiles: List[Tile] = []
-
-	def add_tiles(self, tiles: List[Tile]):
-		self.tiles.extend(tiles)
-
-	def take_color(self, color: TileColor) -> Tuple[List[Tile], List[Tile]]:
-		"""Nimmt alle Fliesen einer Farbe, gibt (genommene, übrige) zurück"""
-		taken = [t for t in self.tiles if t.color == color]
-		remaining = [t for t in self.tiles if t.color != color]
-		self.tiles.clear()
-		return taken, remaining
-
-
-class WallPattern:
-	"""Das Wandmuster - 5x5 Grid mit festem Farbmuster"""
-	# Festes Muster wie auf der Spielerablage
-	PATTERN = [
-		[TileColor.BLUE, TileColor.YELLOW, TileColor.RED, TileColor.BLACK, TileColor.WHITE],
-		[TileColor.WHITE, TileColor.BLUE, TileColor.YELLOW, TileColor.RED, TileColor.BLACK],
-		[TileColor.BLACK, TileColor.WHITE, TileColor.BLUE, TileColor.YELLOW, TileColor.RED],
-		[TileColor.RED, TileColor.BLACK, TileColor.WHITE, TileColor.BLUE, TileColor.YELLOW],
-		[TileColor.YELLOW, TileColor.RED, TileColor.BLACK, TileColor.WHITE, TileColor.BLUE]
-	]
-
-
-class PlayerBoard:
-	"""Spielerablage mit Musterreihen, Wand und Bodenreihe"""
-
-	def __init__(self):
-		self.pattern_lines = [[] for _ in range(5)]  # 5 Musterreihen (1-5 Plätze)
-		self.wall = [[None for _ in range(5)] for _ in range(5)]  # 5x5 Wand
-		self.floor_line = []  # Bodenreihe
-		self.score = 0
-		self.has_first_player_marker = False
-
-	def can_add_to_pattern_line(self, line_idx: int, color: TileColor) -> bool:
-		"""Prüft ob Fliesen in eine Musterreihe gelegt werden können"""
-		if line_idx < 0 or line_idx >= 5:
-			return False
-
-		pattern_line = self.pattern_lines[line_idx]
-		max_tiles = line_idx + 1
-
-		# Reihe voll?
-		if len(pattern_line) >= max_tiles:
-			return False
-
-		# Reihe leer oder gleiche Farbe?
-		if pattern_line and pattern_line[0].color != color:
-			return False
-
-		# Farbe bereits in der Wandreihe?
-		wall_row = self.wall[line_idx]
-		wall_colors = [WallPattern.PATTERN[line_idx][i] for i, tile in enumerate(wall_row) if tile is not None]
-		if color in wall_colors:
-			return False
-
-		return True
-
-	def add_to_pattern_line(self, line_idx: int, tiles: List[Tile]) -> List[Tile]:
-		"""Fügt Fliesen zu Musterreihe hinzu, gibt überschüssige zurück"""
-		if not tiles:
-			return []
-
-		max_tiles = line_idx + 1
-		current_tiles = len(self.pattern_lines[line_idx])
-		space_left = max_tiles - current_tiles
-
-		tiles_to_add = tiles[:space_left]
-		overflow = tiles[space_left:]
-
-		self.pattern_lines[line_idx].extend(tiles_to_add)
-		return overflow
-
-	def add_to_floor_line(self, tiles: List[Tile]):
-		"""Fügt Fliesen zur Bodenreihe hinzu"""
-		self.floor_line.extend(tiles)
+from typing import List, Optional
 
-	def score_floor_line(self):
-		"""Berechnet Minuspunkte für Bodenreihe"""
-		penalties = [-1, -1, -2, -2, -2, -3, -3]
+from analysis import AnalysisBridge
+from engine import TileColor, GamePhase, WallPattern, AzulGame, COLORS, COLOR_INDEX, CENTER, FLOOR
+from spectator import MatchFeed
 
-		for i, tile in enumerate(self.floor_line[:7]):
-			if i < len(penalties):
-				self.score = max(0, self.score + penalties[i])
+# Bedenkzeit der KI pro Zug in Sekunden
+AI_TIME_LIMIT = 1.0
+# Suchzeit für einen Tipp in Sekunden
+HINT_TIME_LIMIT = 3.0
+HINT_COLOR = "#00FF88"
+COLOR_NAMES = ("Blau", "Gelb", "Rot", "Schwarz", "Weiß")
 
-		# Startspielermarker zählt auch als -1
-		if self.has_first_player_marker:
-			self.score = max(0, self.score - 1)
+# Zuschauermodus: höchstens ein Bild alle FRAME_MS Millisekunden (30 fps);
+# Tempostufen des Schiebereglers in Zügen pro Sekunde (0 = nur Einzelschritt, None = so schnell wie möglich)
+FRAME_MS = 33
+SPECTATOR_SPEEDS = (0, 1, 2, 5, 10, 20, 50, 100, None)
 
-	def move_complete_lines_to_wall(self) -> List[Tile]:
-		"""Bewegt komplette Musterreihen zur Wand, gibt entfernte Fliesen zurück"""
-		removed_tiles = []
-
-		for i in range(5):
-			line = self.pattern_lines[i]
-			if len(line) == i + 1:  # Reihe komplett
-				# Nimm rechte Fliese (letzte)
-				tile = line[-1]
-
-				# Finde Position in der Wand
-				for j in range(5):
-					if WallPattern.PATTERN[i][j] == tile.color:
-						self.wall[i][j] = tile
-						self.score += self._calculate_tile_score(i, j)
-						break
-
-				# Entferne restliche Fliesen
-				removed_tiles.extend(line[:-1])
-				self.pattern_lines[i] = []
-
-		return removed_tiles
-
-	def _calculate_tile_score(self, row: int, col: int) -> int:
-		"""Berechnet Punkte für neu gesetzte Fliese"""
-		score = 0
-
-		# Horizontale Gruppe
-		h_start = col
-		while h_start > 0 and self.wall[row][h_start - 1]:
-			h_start -= 1
-
-		h_end = col
-		while h_end < 4 and self.wall[row][h_end + 1]:
-			h_end += 1
-
-		h_count = h_end - h_start + 1
-		if h_count > 1:
-			score += h_count
-
-		# Vertikale Gruppe
-		v_start = row
-		while v_start > 0 and self.wall[v_start - 1][col]:
-			v_start -= 1
-
-		v_end = row
-		while v_end < 4 and self.wall[v_end + 1][col]:
-			v_end += 1
-
-		v_count = v_end - v_start + 1
-		if v_count > 1:
-			score += v_count
-
-		# Einzelne Fliese
-		if h_count == 1 and v_count == 1:
-			score = 1
-
-		return score
-
-	def calculate_end_game_bonus(self) -> int:
-		"""Berechnet Endspiel-Bonuspunkte"""
-		bonus = 0
-
-		# Horizontale Reihen (2 Punkte pro vollständiger Reihe)
-		for row in self.wall:
-			if all(tile is not None for tile in row):
-				bonus += 2
-
-		# Vertikale Reihen (7 Punkte pro vollständiger Reihe)
-		for col in range(5):
-			if all(self.wall[row][col] is not None for row in range(5)):
-				bonus += 7
-
-		# Alle 5 Fliesen einer Farbe (10 Punkte)
-		for color in TileColor:
-			count = 0
-			for row in range(5):
-				for col in range(5):
-					if self.wall[row][col] and WallPattern.PATTERN[row][col] == color:
-						count += 1
-			if count == 5:
-				bonus += 10
-
-		return bonus
-
-	def has_complete_row(self) -> bool:
-		"""Prüft ob eine horizontale Reihe vollständig ist"""
-		return any(all(tile is not None for tile in row) for row in self.wall)
-
-
-class AzulGame:
-	"""Hauptspiellogik"""
-
-	def __init__(self, num_players: int):
-		self.num_players = num_players
-		self.players = [PlayerBoard() for _ in range(num_players)]
-		self.current_player = 0
-		self.phase = GamePhase.PATTERN
-		self.first_player_marker_taken = False
-
-		# Manufakturen
-		factory_count = {2: 5, 3: 7, 4: 9}[num_players]
-		self.factories = [Factory() for _ in range(factory_count)]
-		self.center = []  # Tischmitte
-
-		# Fliesenbeutel
-		self.bag = []
-		self.discarded = []
-		self._fill_bag()
-
-		# Fliesen auf Manufakturen verteilen
-		self._refill_factories()
-
-	def _fill_bag(self):
-		"""Füllt den Beutel mit 100 Fliesen (20 pro Farbe)"""
-		for color in TileColor:
-			self.bag.extend([Tile(color) for _ in range(20)])
-		random.shuffle(self.bag)
-
-	def _refill_factories(self):
-		"""Bestückt jedes Manufakturplättchen mit 4 Fliesen"""
-		for factory in self.factories:
-			tiles_needed = 4
-			while tiles_needed > 0 and (self.bag or self.discarded):
-				if not self.bag:
-					self.bag = self.discarded
-					self.discarded = []
-					random.shuffle(self.bag)
-
-				if self.bag:
-					tiles_to_add = min(tiles_needed, len(self.bag))
-					factory.add_tiles(self.bag[:tiles_to_add])
-					self.bag = self.bag[tiles_to_add:]
-					tiles_needed -= tiles_to_add
-
-	def get_available_colors_factory(self, factory_idx: int) -> List[TileColor]:
-		"""Gibt verfügbare Farben einer Manufaktur zurück"""
-		if factory_idx < 0 or factory_idx >= len(self.factories):
-			return []
-		return list(set(t.color for t in self.factories[factory_idx].tiles))
-
-	def get_available_colors_center(self) -> List[TileColor]:
-		"""Gibt verfügbare Farben aus der Mitte zurück"""
-		return list(set(t.color for t in self.center))
-
-	def take_from_factory(self, player_idx: int, factory_idx: int, color: TileColor, pattern_line_idx: int):
-		"""Spieler nimmt Fliesen von Manufaktur"""
-		if player_idx != self.current_player:
-			return False
-
-		factory = self.factories[factory_idx]
-		taken, remaining = factory.take_color(color)
-
-		if not taken:
-			return False
-
-		# Übrige Fliesen in die Mitte
-		self.center.extend(remaining)
-
-		# Fliesen platzieren
-		self._place_tiles(player_idx, taken, pattern_line_idx)
-		self._next_turn()
-		return True
-
-	def take_from_center(self, player_idx: int, color: TileColor, pattern_line_idx: int):
-		"""Spieler nimmt Fliesen aus der Mitte"""
-		if player_idx != self.current_player:
-			return False
-
-		taken = [t for t in self.center if t.color == color]
-		self.center = [t for t in self.center if t.color != color]
-
-		if not taken:
-			return False
-
-		# Startspielermarker
-		if not self.first_player_marker_taken:
-			self.players[player_idx].has_first_player_marker = True
-			self.first_player_marker_taken = True
-
-		# Fliesen platzieren
-		self._place_tiles(player_idx, taken, pattern_line_idx)
-		self._next_turn()
-		return True
-
-	def _place_tiles(self, player_idx: int, tiles: List[Tile], pattern_line_idx: int):
-		"""Platziert Fliesen auf Spielerablage"""
-		player = self.players[player_idx]
-
-		if pattern_line_idx == -1:  # Direkt in Bodenreihe
-			player.add_to_floor_line(tiles)
-		else:
-			overflow = player.add_to_pattern_line(pattern_line_idx, tiles)
-			if overflow:
-				player.add_to_floor_line(overflow)
-
-	def _next_turn(self):
-		"""Wechselt zum nächsten Spieler oder Phase"""
-		# Prüfe ob Musterphase beendet
-		if not any(f.tiles for f in self.factories) and not self.center:
-			self._start_tiling_phase()
-		else:
-			self.current_player = (self.current_player + 1) % self.num_players
-
-	def _start_tiling_phase(self):
-		"""Startet Fliesungsphase"""
-		self.phase = GamePhase.TILING
-
-		for player in self.players:
-			# Verschiebe komplette Reihen zur Wand
-			removed = player.move_complete_lines_to_wall()
-			self.discarded.extend(removed)
-
-			# Werte Bodenreihe
-			player.score_floor_line()
-			self.discarded.extend(player.floor_line)
-			player.floor_line = []
-
-		# Prüfe Spielende
-		if any(p.has_complete_row() for p in self.players):
-			self._end_game()
-		else:
-			self._prepare_next_round()
-
-	def _prepare_next_round(self):
-		"""Bereitet nächste Runde vor"""
-		self.phase = GamePhase.PREPARATION
-
-		# Startspieler für nächste Runde
-		for i, player in enumerate(self.players):
-			if player.has_first_player_marker:
-				self.current_player = i
-				player.has_first_player_marker = False
-				break
-
-		self.first_player_marker_taken = False
-		self._refill_factories()
-		self.phase = GamePhase.PATTERN
-
-	def _end_game(self):
-		"""Beendet das Spiel und berechnet Endwertung"""
-		self.phase = GamePhase.GAME_END
-
-		for player in self.players:
-			player.score += player.calculate_end_game_bonus()
+# Fliesenpositionen auf einer Manufaktur (2x2 Grid)
+FACTORY_TILE_POSITIONS = ((30, 30), (65, 30), (30, 65), (65, 65))
+FLOOR_PENALTY_LABELS = ("-1", "-1", "-2", "-2", "-2", "-3", "-3")
 
 
 class AzulGUI:
 	"""Grafische Benutzeroberfläche für Azul"""
 
-	def __init__(self, root):
+	def __init__(self, root, spectate: Optional[List[str]] = None, seed: Optional[int] = None):
+		"""spectate: Spielerangaben wie in selfplay ("random", "mcts:200", ...) für den Zuschauermodus"""
 		self.root = root
 		self.root.title("Azul")
 		self.root.configure(bg="#2C2E3B")
 
-		# Spieleranzahl-Dialog
-		self.num_players = self._ask_player_count()
+		# Zuschauermodus: alle Sitzplätze spielen Computergegner in einem eigenen Prozess
+		self.spectate = spectate
+		self.feed = None
+		if spectate:
+			self.num_players, ai_seats = len(spectate), [True] * 4
+			self.feed = MatchFeed(spectate, seed if seed is not None else random.getrandbits(64))
+		else:
+			# Spieleranzahl-Dialog
+			self.num_players, ai_seats = self._ask_player_count()
 
 		# Spiel initialisieren
 		self.game = AzulGame(self.num_players)
+
+		# Sitzplätze der KI; ihre Züge und die Tipps werden im Hintergrund gesucht
+		self.ai_players = {i for i in range(self.num_players) if ai_seats[i]}
+		self.ai_status = ""
+		self.analysis = AnalysisBridge(root, self._on_analysis_progress, self._on_analysis_result,
+		                               self._on_analysis_error)
+		self._analysis_kind = None  # "ai" oder "hint", solange eine Suche läuft
+		self._hint_marks = []  # (Widget, ursprüngliche Optionen) der Tipp-Hervorhebung
 		
 		# Spielernamen
-		self.player_names = [f"Spieler {i+1}" for i in range(self.num_players)]
+		self.player_names = [f"KI {i+1}" if i in self.ai_players else f"Spieler {i+1}"
+		                     for i in range(self.num_players)]
+		if spectate:
+			self.player_names = list(spectate)
 
 		# GUI-Variablen
 		self.selected_factory = None
 		self.selected_color = None
 		self.selected_pattern_line = None
 
+		# Zuletzt gezeichneter Zustand je Anzeigebereich (siehe _changed)
+		self._rendered = {}
+
 		# Hauptframe
 		self.main_frame = ttk.Frame(root, style="Dark.TFrame")
 		self.main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -404,14 +83,17 @@ class AzulGUI:
 		self._build_gui()
 
 		# Spiel starten
-		self._update_display()
+		if self.feed is not None:
+			self._start_spectating()
+		else:
+			self._update_display()
 
 	def _ask_player_count(self):
 		"""Dialog für Spieleranzahl"""
 		dialog = tk.Toplevel(self.root)
 		dialog.title("Spieleranzahl")
 		dialog.configure(bg="#2C2E3B")
-		dialog.geometry("300x150")
+		dialog.geometry("300x200")
 
 		# Zentrieren
 		dialog.transient(self.root)
@@ -430,8 +112,20 @@ class AzulGUI:
 			          bg="#4A4C5B", fg="black", font=("Arial", 12),
 			          command=lambda x=i: [result.set(x), dialog.destroy()]).pack(side=tk.LEFT, padx=5)
 
+		# Sitzplätze, die von der KI gespielt werden
+		ai_frame = tk.Frame(dialog, bg="#2C2E3B")
+		ai_frame.pack(pady=10)
+
+		tk.Label(ai_frame, text="KI:", bg="#2C2E3B", fg="white",
+		         font=("Arial", 10)).pack(side=tk.LEFT)
+
+		ai_seats = [tk.BooleanVar(value=False) for _ in range(4)]
+		for i, var in enumerate(ai_seats):
+			tk.Checkbutton(ai_frame, text=str(i + 1), variable=var, bg="#2C2E3B", fg="white",
+			               selectcolor="#4A4C5B", activebackground="#2C2E3B").pack(side=tk.LEFT)
+
 		dialog.wait_window()
-		return result.get()
+		return result.get(), [var.get() for var in ai_seats]
 
 	def _configure_styles(self):
 		"""Konfiguriert ttk Styles"""
@@ -457,6 +151,14 @@ class AzulGUI:
 		self.current_player_label = ttk.Label(info_frame, text="", style="Dark.TLabel", font=("Arial", 14))
 		self.current_player_label.pack()
 
+		# Tipp: bester Zug aus einer Hintergrundsuche
+		ttk.Button(info_frame, text="Tipp", style="Dark.TButton", command=self._on_hint_click).pack(pady=(5, 0))
+		self.hint_label = ttk.Label(info_frame, text="", style="Dark.TLabel", font=("Arial", 12))
+		self.hint_label.pack()
+
+		if self.feed is not None:
+			self._build_spectator_controls(info_frame)
+
 		# Linker Bereich: Manufakturen und Tischmitte
 		factory_frame = ttk.Frame(self.main_frame, style="Dark.TFrame")
 		factory_frame.grid(row=1, column=0, sticky="nsew", padx=(0, 20))
@@ -491,6 +193,20 @@ class AzulGUI:
 		self.main_frame.columnconfigure(1, weight=1)
 		self.main_frame.rowconfigure(1, weight=1)
 
+	def _build_spectator_controls(self, parent):
+		"""Pause, Einzelschritt und Tempo für den Zuschauermodus"""
+		controls = ttk.Frame(parent, style="Dark.TFrame")
+		controls.pack(pady=(5, 0))
+
+		self.pause_button = ttk.Button(controls, text="Pause", style="Dark.TButton", command=self._toggle_pause)
+		self.pause_button.pack(side=tk.LEFT, padx=5)
+		ttk.Button(controls, text="Schritt", style="Dark.TButton", command=self._step).pack(side=tk.LEFT, padx=5)
+
+		self.speed = tk.IntVar(value=len(SPECTATOR_SPEEDS) - 1)
+		tk.Scale(controls, from_=0, to=len(SPECTATOR_SPEEDS) - 1, orient=tk.HORIZONTAL, showvalue=0,
+		         variable=self.speed, command=lambda value: self._update_status(),
+		         bg="#2C2E3B", highlightthickness=0).pack(side=tk.LEFT, padx=5)
+
 	def _create_factory_widget(self, parent, factory_idx):
 		"""Erstellt Widget für eine Manufaktur"""
 		frame = tk.Frame(parent, bg="#4A4C5B", relief=tk.RAISED, bd=2)
@@ -501,7 +217,9 @@ class AzulGUI:
 		# Click-Handler
 		canvas.bind("<Button-1>", lambda e: self._on_factory_click(factory_idx))
 
-		return {"frame": frame, "canvas": canvas}
+		tiles = [self._create_tile(canvas, x, y) for x, y in FACTORY_TILE_POSITIONS]
+
+		return {"frame": frame, "canvas": canvas, "tiles": tiles}
 
 	def _create_center_widget(self, parent):
 		"""Erstellt Widget für Tischmitte"""
@@ -513,7 +231,19 @@ class AzulGUI:
 		# Click-Handler
 		canvas.bind("<Button-1>", lambda e: self._on_center_click())
 
-		return {"frame": frame, "canvas": canvas}
+		# Je Farbe ein Platz mit Fliese und Anzahl, von links nach rechts belegt
+		tiles, counts = [], []
+		for k in range(5):
+			x = 10 + k * 40
+			tiles.append(self._create_tile(canvas, x, 10, 30))
+			counts.append(canvas.create_text(x + 15, 50, text="", fill="white",
+			                                 font=("Arial", 12, "bold"), state=tk.HIDDEN))
+
+		# Startspielermarker
+		marker = canvas.create_text(100, 120, text="1", fill="white",
+		                            font=("Arial", 16, "bold"), state=tk.HIDDEN)
+
+		return {"frame": frame, "canvas": canvas, "tiles": tiles, "counts": counts, "marker": marker}
 
 	def _create_player_widget(self, parent, player_idx):
 		"""Erstellt Widget für Spielerablage"""
@@ -525,7 +255,7 @@ class AzulGUI:
 
 		name_entry = tk.Entry(header, width=12, font=("Arial", 12, "bold"),
 		                      bg="#4A4C5B", fg="white", insertbackground="white")
-		name_entry.insert(0, f"Spieler {player_idx + 1}")
+		name_entry.insert(0, self.player_names[player_idx])
 		name_entry.bind('<Return>', lambda e: self._update_player_name(player_idx, name_entry.get()))
 		name_entry.bind('<FocusOut>', lambda e: self._update_player_name(player_idx, name_entry.get()))
 		name_entry.pack(side=tk.LEFT)
@@ -542,12 +272,14 @@ class AzulGUI:
 		         font=("Arial", 10)).grid(row=0, column=0, columnspan=2)
 
 		pattern_canvases = []
+		pattern_tiles = []
 		for i in range(5):
 			canvas = tk.Canvas(pattern_frame, width=30 * (i + 1), height=30,
 			                   bg="#5A5C6B", highlightthickness=1, highlightbackground="white")
 			canvas.grid(row=i + 1, column=0, padx=5, pady=2)
 			canvas.bind("<Button-1>", lambda e, idx=i: self._on_pattern_line_click(player_idx, idx))
 			pattern_canvases.append(canvas)
+			pattern_tiles.append([self._create_tile(canvas, k * 30 + 2, 2, 26) for k in range(i + 1)])
 
 		# Wand
 		wall_frame = tk.Frame(frame, bg="#3A3C4B")
@@ -559,6 +291,18 @@ class AzulGUI:
 		wall_canvas = tk.Canvas(wall_frame, width=150, height=150, bg="#4A4C5B", highlightthickness=0)
 		wall_canvas.pack()
 
+		# Wandmuster einmalig zeichnen: leeres Feld mit Farbindikator, darüber die (verdeckte) Fliese
+		wall_empty = []
+		wall_tiles = []
+		for row in range(5):
+			for col in range(5):
+				x, y = col * 30, row * 30
+				color = WallPattern.PATTERN[row][col]
+				wall_empty.append((
+					wall_canvas.create_rectangle(x, y, x + 30, y + 30, fill="#6A6C7B", outline="white"),
+					wall_canvas.create_rectangle(x + 10, y + 10, x + 20, y + 20, fill=color.value, outline="")))
+				wall_tiles.append(self._create_tile(wall_canvas, x, y, color=color))
+
 		# Bodenreihe
 		floor_frame = tk.Frame(frame, bg="#3A3C4B")
 		floor_frame.pack(pady=5)
@@ -569,13 +313,27 @@ class AzulGUI:
 		floor_canvas = tk.Canvas(floor_frame, width=210, height=30, bg="#5A5C6B", highlightthickness=0)
 		floor_canvas.pack()
 
+		# Felder mit Minuspunkten einmalig zeichnen
+		for j, penalty in enumerate(FLOOR_PENALTY_LABELS):
+			x = j * 30
+			floor_canvas.create_rectangle(x, 0, x + 30, 30, fill="#5A5C6B", outline="white")
+			floor_canvas.create_text(x + 15, 15, text=penalty, fill="white", font=("Arial", 8))
+		floor_tiles = [self._create_tile(floor_canvas, j * 30 + 2, 2, 26) for j in range(7)]
+		floor_marker = floor_canvas.create_text(15, 15, text="1", fill="white",
+		                                        font=("Arial", 12, "bold"), state=tk.HIDDEN)
+
 		return {
 			"frame": frame,
 			"name_entry": name_entry,
 			"score_label": score_label,
 			"pattern_canvases": pattern_canvases,
+			"pattern_tiles": pattern_tiles,
 			"wall_canvas": wall_canvas,
-			"floor_canvas": floor_canvas
+			"wall_empty": wall_empty,
+			"wall_tiles": wall_tiles,
+			"floor_canvas": floor_canvas,
+			"floor_tiles": floor_tiles,
+			"floor_marker": floor_marker
 		}
 
 	def _update_player_name(self, player_idx, new_name):
@@ -584,118 +342,293 @@ class AzulGUI:
 			self.player_names[player_idx] = new_name.strip()
 			self._update_display()
 
-	def _draw_tile(self, canvas, x, y, color: TileColor, size=25):
-		"""Zeichnet eine einzelne Fliese"""
-		canvas.create_rectangle(x, y, x + size, y + size,
-		                        fill=color.value, outline="black", width=2)
+	def _create_tile(self, canvas, x, y, size=25, color: TileColor = None):
+		"""Legt eine Fliese an, zunächst verdeckt; _set_tile färbt und zeigt sie"""
+		return canvas.create_rectangle(x, y, x + size, y + size, fill=color.value if color else "",
+		                               outline="black", width=2, state=tk.HIDDEN)
+
+	def _set_tile(self, canvas, item, color: TileColor = None):
+		"""Zeigt die Fliese item in der Farbe color oder verdeckt sie (None)"""
+		if color is None:
+			canvas.itemconfig(item, state=tk.HIDDEN)
+		else:
+			canvas.itemconfig(item, fill=color.value, state=tk.NORMAL)
+
+	def _changed(self, key, state) -> bool:
+		"""Prüft, ob sich der Zustand eines Anzeigebereichs seit dem letzten Zeichnen geändert hat"""
+		if self._rendered.get(key) == state:
+			return False
+		self._rendered[key] = state
+		return True
 
 	def _update_display(self):
 		"""Aktualisiert die gesamte Anzeige"""
-		# Phase und aktueller Spieler
-		self.phase_label.config(text=f"Phase: {self.game.phase.value}")
-		if self.game.phase == GamePhase.PATTERN:
-			current_player_name = self.player_names[self.game.current_player]
-			self.current_player_label.config(text=f"{current_player_name} ist am Zug")
-		else:
-			self.current_player_label.config(text="")
+		self._update_status()
+
+		# Nur Bereiche neu zeichnen, deren Zustand sich geändert hat; die Canvas-Elemente
+		# bleiben bestehen und werden per itemconfig umgefärbt, gezeigt oder verdeckt
+		game = self.game
 
 		# Manufakturen
 		for i, factory_widget in enumerate(self.factory_widgets):
+			factory = game.factories[i]
+			if not self._changed(("factory", i), tuple(factory.counts)):
+				continue
 			canvas = factory_widget["canvas"]
-			canvas.delete("all")
-
-			factory = self.game.factories[i]
-			if factory.tiles:
-				# Fliesen im 2x2 Grid anordnen
-				positions = [(30, 30), (65, 30), (30, 65), (65, 65)]
-				for j, tile in enumerate(factory.tiles[:4]):
-					x, y = positions[j]
-					self._draw_tile(canvas, x, y, tile.color)
-
-		# Tischmitte
-		canvas = self.center_widget["canvas"]
-		canvas.delete("all")
-
-		if self.game.center:
-			# Fliesen gruppiert nach Farbe anzeigen
-			color_groups = {}
-			for tile in self.game.center:
-				if tile.color not in color_groups:
-					color_groups[tile.color] = 0
-				color_groups[tile.color] += 1
-
-			x_offset = 10
-			for color, count in color_groups.items():
-				self._draw_tile(canvas, x_offset, 10, color, 30)
-				canvas.create_text(x_offset + 15, 50, text=str(count),
-				                   fill="white", font=("Arial", 12, "bold"))
-				x_offset += 40
-
-		# Startspielermarker
-		if not self.game.first_player_marker_taken and self.game.phase == GamePhase.PATTERN:
-			canvas.create_text(100, 120, text="1", fill="white",
-			                   font=("Arial", 16, "bold"))
+			tiles = factory.tiles[:4]
+			for j, item in enumerate(factory_widget["tiles"]):
+				self._set_tile(canvas, item, tiles[j].color if j < len(tiles) else None)
+
+		# Tischmitte: Fliesen gruppiert nach Farbe, Startspielermarker
+		marker = not game.first_player_marker_taken and game.phase == GamePhase.PATTERN
+		if self._changed("center", (tuple(game.center_counts), marker)):
+			canvas = self.center_widget["canvas"]
+			present = [(c, count) for c, count in enumerate(game.center_counts) if count]
+			for k, (tile, label) in enumerate(zip(self.center_widget["tiles"], self.center_widget["counts"])):
+				if k < len(present):
+					c, count = present[k]
+					self._set_tile(canvas, tile, COLORS[c])
+					canvas.itemconfig(label, text=str(count), state=tk.NORMAL)
+				else:
+					self._set_tile(canvas, tile)
+					canvas.itemconfig(label, state=tk.HIDDEN)
+			canvas.itemconfig(self.center_widget["marker"], state=tk.NORMAL if marker else tk.HIDDEN)
 
 		# Spielerablagen
 		for i, player_widget in enumerate(self.player_widgets):
-			player = self.game.players[i]
+			player = game.players[i]
 
 			# Punkte
-			player_widget["score_label"].config(text=f"{player.score} Punkte")
+			if self._changed(("score", i), player.score):
+				player_widget["score_label"].config(text=f"{player.score} Punkte")
 
 			# Musterreihen
 			for j, canvas in enumerate(player_widget["pattern_canvases"]):
-				canvas.delete("all")
-				line = player.pattern_lines[j]
-				for k, tile in enumerate(line):
-					self._draw_tile(canvas, k * 30 + 2, 2, tile.color, 26)
-
-			# Wand
-			canvas = player_widget["wall_canvas"]
-			canvas.delete("all")
-
-			# Zeichne Wandmuster
-			for row in range(5):
-				for col in range(5):
-					x, y = col * 30, row * 30
-					color = WallPattern.PATTERN[row][col]
-
-					if player.wall[row][col]:
-						# Fliese gesetzt
-						self._draw_tile(canvas, x, y, color)
-					else:
-						# Leeres Feld mit Farbindikator
-						canvas.create_rectangle(x, y, x + 30, y + 30,
-						                        fill="#6A6C7B", outline="white")
-						canvas.create_rectangle(x + 10, y + 10, x + 20, y + 20,
-						                        fill=color.value, outline="")
+				c, count = player.line_colors[j], player.line_counts[j]
+				if self._changed(("line", i, j), (c, count)):
+					for k, item in enumerate(player_widget["pattern_tiles"][j]):
+						self._set_tile(canvas, item, COLORS[c] if k < count else None)
+
+			# Wand: nur Felder, die seit dem letzten Zeichnen belegt oder frei geworden sind
+			bits = player.wall_bits
+			old_bits = self._rendered.get(("wall", i), 0)
+			if self._changed(("wall", i), bits):
+				canvas = player_widget["wall_canvas"]
+				diff = bits ^ old_bits
+				while diff:
+					low = diff & -diff
+					cell = low.bit_length() - 1
+					placed = bool(bits & low)
+					for item in player_widget["wall_empty"][cell]:
+						canvas.itemconfig(item, state=tk.HIDDEN if placed else tk.NORMAL)
+					canvas.itemconfig(player_widget["wall_tiles"][cell], state=tk.NORMAL if placed else tk.HIDDEN)
+					diff ^= low
 
 			# Bodenreihe
-			canvas = player_widget["floor_canvas"]
-			canvas.delete("all")
+			if self._changed(("floor", i), (tuple(player.floor_counts), player.has_first_player_marker)):
+				canvas = player_widget["floor_canvas"]
+				tiles = player.floor_line[:7]
+				for j, item in enumerate(player_widget["floor_tiles"]):
+					self._set_tile(canvas, item, tiles[j].color if j < len(tiles) else None)
+
+				# Startspielermarker
+				canvas.itemconfig(player_widget["floor_marker"],
+				                  state=tk.NORMAL if player.has_first_player_marker else tk.HIDDEN)
+
+		# Im Zuschauermodus steuert _spectator_frame Spielende und Züge
+		if self.feed is not None:
+			return
 
-			penalties = ["-1", "-1", "-2", "-2", "-2", "-3", "-3"]
-			for j in range(7):
-				x = j * 30
-				canvas.create_rectangle(x, 0, x + 30, 30, fill="#5A5C6B", outline="white")
-				canvas.create_text(x + 15, 15, text=penalties[j], fill="white", font=("Arial", 8))
+		# Prüfe auf Spielende
+		if self.game.phase == GamePhase.GAME_END:
+			self._show_game_end()
+		elif self._is_ai_turn() and self._analysis_kind != "ai":
+			self._start_ai_search()
+
+	def _update_status(self):
+		"""Phase, KI-Status und aktueller Spieler"""
+		phase_text = f"Phase: {self.game.phase.value}"
+		if self.feed is not None:
+			speed = SPECTATOR_SPEEDS[self.speed.get()]
+			tempo = "Einzelschritt" if speed == 0 else "max." if speed is None else f"{speed} Züge/s"
+			phase_text += (f" (Zug {self._shown}, {len(self._pending)} vorausgespielt, "
+			               f"{'pausiert' if self._paused else tempo})")
+		elif self.ai_status:
+			phase_text += f" ({self.ai_status})"
+		self.phase_label.config(text=phase_text)
+		if self.game.phase == GamePhase.PATTERN:
+			current_player_name = self.player_names[self.game.current_player]
+			self.current_player_label.config(text=f"{current_player_name} ist am Zug")
+		else:
+			self.current_player_label.config(text="")
 
-			for j, tile in enumerate(player.floor_line[:7]):
-				if j < 7:
-					self._draw_tile(canvas, j * 30 + 2, 2, tile.color, 26)
+	def _start_spectating(self):
+		self._pending = collections.deque()  # eingetroffene, noch nicht gezeigte Stellungen
+		self._shown = -1  # Züge der angezeigten Stellung (-1 = noch keine)
+		self._paused = False
+		self._credit = 0.0  # angesparte Züge bei begrenztem Tempo
+		self._last_frame = time.perf_counter()
+		self._frame_id = None
+		self._display_rng = random.Random(0)  # die angezeigten Stellungen ziehen nie nach
+		self._spectator_frame()
+
+	def _spectator_frame(self):
+		"""Bildtakt des Zuschauermodus: neue Stellungen abholen, je nach Tempo vorrücken, einmal zeichnen"""
+		self._frame_id = None
+		self._pending.extend(self.feed.poll())
+
+		now = time.perf_counter()
+		speed = SPECTATOR_SPEEDS[self.speed.get()]
+		if self._shown < 0:
+			steps = 1  # Ausgangsstellung immer zeigen
+		elif self._paused or speed == 0:
+			steps, self._credit = 0, 0.0
+		elif speed is None:
+			steps = len(self._pending)
+		else:
+			self._credit = min(self._credit + speed * (now - self._last_frame), len(self._pending) + 1.0)
+			steps = int(self._credit)
+			self._credit -= steps
+		self._last_frame = now
+		self._advance(steps)
+
+		if self.feed.finished and not self._pending:
+			self._finish_spectating()
+		else:
+			self._frame_id = self.root.after(FRAME_MS, self._spectator_frame)
 
-			# Startspielermarker
-			if player.has_first_player_marker:
-				canvas.create_text(15, 15, text="1", fill="white",
-				                   font=("Arial", 12, "bold"))
+	def _advance(self, steps: int):
+		"""Überspringt steps - 1 Stellungen und zeigt die nächste; gezeichnet wird einmal"""
+		steps = min(steps, len(self._pending))
+		if not steps:
+			self._update_status()
+			return
+		for _ in range(steps - 1):
+			self._pending.popleft()
+		self.game = AzulGame.from_bytes(self._pending.popleft(), self._display_rng)
+		self._shown += steps
+		self._update_display()
 
-		# Prüfe auf Spielende
-		if self.game.phase == GamePhase.GAME_END:
+	def _toggle_pause(self):
+		self._paused = not self._paused
+		self.pause_button.config(text="Weiter" if self._paused else "Pause")
+		self._update_status()
+
+	def _step(self):
+		"""Pausiert und zeigt genau den nächsten Zug"""
+		if not self._paused:
+			self._toggle_pause()
+		self._pending.extend(self.feed.poll())
+		self._advance(1)
+
+	def _finish_spectating(self):
+		self.feed.close()
+		self._update_status()
+		if self.feed.error:
+			messagebox.showerror("Zuschauermodus", self.feed.error)
+		else:
 			self._show_game_end()
 
+	def _is_ai_turn(self):
+		return self.game.phase == GamePhase.PATTERN and self.game.current_player in self.ai_players
+
+	def _start_ai_search(self):
+		"""Startet die Suche für den KI-Zug im Hintergrund; gezogen wird in _on_analysis_result"""
+		self._clear_hint()
+		self._analysis_kind = "ai"
+		self.analysis.start(self.game, AI_TIME_LIMIT)
+
+	def _cancel_analysis(self):
+		"""Verwirft eine laufende Suche samt Tipp-Anzeige (nach einem Zug oder bei neuem Spiel)"""
+		self.analysis.cancel()
+		self._analysis_kind = None
+		self._clear_hint()
+
+	def _on_analysis_progress(self, job, move, stats):
+		if self._analysis_kind == "ai":
+			self.ai_status = f"KI denkt: {stats.playouts_per_sec:,.0f} Playouts/s"
+			self._update_status()
+		elif self._analysis_kind == "hint":
+			self._show_hint(move, stats, final=False)
+
+	def _on_analysis_result(self, job, move, stats):
+		kind, self._analysis_kind = self._analysis_kind, None
+		if kind == "ai":
+			self._play_ai_move(move, f"KI: {stats.playouts_per_sec:,.0f} Playouts/s")
+		elif kind == "hint":
+			self._show_hint(move, stats, final=True)
+
+	def _on_analysis_error(self, job, error):
+		"""Die Suche ist gescheitert: die KI zieht zufällig, damit die Partie weitergeht"""
+		kind, self._analysis_kind = self._analysis_kind, None
+		reason = f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+		if kind == "ai" and self._is_ai_turn():
+			self._play_ai_move(random.choice(self.game.legal_moves()),
+			                   f"KI-Suche fehlgeschlagen ({reason}), Zufallszug")
+		elif kind == "hint":
+			self.hint_label.config(text=f"Tipp fehlgeschlagen ({reason})")
+
+	def _play_ai_move(self, move, status):
+		"""Führt den Zug der KI aus und zeigt status im Statusfeld"""
+		if not self._is_ai_turn() or move not in self.game.legal_moves():
+			return
+
+		source, c, line = move
+		if source == CENTER:
+			self.game.take_from_center(self.game.current_player, COLORS[c], line)
+		else:
+			self.game.take_from_factory(self.game.current_player, source, COLORS[c], line)
+
+		self.ai_status = status
+		self._update_display()
+
+	def _on_hint_click(self):
+		"""Sucht im Hintergrund einen Tipp für den menschlichen Spieler am Zug"""
+		if self.game.phase != GamePhase.PATTERN or self._is_ai_turn():
+			return
+
+		self._clear_hint()
+		self.hint_label.config(text="Tipp wird gesucht ...")
+		self._analysis_kind = "hint"
+		self.analysis.start(self.game, HINT_TIME_LIMIT)
+
+	def _show_hint(self, move, stats, final):
+		"""Hebt Quelle und Zielreihe des empfohlenen Zugs hervor"""
+		self._clear_hint()
+		if move is None:
+			return
+
+		source, c, line = move
+		player_widget = self.player_widgets[self.game.current_player]
+		if source == CENTER:
+			source_widget, source_text = self.center_widget["frame"], "Tischmitte"
+		else:
+			source_widget, source_text = self.factory_widgets[source]["frame"], f"Manufaktur {source + 1}"
+		if line == FLOOR:
+			target_widget, target_text = player_widget["floor_canvas"], "Bodenreihe"
+		else:
+			target_widget, target_text = player_widget["pattern_canvases"][line], f"Reihe {line + 1}"
+
+		self._mark(source_widget, bg=HINT_COLOR)
+		self._mark(target_widget, highlightthickness=2, highlightbackground=HINT_COLOR)
+		suffix = "" if final else " ..."
+		self.hint_label.config(text=f"Tipp: {source_text}, {COLOR_NAMES[c]} → {target_text} "
+		                            f"({stats.iterations:,} Playouts){suffix}")
+
+	def _mark(self, widget, **options):
+		"""Setzt Optionen eines Widgets für die Tipp-Anzeige und merkt sich die alten Werte"""
+		self._hint_marks.append((widget, {key: widget.cget(key) for key in options}))
+		widget.config(**options)
+
+	def _clear_hint(self):
+		for widget, options in reversed(self._hint_marks):
+			widget.config(**options)
+		self._hint_marks = []
+		self.hint_label.config(text="")
+
 	def _on_factory_click(self, factory_idx):
 		"""Handler für Klick auf Manufaktur"""
-		if self.game.phase != GamePhase.PATTERN:
+		if self.game.phase != GamePhase.PATTERN or self._is_ai_turn():
 			return
 
 		colors = self.game.get_available_colors_factory(factory_idx)
@@ -710,7 +643,7 @@ class AzulGUI:
 
 	def _on_center_click(self):
 		"""Handler für Klick auf Tischmitte"""
-		if self.game.phase != GamePhase.PATTERN:
+		if self.game.phase != GamePhase.PATTERN or self._is_ai_turn():
 			return
 
 		colors = self.game.get_available_colors_center()
@@ -771,10 +704,7 @@ class AzulGUI:
 		player = self.game.players[self.game.current_player]
 
 		# Prüfe verfügbare Reihen
-		available_lines = []
-		for i in range(5):
-			if player.can_add_to_pattern_line(i, self.selected_color):
-				available_lines.append(i)
+		available_lines = player.target_lines(COLOR_INDEX[self.selected_color])
 
 		dialog = tk.Toplevel(self.root)
 		dialog.title("Musterreihe wählen")
@@ -817,6 +747,8 @@ class AzulGUI:
 			                                      self.selected_color, pattern_line_idx)
 
 		if success:
+			# Tipp bzw. Suche zur alten Stellung ist überholt
+			self._cancel_analysis()
 			self.selected_factory = None
 			self.selected_color = None
 			self._update_display()
@@ -864,18 +796,41 @@ class AzulGUI:
 		          font=("Arial", 12), command=self.root.quit).pack()
 
 	def _new_game(self):
-		"""Startet ein neues Spiel"""
+		"""Startet ein neues Spiel (im Zuschauermodus mit denselben Spielern)"""
+		self._shutdown()
 		self.root.destroy()
 		root = tk.Tk()
-		AzulGUI(root)
+		game = AzulGUI(root, self.spectate)
 		root.mainloop()
+		game._shutdown()
+
+	def _shutdown(self):
+		"""Beendet Hintergrundsuche und Zuschauer-Worker"""
+		self.analysis.shutdown()
+		if self.feed is not None:
+			if self._frame_id is not None:
+				self.root.after_cancel(self._frame_id)
+				self._frame_id = None
+			self.feed.close()
+
+
+def main(argv: Optional[List[str]] = None):
+	parser = argparse.ArgumentParser(description="Azul mit grafischer Oberfläche")
+	parser.add_argument("--zuschauen", nargs="+", metavar="SPIELER",
+	                    help="Zuschauermodus: 2-4 Computergegner wie bei selfplay, z.B. mcts:200 greedy")
+	parser.add_argument("--seed", type=int, default=None, help="Seed der Partie im Zuschauermodus")
+	args = parser.parse_args(argv)
+	if args.zuschauen is not None and not 2 <= len(args.zuschauen) <= 4:
+		parser.error("Der Zuschauermodus braucht 2-4 Spieler")
 
-
-def main():
 	root = tk.Tk()
-	game = AzulGUI(root)
+	try:
+		game = AzulGUI(root, args.zuschauen, args.seed)
+	except ValueError as e:
+		parser.error(str(e))
 	root.mainloop()
+	game._shutdown()
 
 
 if __name__ == "__main__":
-	main()
\ No newline at end of file
+	main(sys.argv[1:])
\ No newline at end of file
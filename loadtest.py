@@ -0,0 +1,145 @@
+"""Lasttest für server.py: viele simulierte Spieler über TCP.
+
+Aufruf: python -m loadtest -c 1000 -d 20 [--spawn]
+
+Jede Verbindung setzt sich an einen Tisch, spielt zufällige legale Züge und nach
+Partieende die nächste Partie. Gemessen werden bestätigte Züge pro Sekunde und die
+Latenz vom Senden eines Zugs bis zu seiner Bestätigung ("moved") durch den Server.
+Mit --spawn startet der Lasttest den Server selbst in einem eigenen Prozess.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+from engine import GamePhase
+from server import decode_diff, decode_state
+
+
+class LoadStats:
+	"""Gemeinsame Kennzahlen aller simulierten Spieler"""
+
+	def __init__(self):
+		self.latencies: List[float] = []
+		self.games = 0
+		self.errors = 0
+		self.elapsed = 0.0
+
+	@property
+	def moves_per_sec(self) -> float:
+		return len(self.latencies) / self.elapsed if self.elapsed > 0 else 0.0
+
+	def percentile(self, p: float) -> float:
+		if not self.latencies:
+			return 0.0
+		ordered = sorted(self.latencies)
+		return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+	def __repr__(self):
+		return (f"LoadStats(moves={len(self.latencies)}, moves/s={self.moves_per_sec:,.0f}, "
+		        f"p50={self.percentile(50) * 1000:.2f}ms, p99={self.percentile(99) * 1000:.2f}ms, "
+		        f"games={self.games}, errors={self.errors})")
+
+
+async def _client(host: str, port: int, players: int, deadline: float, stats: LoadStats, seed: int):
+	"""Ein simulierter Spieler: Partie für Partie, bis deadline erreicht ist"""
+	rng = random.Random(seed)
+	reader, writer = await asyncio.open_connection(host, port)
+
+	def send(message):
+		writer.write((json.dumps(message, separators=(",", ":")) + "\n").encode())
+
+	game = None
+	seat = -1
+	sent = 0.0
+	try:
+		send({"op": "join", "players": players})
+		while True:
+			line = await reader.readline()
+			if not line:
+				break
+			message = json.loads(line)
+			op = message["op"]
+			if op == "joined":
+				seat = message["seat"]
+			elif op == "start":
+				game = decode_state(message["state"], rng)
+			elif op == "moved":
+				if message["seat"] == seat:
+					# Hat der Server selbst gezogen, gibt es keine Latenz zu messen
+					if sent and not message.get("timeout"):
+						stats.latencies.append(time.perf_counter() - sent)
+					sent = 0.0
+				game.apply_events(decode_diff(message["diff"]))
+			elif op in ("end", "closed"):
+				stats.games += op == "end"
+				game = None
+				if time.perf_counter() >= deadline:
+					break
+				send({"op": "join", "players": players})
+			elif op == "error":
+				stats.errors += 1
+				sent = 0.0  # abgelehnter Zug: nicht auf eine Bestätigung warten
+
+			if game is not None and game.phase == GamePhase.PATTERN and game.current_player == seat and not sent:
+				moves = game.legal_moves()
+				if moves:
+					sent = time.perf_counter()
+					send({"op": "move", "move": list(rng.choice(moves))})
+			await writer.drain()
+	finally:
+		writer.close()
+
+
+async def run(host: str, port: int, connections: int, players: int, duration: float,
+              seed: Optional[int] = None) -> LoadStats:
+	"""Startet connections simulierte Spieler und misst duration Sekunden lang"""
+	stats = LoadStats()
+	rng = random.Random(seed)
+	start = time.perf_counter()
+	clients = [_client(host, port, players, start + duration, stats, rng.getrandbits(64))
+	           for _ in range(connections)]
+	results = await asyncio.gather(*clients, return_exceptions=True)
+	stats.errors += sum(isinstance(r, Exception) for r in results)
+	stats.elapsed = time.perf_counter() - start
+	return stats
+
+
+def _spawn_server(port: int) -> subprocess.Popen:
+	process = subprocess.Popen([sys.executable, "-m", "server", "--port", str(port)], stderr=subprocess.PIPE)
+	process.stderr.readline()  # "Server läuft auf ..."
+	return process
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description="Lasttest für den Azul-Spielserver")
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=7777)
+	parser.add_argument("-c", "--connections", type=int, default=200, help="simulierte Spieler")
+	parser.add_argument("-p", "--players", type=int, default=2, help="Spieler pro Tisch")
+	parser.add_argument("-d", "--duration", type=float, default=10.0, help="Dauer in Sekunden")
+	parser.add_argument("--seed", type=int, default=None)
+	parser.add_argument("--spawn", action="store_true", help="Server selbst starten")
+	args = parser.parse_args(argv)
+	if args.connections % args.players:
+		parser.error("--connections muss ein Vielfaches von --players sein")
+
+	server = _spawn_server(args.port) if args.spawn else None
+	try:
+		stats = asyncio.run(run(args.host, args.port, args.connections, args.players, args.duration, args.seed))
+	finally:
+		if server is not None:
+			server.terminate()
+			server.wait()
+	print(f"{len(stats.latencies):,} Züge in {stats.elapsed:.1f} s: {stats.moves_per_sec:,.0f} Züge/s, "
+	      f"Latenz p50 {stats.percentile(50) * 1000:.2f} ms, p99 {stats.percentile(99) * 1000:.2f} ms, "
+	      f"{stats.games} Partien, {stats.errors} Fehler")
+	return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
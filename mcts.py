@@ -0,0 +1,199 @@
+"""Monte-Carlo-Baumsuche (MCTS) als Computergegner für AzulGame.
+
+Die Suche arbeitet direkt auf dem Spiel über legal_moves()/apply()/undo(). Der
+Beutelinhalt ist für die Spieler verborgen: jede Iteration zieht die Nachfüllungen
+beim Rundenwechsel mit einem eigenen Zufallsgenerator (Determinisierung). Die
+Knoten sind nach Zugfolgen verknüpft (open loop), daher bleiben ihre Statistiken
+über verschiedene Nachfüllungen hinweg gültig und der Baum kann zwischen Zügen
+weiterverwendet werden.
+"""
+import math
+import random
+import time
+from typing import Dict, List, Optional
+
+from engine import AzulGame, GamePhase, Move, CENTER, FLOOR
+
+
+class SearchStats:
+	"""Kennzahlen der letzten Suche"""
+
+	def __init__(self, iterations: int = 0, elapsed: float = 0.0, reused_visits: int = 0):
+		self.iterations = iterations  # Jede Iteration endet mit genau einem Playout
+		self.elapsed = elapsed
+		self.reused_visits = reused_visits  # Besuche, die aus dem vorherigen Baum übernommen wurden
+
+	@property
+	def playouts_per_sec(self) -> float:
+		return self.iterations / self.elapsed if self.elapsed > 0 else 0.0
+
+	def __repr__(self):
+		return (f"SearchStats(iterations={self.iterations}, elapsed={self.elapsed:.3f}s, "
+		        f"playouts/s={self.playouts_per_sec:.0f})")
+
+
+class MCTSNode:
+	"""Knoten im Suchbaum; value ist aus Sicht des Spielers, der move gespielt hat"""
+
+	def __init__(self, move: Optional[Move] = None, player: int = -1):
+		self.move = move
+		self.player = player
+		self.children: Dict[Move, "MCTSNode"] = {}
+		self.visits = 0
+		self.value = 0.0
+
+
+def game_result(game: AzulGame) -> List[float]:
+	"""Ergebnis je Spieler: 1 für den Sieg, bei Gleichstand geteilt, sonst 0"""
+	scores = [p.score for p in game.players]
+	best = max(scores)
+	winners = scores.count(best)
+	return [1.0 / winners if s == best else 0.0 for s in scores]
+
+
+def rollout_move(game: AzulGame, rng: random.Random) -> Move:
+	"""Zufallszug für Playouts: zufällige Quelle und Farbe, dann eine zufällige passende Musterreihe
+
+	Die Bodenreihe wird nur gewählt, wenn keine Musterreihe die Farbe aufnehmen kann.
+	Das ist deutlich billiger als legal_moves() vollständig aufzuzählen.
+	"""
+	picks = [(CENTER, c) for c in range(5) if game.center_counts[c]]
+	for i, factory in enumerate(game.factories):
+		if factory.total:
+			counts = factory.counts
+			picks.extend((i, c) for c in range(5) if counts[c])
+
+	source, c = rng.choice(picks)
+	player = game.players[game.current_player]
+	lines = player.target_lines(c)
+	return source, c, rng.choice(lines) if lines else FLOOR
+
+
+class MCTSPlayer:
+	"""Computergegner mit Zeit- oder Iterationsbudget
+
+	Nach jedem gespielten Zug (auch fremden) sollte advance(move) aufgerufen werden,
+	damit der passende Teilbaum für den nächsten Zug erhalten bleibt.
+	"""
+
+	def __init__(self, time_limit: Optional[float] = 1.0, iterations: Optional[int] = None,
+	             exploration: float = 1.0, seed: Optional[int] = None):
+		if time_limit is None and iterations is None:
+			raise ValueError("time_limit oder iterations muss gesetzt sein")
+		self.time_limit = time_limit
+		self.iterations = iterations
+		self.exploration = exploration
+		self.rng = random.Random(seed)
+		self.root: Optional[MCTSNode] = None
+		self.last_stats = SearchStats()
+
+	def reset(self):
+		"""Verwirft den Suchbaum (z.B. bei einem neuen Spiel)"""
+		self.root = None
+
+	def advance(self, move: Move):
+		"""Übernimmt den Teilbaum nach einem gespielten Zug"""
+		if self.root is not None:
+			self.root = self.root.children.get(move)
+
+	def choose_move(self, game: AzulGame) -> Move:
+		"""Sucht den besten Zug für den aktuellen Spieler"""
+		moves = game.legal_moves()
+		if not moves:
+			raise ValueError("Keine legalen Züge")
+
+		self.search(game)
+		children = self.root.children
+		return max(moves, key=lambda m: children[m].visits if m in children else -1)
+
+	def search(self, game: AzulGame, should_stop=None) -> MCTSNode:
+		"""Führt die Suche im Rahmen des Budgets aus und gibt den Wurzelknoten zurück
+
+		should_stop ist eine optionale Funktion ohne Argumente, die die Suche vorzeitig beendet.
+		"""
+		if self.root is None:
+			self.root = MCTSNode()
+		root = self.root
+		reused = root.visits
+
+		# Nachfüllungen während der Suche über einen eigenen Generator ziehen
+		game_rng = game.rng
+		search_rng = random.Random()
+		game.rng = search_rng
+
+		start = time.perf_counter()
+		deadline = start + self.time_limit if self.time_limit is not None else None
+		done = 0
+		try:
+			while True:
+				if self.iterations is not None and done >= self.iterations:
+					break
+				if deadline is not None and time.perf_counter() >= deadline:
+					break
+				if should_stop is not None and should_stop():
+					break
+				# Neue Determinisierung des Beutels für jede Iteration
+				search_rng.seed(self.rng.getrandbits(64))
+				self._iterate(game, root)
+				done += 1
+		finally:
+			game.rng = game_rng
+
+		self.last_stats = SearchStats(done, time.perf_counter() - start, reused)
+		return root
+
+	def _iterate(self, game: AzulGame, root: MCTSNode):
+		"""Eine Iteration: Auswahl, Erweiterung, Playout, Rückpropagierung"""
+		path = [root]
+		applied = []
+		node = root
+
+		# Auswahl und Erweiterung
+		while game.phase != GamePhase.GAME_END:
+			moves = game.legal_moves()
+			if not moves:
+				break
+			untried = [m for m in moves if m not in node.children]
+			player = game.current_player
+			if untried:
+				move = self.rng.choice(untried)
+				child = MCTSNode(move, player)
+				node.children[move] = child
+			else:
+				child = self._select(node, moves)
+				move = child.move
+			game.apply(move)
+			applied.append(move)
+			path.append(child)
+			node = child
+			if untried:
+				break
+
+		# Playout
+		while game.phase == GamePhase.PATTERN and (game.center_total or any(f.total for f in game.factories)):
+			move = rollout_move(game, self.rng)
+			game.apply(move)
+			applied.append(move)
+
+		result = game_result(game)
+
+		for move in reversed(applied):
+			game.undo(move)
+
+		# Rückpropagierung
+		for n in path:
+			n.visits += 1
+			if n.player >= 0:
+				n.value += result[n.player]
+
+	def _select(self, node: MCTSNode, moves: List[Move]) -> MCTSNode:
+		"""UCB1-Auswahl unter den in dieser Determinisierung legalen Kindern"""
+		log_n = math.log(node.visits + 1)
+		c = self.exploration
+		best, best_ucb = None, -1.0
+		for move in moves:
+			child = node.children[move]
+			ucb = child.value / child.visits + c * math.sqrt(log_n / child.visits)
+			if ucb > best_ucb:
+				best, best_ucb = child, ucb
+		return best
@@ -0,0 +1,202 @@
+"""Parallele MCTS-Varianten über einen Prozesspool.
+
+Wurzel-Parallelisierung (RootParallelMCTS): jeder Worker-Prozess baut einen
+eigenen Suchbaum mit eigenem Seed, die Besuchszahlen der Wurzelzüge werden
+anschließend addiert.
+
+Blatt-Parallelisierung (LeafParallelMCTS): der Hauptprozess wählt stapelweise
+Blätter aus (mit virtuellem Verlust, damit sich die Pfade eines Stapels
+unterscheiden) und lässt die Playouts im Pool ausführen.
+"""
+import concurrent.futures
+import os
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from engine import AzulGame, GamePhase, Move
+from mcts import MCTSNode, MCTSPlayer, SearchStats, game_result, rollout_move
+
+
+def _root_search(state: bytes, time_limit: Optional[float], iterations: Optional[int],
+                 exploration: float, seed: int) -> Tuple[Dict[Move, int], int]:
+	"""Worker: unabhängige Suche, gibt (Besuche je Wurzelzug, Iterationen) zurück"""
+	rng = random.Random(seed)
+	game = AzulGame.from_bytes(state, random.Random(rng.getrandbits(64)))
+	player = MCTSPlayer(time_limit=time_limit, iterations=iterations, exploration=exploration,
+	                    seed=rng.getrandbits(64))
+	root = player.search(game)
+	return {move: child.visits for move, child in root.children.items()}, player.last_stats.iterations
+
+
+def _leaf_rollout(state: bytes, seed: int) -> List[float]:
+	"""Worker: spielt einen Playout vom übertragenen Zustand (AzulGame.to_bytes) bis zum Spielende"""
+	rng = random.Random(seed)
+	game = AzulGame.from_bytes(state, random.Random(rng.getrandbits(64)))
+	while game.phase == GamePhase.PATTERN and (game.center_total or any(f.total for f in game.factories)):
+		game.apply(rollout_move(game, rng))
+	return game_result(game)
+
+
+class _PoolMixin:
+	"""Verwaltet den Prozesspool (lazy erzeugt, mit close() bzw. als Kontextmanager beenden)"""
+
+	_executor = None
+
+	def _pool(self) -> concurrent.futures.ProcessPoolExecutor:
+		if self._executor is None:
+			self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+		return self._executor
+
+	def close(self):
+		if self._executor is not None:
+			self._executor.shutdown()
+			self._executor = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+class RootParallelMCTS(_PoolMixin):
+	"""Wurzel-parallele MCTS: unabhängige Bäume je Worker, Besuchszahlen werden zusammengeführt
+
+	time_limit und iterations gelten pro Worker.
+	"""
+
+	def __init__(self, workers: Optional[int] = None, time_limit: Optional[float] = 1.0,
+	             iterations: Optional[int] = None, exploration: float = 1.0, seed: Optional[int] = None):
+		if time_limit is None and iterations is None:
+			raise ValueError("time_limit oder iterations muss gesetzt sein")
+		self.workers = workers or os.cpu_count() or 1
+		self.time_limit = time_limit
+		self.iterations = iterations
+		self.exploration = exploration
+		self.rng = random.Random(seed)
+		self.last_visits: Dict[Move, int] = {}
+		self.last_stats = SearchStats()
+
+	def advance(self, move: Move):
+		"""Keine Baumwiederverwendung; vorhanden für dieselbe Schnittstelle wie MCTSPlayer"""
+
+	def reset(self):
+		pass
+
+	def choose_move(self, game: AzulGame) -> Move:
+		moves = game.legal_moves()
+		if not moves:
+			raise ValueError("Keine legalen Züge")
+
+		start = time.perf_counter()
+		state = game.to_bytes()
+		futures = [self._pool().submit(_root_search, state, self.time_limit, self.iterations,
+		                               self.exploration, self.rng.getrandbits(64))
+		           for _ in range(self.workers)]
+
+		visits: Dict[Move, int] = {}
+		iterations = 0
+		for future in futures:
+			worker_visits, worker_iterations = future.result()
+			iterations += worker_iterations
+			for move, count in worker_visits.items():
+				visits[move] = visits.get(move, 0) + count
+
+		self.last_visits = visits
+		self.last_stats = SearchStats(iterations, time.perf_counter() - start)
+		return max(moves, key=lambda m: visits.get(m, -1))
+
+
+class LeafParallelMCTS(_PoolMixin, MCTSPlayer):
+	"""Blatt-parallele MCTS: ein Baum im Hauptprozess, Playouts stapelweise im Pool"""
+
+	def __init__(self, workers: Optional[int] = None, batch_size: Optional[int] = None,
+	             time_limit: Optional[float] = 1.0, iterations: Optional[int] = None,
+	             exploration: float = 1.0, seed: Optional[int] = None):
+		super().__init__(time_limit=time_limit, iterations=iterations, exploration=exploration, seed=seed)
+		self.workers = workers or os.cpu_count() or 1
+		self.batch_size = batch_size or 4 * self.workers
+
+	def search(self, game: AzulGame, should_stop=None) -> MCTSNode:
+		if self.root is None:
+			self.root = MCTSNode()
+		root = self.root
+		reused = root.visits
+
+		game_rng = game.rng
+		search_rng = random.Random()
+		game.rng = search_rng
+
+		pool = self._pool()
+		chunksize = max(1, self.batch_size // self.workers)
+		start = time.perf_counter()
+		deadline = start + self.time_limit if self.time_limit is not None else None
+		done = 0
+		try:
+			while True:
+				if self.iterations is not None and done >= self.iterations:
+					break
+				if deadline is not None and time.perf_counter() >= deadline:
+					break
+				if should_stop is not None and should_stop():
+					break
+
+				batch = self.batch_size
+				if self.iterations is not None:
+					batch = min(batch, self.iterations - done)
+
+				paths, states, seeds = [], [], []
+				for _ in range(batch):
+					search_rng.seed(self.rng.getrandbits(64))
+					path, state = self._select_leaf(game, root)
+					paths.append(path)
+					states.append(state)
+					seeds.append(search_rng.getrandbits(64))
+
+				for path, result in zip(paths, pool.map(_leaf_rollout, states, seeds, chunksize=chunksize)):
+					for node in path:
+						if node.player >= 0:
+							node.value += result[node.player]
+				done += batch
+		finally:
+			game.rng = game_rng
+
+		self.last_stats = SearchStats(done, time.perf_counter() - start, reused)
+		return root
+
+	def _select_leaf(self, game: AzulGame, root: MCTSNode) -> Tuple[List[MCTSNode], bytes]:
+		"""Wählt ein Blatt aus und gibt (Pfad, gepackter Blattzustand) zurück
+
+		Die Besuche entlang des Pfades werden sofort gezählt (virtueller Verlust), der
+		Wert folgt, sobald das Playout-Ergebnis vorliegt.
+		"""
+		path = [root]
+		applied = []
+		node = root
+		root.visits += 1
+
+		while game.phase != GamePhase.GAME_END:
+			moves = game.legal_moves()
+			if not moves:
+				break
+			untried = [m for m in moves if m not in node.children]
+			if untried:
+				move = self.rng.choice(untried)
+				child = MCTSNode(move, game.current_player)
+				node.children[move] = child
+			else:
+				child = self._select(node, moves)
+				move = child.move
+			game.apply(move)
+			applied.append(move)
+			child.visits += 1
+			path.append(child)
+			node = child
+			if untried:
+				break
+
+		state = game.to_bytes()
+		for move in reversed(applied):
+			game.undo(move)
+		return path, state
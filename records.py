@@ -0,0 +1,271 @@
+"""Kompaktes Binärformat für vollständige Partien.
+
+Eine Aufzeichnung enthält Seed, Spielerzahl, Endpunktzahlen, die Manufakturinhalte
+jeder Runde (1 Byte pro Manufaktur) und die Züge (1 oder 2 Bytes pro Zug, siehe
+encode_move). Damit lässt sich jede Partie unabhängig vom Zufallsgenerator exakt
+abspielen: replay() gibt die Füllungen an AzulGame vor.
+
+Dateiaufbau: MAGIC, danach Datensätze
+
+	<I  Länge des Datensatzes ohne dieses Feld
+	<Q  Seed, <B Spieler, <B Runden, <H Züge
+	<h  Endpunktzahl je Spieler
+	    Runden x Manufakturen Bytes Füllungen (Index in FILLS)
+	    Züge: Code < 0x80 als 1 Byte, sonst 0x80 | Code >> 8 und Code & 0xFF
+
+Neben der Datei liegt ein Index (Pfad + ".idx") mit dem Offset jedes Datensatzes
+als <Q, sodass Partie k ohne Durchsuchen gelesen werden kann.
+"""
+import mmap
+import os
+import struct
+from typing import Iterator, List, Optional, Sequence
+
+from engine import FACTORY_COUNT, AzulGame, GamePhase, Move, decode_move, encode_move
+
+MAGIC = b"AZR1"
+_HEAD = struct.Struct("<IQBBH")
+_OFFSET = struct.Struct("<Q")
+
+# Alle Manufakturinhalte mit höchstens 4 Fliesen (126 Stück), Code = Index
+FILLS = tuple(sorted(
+	(a, b, c, d, e)
+	for a in range(5) for b in range(5) for c in range(5) for d in range(5) for e in range(5)
+	if a + b + c + d + e <= 4
+))
+FILL_INDEX = {fill: i for i, fill in enumerate(FILLS)}
+
+
+class GameRecord:
+	"""Eine aufgezeichnete Partie; fills enthält je Runde die Zähler pro Farbe jeder Manufaktur"""
+
+	def __init__(self, seed: int, num_players: int, scores: List[int],
+	             fills: List[List[Sequence[int]]], moves: List[Move]):
+		self.seed = seed
+		self.num_players = num_players
+		self.scores = scores
+		self.fills = fills
+		self.moves = moves
+
+	def __eq__(self, other):
+		return isinstance(other, GameRecord) and self.to_bytes() == other.to_bytes()
+
+	def __repr__(self):
+		return (f"GameRecord(seed={self.seed}, players={self.num_players}, scores={self.scores}, "
+		        f"rounds={len(self.fills)}, moves={len(self.moves)})")
+
+	def to_bytes(self) -> bytes:
+		"""Datensatz inklusive Längenfeld"""
+		body = bytearray()
+		for fill in self.fills:
+			body.extend(FILL_INDEX[tuple(counts)] for counts in fill)
+		for move in self.moves:
+			code = encode_move(move)
+			if code < 0x80:
+				body.append(code)
+			else:
+				body.append(0x80 | code >> 8)
+				body.append(code & 0xFF)
+		scores = struct.pack(f"<{self.num_players}h", *self.scores)
+		size = _HEAD.size - 4 + len(scores) + len(body)
+		return _HEAD.pack(size, self.seed, self.num_players, len(self.fills), len(self.moves)) + scores + body
+
+	@classmethod
+	def from_buffer(cls, buffer, offset: int = 0) -> "GameRecord":
+		"""Liest den Datensatz ab offset (bytes, memoryview oder mmap)"""
+		_, seed, num_players, rounds, move_count = _HEAD.unpack_from(buffer, offset)
+		pos = offset + _HEAD.size
+		scores = list(struct.unpack_from(f"<{num_players}h", buffer, pos))
+		pos += 2 * num_players
+
+		factory_count = FACTORY_COUNT[num_players]
+		fills = []
+		for _ in range(rounds):
+			fills.append([FILLS[code] for code in buffer[pos:pos + factory_count]])
+			pos += factory_count
+
+		moves = []
+		for _ in range(move_count):
+			code = buffer[pos]
+			pos += 1
+			if code & 0x80:
+				code = (code & 0x7F) << 8 | buffer[pos]
+				pos += 1
+			moves.append(decode_move(code))
+		return cls(seed, num_players, scores, fills, moves)
+
+	def replay(self) -> AzulGame:
+		"""Spielt die Partie mit den aufgezeichneten Füllungen nach
+
+		Wirft ValueError, wenn die Endpunktzahlen nicht übereinstimmen.
+		"""
+		game = AzulGame(self.num_players, fills=self.fills)
+		for move in self.moves:
+			game.apply(move)
+		scores = [p.score for p in game.players]
+		if scores != self.scores:
+			raise ValueError(f"Nachgespielte Punkte {scores} statt {self.scores}")
+		return game
+
+
+class GameRecorder:
+	"""Zeichnet eine laufende Partie auf; nach jedem apply() record(move) aufrufen"""
+
+	def __init__(self, game: AzulGame, seed: int = 0):
+		self.game = game
+		self.seed = seed
+		self.fills = [[f.counts[:] for f in game.factories]]
+		self.moves = []
+		self._round = game.round
+
+	def record(self, move: Move):
+		self.moves.append(move)
+		game = self.game
+		if game.round != self._round and game.phase != GamePhase.GAME_END:
+			self._round = game.round
+			self.fills.append([f.counts[:] for f in game.factories])
+
+	def finish(self) -> GameRecord:
+		return GameRecord(self.seed, self.game.num_players, [p.score for p in self.game.players],
+		                  self.fills, self.moves)
+
+
+class RecordWriter:
+	"""Hängt Datensätze an eine Datei an und pflegt den Offset-Index
+
+	Bestehende Dateien werden fortgesetzt; ein Index, der kürzer als die Datei
+	ist (z.B. nach einem Abbruch), wird beim Öffnen ergänzt.
+	"""
+
+	def __init__(self, path: str):
+		self.path = path
+		offsets = _scan(path) if os.path.exists(path) else None
+		self._file = open(path, "ab")
+		if offsets is None:
+			self._file.write(MAGIC)
+			offsets = []
+		self._offset = self._file.tell()
+		with open(path + ".idx", "wb") as idx:
+			idx.write(b"".join(_OFFSET.pack(o) for o in offsets))
+		self._index = open(path + ".idx", "ab")
+		self.count = len(offsets)
+
+	def write(self, record: GameRecord) -> int:
+		"""Schreibt einen Datensatz, gibt seine Nummer zurück"""
+		data = record.to_bytes()
+		self._file.write(data)
+		self._index.write(_OFFSET.pack(self._offset))
+		self._offset += len(data)
+		self.count += 1
+		return self.count - 1
+
+	def flush(self):
+		self._file.flush()
+		self._index.flush()
+
+	def close(self):
+		self._file.close()
+		self._index.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+def _scan(path: str) -> List[int]:
+	"""Offsets aller vollständigen Datensätze; schneidet einen unvollständigen letzten ab"""
+	offsets = []
+	with open(path, "rb+") as f:
+		size = os.fstat(f.fileno()).st_size
+		if f.read(len(MAGIC)) != MAGIC:
+			raise ValueError(f"{path} ist keine Partie-Aufzeichnung")
+		offset = len(MAGIC)
+		while offset + 4 <= size:
+			end = offset + 4 + struct.unpack("<I", f.read(4))[0]
+			if end > size:
+				break
+			offsets.append(offset)
+			f.seek(end)
+			offset = end
+		f.truncate(offset)
+	return offsets
+
+
+class RecordReader:
+	"""Liest Datensätze aus einer memory-mapped Datei
+
+	Iteration dekodiert die Partien erst beim Zugriff; reader[k] springt über den
+	Index direkt zu Partie k.
+	"""
+
+	def __init__(self, path: str):
+		self.path = path
+		with open(path, "rb") as f:
+			self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		if self._map[:len(MAGIC)] != MAGIC:
+			self._map.close()
+			raise ValueError(f"{path} ist keine Partie-Aufzeichnung")
+		self._index_map = None
+		self._offsets = self._load_index()
+
+	def _load_index(self):
+		idx_path = self.path + ".idx"
+		if os.path.exists(idx_path) and os.path.getsize(idx_path):
+			with open(idx_path, "rb") as f:
+				self._index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+			offsets = memoryview(self._index_map)[:len(self._index_map) // 8 * 8].cast("Q")
+			# Nur verwenden, wenn der letzte Datensatz vollständig in der Datei liegt
+			if not offsets or self._end(offsets[-1]) <= len(self._map):
+				return offsets
+			offsets.release()
+			self._index_map.close()
+			self._index_map = None
+		return self._scan_map()
+
+	def _end(self, offset: int) -> int:
+		return offset + 4 + struct.unpack_from("<I", self._map, offset)[0]
+
+	def _scan_map(self) -> List[int]:
+		offsets = []
+		offset = len(MAGIC)
+		while offset + 4 <= len(self._map) and self._end(offset) <= len(self._map):
+			offsets.append(offset)
+			offset = self._end(offset)
+		return offsets
+
+	def __len__(self) -> int:
+		return len(self._offsets)
+
+	def __getitem__(self, k: int) -> GameRecord:
+		return GameRecord.from_buffer(self._map, self._offsets[k])
+
+	def __iter__(self) -> Iterator[GameRecord]:
+		offset = len(MAGIC)
+		size = len(self._map)
+		while offset + 4 <= size:
+			end = self._end(offset)
+			if end > size:
+				break
+			yield GameRecord.from_buffer(self._map, offset)
+			offset = end
+
+	def close(self):
+		if isinstance(self._offsets, memoryview):
+			self._offsets.release()
+			self._index_map.close()
+		self._offsets = []
+		self._map.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+def read_record(path: str, k: int) -> Optional[GameRecord]:
+	"""Partie k einer Datei, None wenn es sie nicht gibt"""
+	with RecordReader(path) as reader:
+		return reader[k] if 0 <= k < len(reader) else None
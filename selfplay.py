@@ -0,0 +1,286 @@
+"""Headless Self-Play: viele Partien zwischen Computergegnern über einen Prozesspool.
+
+Aufruf: python -m selfplay -n 1000 -o ergebnisse.jsonl random mcts:200
+
+Jede fertige Partie wird als eine JSON-Zeile angehängt, sobald ihr Paket fertig
+ist; die Ergebnisse werden nicht im Speicher gesammelt. Ein abgebrochener Lauf
+wird mit --resume fortgesetzt: bereits geschriebene Partien werden übersprungen,
+eine halb geschriebene letzte Zeile wird abgeschnitten.
+
+Jede Partie hat einen eigenen Seed, abgeleitet aus dem Lauf-Seed und der
+Partienummer. Die Ergebnisse hängen damit weder von der Worker-Anzahl noch von
+Unterbrechungen ab.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from alphabeta import AlphaBetaPlayer
+from engine import AzulGame, GamePhase, Move
+from mcts import MCTSPlayer, rollout_move
+
+
+class RandomAgent:
+	"""Wählt gleichverteilt unter allen legalen Zügen"""
+
+	def __init__(self, seed: Optional[int] = None):
+		self.rng = random.Random(seed)
+
+	def choose_move(self, game: AzulGame) -> Move:
+		return self.rng.choice(game.legal_moves())
+
+	def advance(self, move: Move):
+		pass
+
+	def reset(self):
+		pass
+
+
+class RolloutAgent(RandomAgent):
+	"""Spielt wie die MCTS-Playouts: Bodenreihe nur, wenn keine Musterreihe passt"""
+
+	def choose_move(self, game: AzulGame) -> Move:
+		return rollout_move(game, self.rng)
+
+
+class GreedyAgent(RandomAgent):
+	"""Wählt den Zug mit dem höchsten Sofortwert (move_score_deltas), Gleichstände zufällig"""
+
+	def choose_move(self, game: AzulGame) -> Move:
+		deltas = game.move_score_deltas()
+		best = max(deltas.values())
+		return self.rng.choice([move for move, delta in deltas.items() if delta == best])
+
+
+def _mcts_agent(seed: int, arg: str) -> MCTSPlayer:
+	return MCTSPlayer(time_limit=None, iterations=int(arg or 200), seed=seed)
+
+
+# Name -> Fabrik(seed, Parameter); Aufruf als "name" oder "name:parameter"
+AGENTS = {
+	"random": lambda seed, arg: RandomAgent(seed),
+	"rollout": lambda seed, arg: RolloutAgent(seed),
+	"greedy": lambda seed, arg: GreedyAgent(seed),
+	"mcts": _mcts_agent,  # Parameter: Iterationen pro Zug
+	"alphabeta": lambda seed, arg: AlphaBetaPlayer(time_limit=float(arg or 0.2)),  # Parameter: Sekunden pro Zug, nur 2 Spieler
+}
+
+
+def make_agent(spec: str, seed: int):
+	"""Erzeugt einen Spieler aus einer Angabe wie "random" oder "mcts:500" """
+	name, _, arg = spec.partition(":")
+	if name not in AGENTS:
+		raise ValueError(f"Unbekannter Spieler: {name} (bekannt: {', '.join(AGENTS)})")
+	return AGENTS[name](seed, arg)
+
+
+def game_seed(run_seed: int, index: int) -> int:
+	"""Seed der Partie index in einem Lauf"""
+	return random.Random(run_seed * 0x1_0000_0000 + index).getrandbits(64)
+
+
+def iter_game(specs: List[str], seed: int) -> Iterator[Tuple[AzulGame, Optional[Move]]]:
+	"""Spielt eine Partie; liefert die Ausgangsstellung (Zug None) und die Stellung nach jedem Zug
+
+	Das gelieferte AzulGame ist immer dasselbe Objekt und wird weitergespielt.
+	"""
+	rng = random.Random(seed)
+	game = AzulGame(len(specs), random.Random(rng.getrandbits(64)))
+	agents = [make_agent(spec, rng.getrandbits(64)) for spec in specs]
+	yield game, None
+
+	# Ohne Fliesen auf dem Tisch (Beutel und Ablage leer) endet die Partie vorzeitig
+	while game.phase != GamePhase.GAME_END and (game.center_total or any(f.total for f in game.factories)):
+		move = agents[game.current_player].choose_move(game)
+		game.apply(move)
+		for agent in agents:
+			agent.advance(move)
+		yield game, move
+
+
+def play_game(specs: List[str], index: int, seed: int) -> Dict:
+	"""Spielt eine Partie und gibt das Ergebnis als JSON-fähiges Dict zurück"""
+	start = time.perf_counter()
+	moves = -1
+	for game, _ in iter_game(specs, seed):
+		moves += 1
+
+	scores = [p.score for p in game.players]
+	best = max(scores)
+	return {
+		"game": index,
+		"seed": seed,
+		"agents": specs,
+		"scores": scores,
+		"winners": [i for i, s in enumerate(scores) if s == best],
+		"rounds": game.round,
+		"moves": moves,
+		"seconds": round(time.perf_counter() - start, 4),
+	}
+
+
+def _play_chunk(specs: List[str], run_seed: int, indices: List[int]) -> List[Dict]:
+	"""Worker: spielt die Partien indices"""
+	return [play_game(specs, i, game_seed(run_seed, i)) for i in indices]
+
+
+def _finished_games(path: str, games: int) -> bytearray:
+	"""Liest die Partienummern einer Ergebnisdatei und schneidet eine unvollständige letzte Zeile ab"""
+	done = bytearray(games)
+	with open(path, "rb+") as f:
+		offset = 0
+		for line in f:
+			try:
+				if not line.endswith(b"\n"):
+					raise ValueError("unvollständige Zeile")
+				index = json.loads(line)["game"]
+			except (ValueError, KeyError):
+				f.truncate(offset)
+				break
+			if index < games:
+				done[index] = 1
+			offset += len(line)
+	return done
+
+
+def _chunks(pending: Iterator[int], size: int) -> Iterator[List[int]]:
+	chunk = []
+	for index in pending:
+		chunk.append(index)
+		if len(chunk) == size:
+			yield chunk
+			chunk = []
+	if chunk:
+		yield chunk
+
+
+class Progress:
+	"""Zählt fertige Partien und Siege/Punkte je Sitzplatz, gibt laufend Partien/s aus"""
+
+	def __init__(self, total: int, players: int, stream=sys.stderr, interval: float = 1.0):
+		self.total = total
+		self.done = 0
+		self.wins = [0.0] * players
+		self.points = [0] * players
+		self.stream = stream
+		self.interval = interval
+		self.start = self.last = time.perf_counter()
+
+	@property
+	def games_per_sec(self) -> float:
+		elapsed = time.perf_counter() - self.start
+		return self.done / elapsed if elapsed > 0 else 0.0
+
+	def add(self, result: Dict):
+		self.done += 1
+		for i in result["winners"]:
+			self.wins[i] += 1 / len(result["winners"])
+		for i, score in enumerate(result["scores"]):
+			self.points[i] += score
+
+	def report(self, force: bool = False):
+		now = time.perf_counter()
+		if self.stream is None or (not force and now - self.last < self.interval):
+			return
+		self.last = now
+		print(f"\r{self.done}/{self.total} Partien, {self.games_per_sec:.1f} Partien/s",
+		      end="\n" if force else "", file=self.stream, flush=True)
+
+
+def run(specs: List[str], games: int, out_path: str, workers: Optional[int] = None,
+        seed: Optional[int] = None, chunk_size: int = 8, resume: bool = False,
+        stream=sys.stderr) -> Progress:
+	"""Spielt games Partien und hängt die Ergebnisse an out_path an
+
+	Die Einstellungen stehen in out_path + ".meta.json"; beim Fortsetzen müssen
+	Spieler und Seed dazu passen.
+	"""
+	if not 2 <= len(specs) <= 4:
+		raise ValueError("Es werden 2-4 Spieler benötigt")
+	for spec in specs:
+		make_agent(spec, 0)
+
+	meta_path = out_path + ".meta.json"
+	done = bytearray(games)
+	if resume and os.path.exists(meta_path):
+		with open(meta_path) as f:
+			meta = json.load(f)
+		if meta["agents"] != specs or (seed is not None and meta["seed"] != seed):
+			raise ValueError(f"{meta_path} passt nicht zu Spielern/Seed dieses Laufs")
+		seed = meta["seed"]
+		if os.path.exists(out_path):
+			done = _finished_games(out_path, games)
+	elif os.path.exists(out_path) and not resume:
+		raise FileExistsError(f"{out_path} existiert bereits (--resume zum Fortsetzen)")
+	elif os.path.exists(out_path):
+		# Ohne den Seed des ersten Laufs entstünden dieselben Partienummern ein zweites Mal
+		raise FileNotFoundError(f"{meta_path} fehlt, {out_path} lässt sich nicht fortsetzen")
+	else:
+		if seed is None:
+			seed = random.getrandbits(32)
+		with open(meta_path, "w") as f:
+			json.dump({"agents": specs, "games": games, "seed": seed}, f)
+
+	pending = (i for i in range(games) if not done[i])
+	progress = Progress(games - sum(done), len(specs), stream)
+	workers = workers or os.cpu_count() or 1
+
+	with open(out_path, "a") as out, concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+		# Nur wenige Pakete gleichzeitig vergeben, damit nichts im Speicher wartet
+		chunks = _chunks(pending, chunk_size)
+		running = set()
+		while True:
+			for chunk in chunks:
+				running.add(pool.submit(_play_chunk, specs, seed, chunk))
+				if len(running) >= 2 * workers:
+					break
+			if not running:
+				break
+			finished, running = concurrent.futures.wait(running, timeout=progress.interval,
+			                                             return_when=concurrent.futures.FIRST_COMPLETED)
+			for future in finished:
+				results = future.result()
+				out.write("".join(json.dumps(r) + "\n" for r in results))
+				for result in results:
+					progress.add(result)
+			out.flush()
+			progress.report()
+
+	progress.report(force=True)
+	return progress
+
+
+def main(argv: list) -> int:
+	parser = argparse.ArgumentParser(prog="python -m selfplay", description="Azul Self-Play ohne GUI")
+	parser.add_argument("agents", nargs="+", help=f"2-4 Spieler, z.B. random mcts:200 ({', '.join(AGENTS)})")
+	parser.add_argument("-n", "--games", type=int, default=100, help="Anzahl Partien")
+	parser.add_argument("-o", "--out", default="selfplay.jsonl", help="Ergebnisdatei (JSON Lines)")
+	parser.add_argument("-w", "--workers", type=int, default=None, help="Worker-Prozesse (Standard: alle Kerne)")
+	parser.add_argument("--seed", type=int, default=None, help="Seed des Laufs")
+	parser.add_argument("--chunk", type=int, default=8, help="Partien pro Worker-Auftrag")
+	parser.add_argument("--resume", action="store_true", help="abgebrochenen Lauf fortsetzen")
+	args = parser.parse_args(argv)
+
+	try:
+		progress = run(args.agents, args.games, args.out, args.workers, args.seed, args.chunk, args.resume)
+	except (ValueError, FileExistsError, FileNotFoundError) as e:
+		print(e, file=sys.stderr)
+		return 2
+	except KeyboardInterrupt:
+		print("\nAbgebrochen, mit --resume fortsetzen", file=sys.stderr)
+		return 130
+
+	for i, spec in enumerate(args.agents):
+		if progress.done:
+			print(f"Platz {i + 1} {spec}: {progress.wins[i] / progress.done:.1%} Siege, "
+			      f"{progress.points[i] / progress.done:.1f} Punkte")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
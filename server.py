@@ -0,0 +1,357 @@
+"""Asyncio-Spielserver: viele Azul-Tische in einer Ereignisschleife.
+
+Aufruf: python -m server --port 7777
+
+Protokoll über lokales TCP, eine JSON-Nachricht pro Zeile (UTF-8). Züge sind
+[Quelle, Farbindex, Musterreihe] wie in der Engine (CENTER/FLOOR = -1), Zustände
+sind AzulGame.to_bytes() in Base64. Nach dem Start verschickt der Server statt
+Zuständen nur die Änderungen jedes Zugs (engine.encode_events in Base64, meist unter
+30 Bytes); Clients übernehmen sie mit AzulGame.apply_events.
+
+Client -> Server:
+  {"op": "join", "players": 2}         Platz an einem offenen Tisch (sonst neuer Tisch)
+  {"op": "join", "table": 17}          Platz an einem bestimmten offenen Tisch
+  {"op": "move", "move": [0, 2, 3]}
+  {"op": "state"}                      vollständiger Zustand des eigenen Tisches
+Server -> Client:
+  {"op": "joined", "table": 17, "seat": 1, "players": 2}
+  {"op": "start", "state": "..."}      alle Plätze besetzt
+  {"op": "moved", "seat": 0, "move": [0, 2, 3], "diff": "..."}
+                                       an alle Plätze; "timeout": true, wenn der Server
+                                       gezogen hat (Zugzeit abgelaufen, Platz verlassen)
+  {"op": "end", "scores": [31, 24]}
+  {"op": "state", "state": "..."}
+  {"op": "closed", "reason": "idle"}   Tisch wegen Untätigkeit aufgelöst
+  {"op": "error", "message": "..."}
+
+Züge werden mit der Engine geprüft. Wer seine Zugzeit (move_timeout) überschreitet,
+zieht per Playout-Strategie (rollout_move); für verlassene Plätze zieht der Server
+sofort. Tische ohne Aktivität seit idle_timeout Sekunden und Tische ohne verbundene
+Spieler werden aufgelöst. Zeilen über 64 KiB und Clients, die ihre Nachrichten nicht
+abholen (mehr als MAX_WRITE_BUFFER Bytes im Sendepuffer), werden getrennt.
+"""
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+from engine import CENTER, COLORS, FACTORY_COUNT, FLOOR, AzulGame, GamePhase, Move, decode_events, encode_events
+from mcts import rollout_move
+
+# Sendepuffer je Verbindung, ab dem ein Client als zu langsam gilt und getrennt wird
+MAX_WRITE_BUFFER = 1 << 20
+
+
+def encode_state(game: AzulGame) -> str:
+	return base64.b64encode(game.to_bytes()).decode("ascii")
+
+
+def decode_state(text: str, rng: Optional[random.Random] = None) -> AzulGame:
+	return AzulGame.from_bytes(base64.b64decode(text), rng)
+
+
+def encode_diff(events: List[tuple]) -> str:
+	return base64.b64encode(encode_events(events)).decode("ascii")
+
+
+def decode_diff(text: str) -> List[tuple]:
+	return decode_events(base64.b64decode(text))
+
+
+def parse_move(game: AzulGame, data) -> Move:
+	"""Prüft einen Zug aus einer Nachricht gegen die Engine"""
+	if not isinstance(data, list) or len(data) != 3 or not all(type(x) is int for x in data):
+		raise ValueError("Zug muss [Quelle, Farbe, Reihe] sein")
+	source, c, line = data
+	if not (CENTER <= source < len(game.factories) and 0 <= c < 5 and FLOOR <= line < 5):
+		raise ValueError(f"Ungültiger Zug: {data}")
+	move = (source, c, line)
+	if game.canonical_move(move) not in game.legal_moves():
+		raise ValueError(f"Illegaler Zug: {data}")
+	return move
+
+
+def _send(writer: asyncio.StreamWriter, line: bytes):
+	"""Schreibt ohne zu warten; wer mit dem Lesen nicht nachkommt, wird getrennt"""
+	if writer.is_closing():
+		return
+	writer.write(line)
+	if writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+		writer.transport.abort()
+
+
+def _line(message: Dict) -> bytes:
+	return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+class Connection:
+	"""Eine Client-Verbindung und ihr Platz"""
+
+	def __init__(self, writer: asyncio.StreamWriter):
+		self.writer = writer
+		self.table: Optional["Table"] = None
+		self.seat = -1
+
+	def send(self, message: Dict):
+		_send(self.writer, _line(message))
+
+
+class Table:
+	"""Ein Spieltisch: Partie, Sitzplätze und Zugzeit"""
+
+	def __init__(self, table_id: int, num_players: int, rng: random.Random):
+		self.id = table_id
+		self.game = AzulGame(num_players, random.Random(rng.getrandbits(64)))
+		self.game.events = []
+		self.rng = random.Random(rng.getrandbits(64))  # für Züge nach Zeitüberschreitung
+		self.seats: List[Optional[Connection]] = [None] * num_players
+		self.started = False
+		self.last_activity = time.monotonic()
+		self.timer: Optional[asyncio.TimerHandle] = None
+
+	@property
+	def open(self) -> bool:
+		return not self.started and None in self.seats
+
+	def broadcast(self, message: Dict):
+		line = _line(message)  # einmal kodieren, an alle senden
+		for conn in self.seats:
+			if conn is not None:
+				_send(conn.writer, line)
+
+
+class GameServer:
+	"""Hostet beliebig viele Tische in einer asyncio-Ereignisschleife"""
+
+	def __init__(self, move_timeout: float = 30.0, idle_timeout: float = 300.0, seed: Optional[int] = None):
+		self.move_timeout = move_timeout
+		self.idle_timeout = idle_timeout
+		self.rng = random.Random(seed)
+		self.tables: Dict[int, Table] = {}
+		self._waiting: Dict[int, Table] = {}  # offener Tisch je Spielerzahl
+		self._ids = itertools.count(1)
+		self._server = None
+		self._sweeper = None
+		self.connections = 0
+		self.moves = 0
+		self.games_finished = 0
+
+	async def start(self, host: str = "127.0.0.1", port: int = 7777):
+		self._server = await asyncio.start_server(self._handle, host, port)
+		self._sweeper = asyncio.ensure_future(self._evict_idle())
+
+	@property
+	def port(self) -> int:
+		return self._server.sockets[0].getsockname()[1]
+
+	async def serve_forever(self):
+		async with self._server:
+			await self._server.serve_forever()
+
+	def close(self):
+		if self._sweeper is not None:
+			self._sweeper.cancel()
+		for table in list(self.tables.values()):
+			self._close_table(table, "shutdown")
+		if self._server is not None:
+			self._server.close()
+
+	async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+		conn = Connection(writer)
+		self.connections += 1
+		try:
+			while True:
+				try:
+					line = await reader.readline()
+				except ValueError:  # Zeile länger als das Limit des StreamReaders
+					conn.send({"op": "error", "message": "Nachricht zu lang"})
+					break
+				if not line:
+					break
+				try:
+					self._dispatch(conn, json.loads(line))
+				except (ValueError, KeyError, TypeError) as e:
+					conn.send({"op": "error", "message": str(e)})
+				await writer.drain()
+		except (ConnectionError, asyncio.IncompleteReadError):
+			pass
+		finally:
+			self.connections -= 1
+			self._leave(conn)
+			writer.close()
+
+	def _dispatch(self, conn: Connection, message: Dict):
+		op = message["op"]
+		if op == "join":
+			self._join(conn, message)
+		elif op == "move":
+			table = self._seated(conn)
+			if not table.started:
+				raise ValueError("Die Partie hat noch nicht begonnen")
+			if table.game.current_player != conn.seat:
+				raise ValueError("Nicht am Zug")
+			self._play(table, parse_move(table.game, message["move"]))
+		elif op == "state":
+			conn.send({"op": "state", "state": encode_state(self._seated(conn).game)})
+		else:
+			raise ValueError(f"Unbekannte Operation: {op}")
+
+	def _seated(self, conn: Connection) -> Table:
+		if conn.table is None:
+			raise ValueError("Nicht an einem Tisch")
+		conn.table.last_activity = time.monotonic()
+		return conn.table
+
+	def _join(self, conn: Connection, message: Dict):
+		if conn.table is not None:
+			raise ValueError("Bereits an einem Tisch")
+		if "table" in message:
+			table = self.tables.get(message["table"])
+			if table is None or not table.open:
+				raise ValueError(f"Kein offener Tisch {message['table']}")
+		else:
+			num_players = message.get("players", 2)
+			if num_players not in FACTORY_COUNT:
+				raise ValueError(f"Ungültige Spielerzahl: {num_players}")
+			table = self._waiting.get(num_players)
+			if table is None or not table.open:
+				table = Table(next(self._ids), num_players, self.rng)
+				self.tables[table.id] = table
+				self._waiting[num_players] = table
+
+		seat = table.seats.index(None)
+		table.seats[seat] = conn
+		conn.table, conn.seat = table, seat
+		table.last_activity = time.monotonic()
+		conn.send({"op": "joined", "table": table.id, "seat": seat, "players": len(table.seats)})
+
+		if None not in table.seats:
+			table.started = True
+			if self._waiting.get(len(table.seats)) is table:
+				del self._waiting[len(table.seats)]
+			table.broadcast({"op": "start", "state": encode_state(table.game)})
+			self._arm_timer(table)
+
+	def _play(self, table: Table, move: Move, timeout: bool = False):
+		"""Führt einen geprüften Zug aus und meldet ihn allen Plätzen"""
+		game = table.game
+		seat = game.current_player
+		source, c, line = move
+		if source == CENTER:
+			game.take_from_center(seat, COLORS[c], line)
+		else:
+			game.take_from_factory(seat, source, COLORS[c], line)
+		self.moves += 1
+		if not timeout:  # Züge des Servers zählen nicht als Aktivität der Spieler
+			table.last_activity = time.monotonic()
+
+		message = {"op": "moved", "seat": seat, "move": [source, c, line], "diff": encode_diff(game.events)}
+		game.events.clear()
+		if timeout:
+			message["timeout"] = True
+		table.broadcast(message)
+
+		# Ohne Fliesen auf dem Tisch (Beutel und Ablage leer) endet die Partie vorzeitig
+		if game.phase == GamePhase.GAME_END or not game.legal_moves():
+			table.broadcast({"op": "end", "scores": [p.score for p in game.players]})
+			self.games_finished += 1
+			self._close_table(table, None)
+		else:
+			self._arm_timer(table)
+
+	def _arm_timer(self, table: Table):
+		"""Plant den Zug des Servers: nach move_timeout, für einen verlassenen Platz sofort"""
+		if table.timer is not None:
+			table.timer.cancel()
+		delay = 0 if table.seats[table.game.current_player] is None else self.move_timeout
+		table.timer = asyncio.get_running_loop().call_later(delay, self._on_timeout, table)
+
+	def _on_timeout(self, table: Table):
+		"""Zugzeit abgelaufen oder Platz verlassen: der Server zieht für den Spieler am Zug"""
+		table.timer = None
+		if self.tables.get(table.id) is table:
+			self._play(table, rollout_move(table.game, table.rng), timeout=True)
+
+	def _leave(self, conn: Connection):
+		table = conn.table
+		if table is None:
+			return
+		table.seats[conn.seat] = None
+		conn.table = None
+		if all(seat is None for seat in table.seats):
+			self._close_table(table, None)
+		elif table.started and table.game.current_player == conn.seat:
+			self._arm_timer(table)
+
+	def _close_table(self, table: Table, reason: Optional[str]):
+		"""Löst einen Tisch auf; reason wird den verbliebenen Plätzen gemeldet"""
+		if table.timer is not None:
+			table.timer.cancel()
+			table.timer = None
+		if reason is not None:
+			table.broadcast({"op": "closed", "reason": reason})
+		for conn in table.seats:
+			if conn is not None:
+				conn.table = None
+		self.tables.pop(table.id, None)
+		if self._waiting.get(len(table.seats)) is table:
+			del self._waiting[len(table.seats)]
+
+	async def _evict_idle(self):
+		"""Löst regelmäßig Tische auf, an denen seit idle_timeout nichts passiert ist"""
+		interval = min(5.0, self.idle_timeout / 4)
+		while True:
+			await asyncio.sleep(interval)
+			limit = time.monotonic() - self.idle_timeout
+			for table in [t for t in self.tables.values() if t.last_activity < limit]:
+				self._close_table(table, "idle")
+
+
+async def _report(server: GameServer, interval: float = 5.0):
+	"""Gibt regelmäßig Kennzahlen auf stderr aus"""
+	moves, last = server.moves, time.perf_counter()
+	while True:
+		await asyncio.sleep(interval)
+		now = time.perf_counter()
+		rate = (server.moves - moves) / (now - last)
+		moves, last = server.moves, now
+		print(f"{len(server.tables)} Tische, {server.connections} Verbindungen, {rate:,.0f} Züge/s, "
+		      f"{server.games_finished} Partien beendet", file=sys.stderr)
+
+
+async def _serve(args):
+	server = GameServer(args.move_timeout, args.idle_timeout, args.seed)
+	await server.start(args.host, args.port)
+	print(f"Server läuft auf {args.host}:{server.port}", file=sys.stderr)
+	reporter = asyncio.ensure_future(_report(server)) if args.verbose else None
+	try:
+		await server.serve_forever()
+	finally:
+		if reporter is not None:
+			reporter.cancel()
+		server.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description="Azul-Spielserver (JSON-Zeilen über TCP)")
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=7777)
+	parser.add_argument("--move-timeout", type=float, default=30.0, help="Zugzeit in Sekunden")
+	parser.add_argument("--idle-timeout", type=float, default=300.0, help="Tische ohne Aktivität auflösen (Sekunden)")
+	parser.add_argument("--seed", type=int, default=None)
+	parser.add_argument("-v", "--verbose", action="store_true", help="Kennzahlen alle 5 s auf stderr")
+	args = parser.parse_args(argv)
+	try:
+		asyncio.run(_serve(args))
+	except KeyboardInterrupt:
+		return 130
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,76 @@
+"""Zuschauermodus: Computergegner spielen in einem eigenen Prozess, die GUI sieht zu.
+
+Der Worker spielt die Partie mit selfplay.iter_game so schnell, wie die Spieler
+ziehen, und legt nach jedem Zug den gepackten Zustand (AzulGame.to_bytes) in eine
+Queue. Die Darstellung kann ihn damit nie bremsen: MatchFeed sammelt die Zustände
+im GUI-Prozess, die Oberfläche holt sie in ihrem eigenen Bildtakt ab und entscheidet
+selbst, wie viele davon sie zeigt.
+"""
+import multiprocessing
+import queue
+from typing import List, Optional
+
+from selfplay import iter_game, make_agent
+
+
+def _play(specs: List[str], seed: int, states, stop):
+	"""Worker: spielt die Partie und meldet ("state", bytes) je Stellung, dann ("end", None)"""
+	try:
+		for game, _ in iter_game(specs, seed):
+			if stop.is_set():
+				# Beim Beenden nicht auf das Leeren der Queue warten, die GUI liest nicht mehr
+				states.cancel_join_thread()
+				return
+			states.put(("state", game.to_bytes()))
+	except Exception as e:
+		states.put(("error", f"{type(e).__name__}: {e}"))
+		return
+	states.put(("end", None))
+
+
+class MatchFeed:
+	"""Startet eine Partie zwischen Computergegnern im Hintergrund und sammelt ihre Stellungen
+
+	specs sind Spielerangaben wie in selfplay ("random", "mcts:200", ...). finished wird
+	True, sobald die letzte Stellung eingetroffen ist; error enthält ggf. die Meldung,
+	mit der der Worker abgebrochen ist.
+	"""
+
+	def __init__(self, specs: List[str], seed: int):
+		for spec in specs:
+			make_agent(spec, 0)  # unbekannte Spieler schon hier melden
+		# spawn statt fork: der GUI-Prozess hat tkinter geladen
+		context = multiprocessing.get_context("spawn")
+		self._states = context.Queue()
+		self._stop = context.Event()
+		self._process = context.Process(target=_play, args=(specs, seed, self._states, self._stop), daemon=True)
+		self._process.start()
+		self.finished = False
+		self.error: Optional[str] = None
+
+	def poll(self) -> List[bytes]:
+		"""Alle seit dem letzten Aufruf eingetroffenen Stellungen (gepackt), ohne zu warten"""
+		alive = self._process.is_alive()
+		states = []
+		while True:
+			try:
+				kind, data = self._states.get_nowait()
+			except queue.Empty:
+				break
+			if kind == "state":
+				states.append(data)
+			else:
+				self.finished = True
+				if kind == "error":
+					self.error = data
+		if not alive and not self.finished:
+			self.finished = True
+			self.error = f"Worker unerwartet beendet (Exit-Code {self._process.exitcode})"
+		return states
+
+	def close(self):
+		"""Beendet den Worker (auch mitten in der Partie)"""
+		self._stop.set()
+		self._process.join(timeout=1.0)
+		if self._process.is_alive():
+			self._process.terminate()
@@ -0,0 +1,5 @@
+"""Die Module liegen flach im Projektverzeichnis, die Tests importieren sie direkt."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,52 @@
+"""Alpha-Beta-Spieler gegen eine einfache Negamax-Suche ohne Tabelle und Sortierung"""
+import random
+
+import pytest
+
+from alphabeta import AlphaBetaPlayer, ProjectedEvaluation
+from engine import AzulGame, GamePhase
+from mcts import rollout_move
+from transposition import EXACT, TranspositionTable
+
+DEPTH = 2
+
+
+class ForgetfulTable(TranspositionTable):
+	"""Vergisst jeden Eintrag, als würde die Wurzel sofort überschrieben"""
+
+	def store(self, key, depth, value, flag=EXACT, move=None):
+		pass
+
+
+def negamax(game: AzulGame, depth: int, player: int, evaluate, start_round: int) -> float:
+	if game.phase == GamePhase.GAME_END or game.round != start_round:
+		return evaluate(game, player)
+	moves = game.legal_moves()
+	if not moves or depth == 0:
+		return evaluate(game, player)
+	best = -float("inf")
+	for move in moves:
+		game.apply(move)
+		best = max(best, -negamax(game, depth - 1, 1 - player, evaluate, start_round))
+		game.undo(move)
+	return best
+
+
+@pytest.mark.parametrize("table", [ForgetfulTable, TranspositionTable])
+@pytest.mark.parametrize("seed", range(8))
+def test_root_move_has_root_value(seed, table):
+	"""Der gelieferte Zug erreicht den Suchwert, auch wenn die Tabelle die Wurzel überschreibt"""
+	rng = random.Random(seed)
+	game = AzulGame(2, random.Random(seed))
+	for _ in range(rng.randrange(6)):
+		game.apply(rollout_move(game, rng))
+	evaluate = ProjectedEvaluation()
+	player = AlphaBetaPlayer(time_limit=60.0, max_depth=DEPTH, evaluate=evaluate,
+	                         table=table())
+	move = player.choose_move(game)
+
+	mover, start_round = game.current_player, game.round
+	value = negamax(game, DEPTH, mover, evaluate, start_round)
+	assert player.last_stats.value == pytest.approx(value)
+	game.apply(move)
+	assert -negamax(game, DEPTH - 1, 1 - mover, evaluate, start_round) == pytest.approx(value)
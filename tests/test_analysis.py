@@ -0,0 +1,54 @@
+"""Hintergrundsuche: Fehler des Workers erreichen die GUI, danach geht es weiter"""
+import random
+import time
+
+from analysis import AnalysisBridge
+from engine import AzulGame
+
+
+class FakeRoot:
+	"""Ersatz für das Tk-Fenster: after() merkt sich den Rückruf, run() führt ihn aus"""
+
+	def __init__(self):
+		self.pending = {}
+		self._next = 0
+
+	def after(self, ms, callback):
+		self._next += 1
+		self.pending[self._next] = callback
+		return self._next
+
+	def after_cancel(self, ident):
+		self.pending.pop(ident, None)
+
+	def run(self, until, timeout: float = 30.0):
+		deadline = time.monotonic() + timeout
+		while not until() and time.monotonic() < deadline:
+			for ident in list(self.pending):
+				self.pending.pop(ident)()
+			time.sleep(0.01)
+		assert until()
+
+
+def test_worker_crash_reports_error_and_recovers():
+	root = FakeRoot()
+	progress, results, errors = [], [], []
+	bridge = AnalysisBridge(root, lambda *args: progress.append(args), lambda *args: results.append(args),
+	                        lambda *args: errors.append(args))
+	game = AzulGame(2, random.Random(1))
+	try:
+		job = bridge.start(game, 30.0)
+		root.run(lambda: progress)  # Worker läuft
+		for process in bridge._executor._processes.values():
+			process.kill()
+		root.run(lambda: errors)
+		assert errors[0][0] == job
+		assert type(errors[0][1]).__name__ == "BrokenProcessPool"
+		assert not bridge.busy and not results
+
+		job = bridge.start(game, 0.2)
+		root.run(lambda: results)
+		assert results[0][0] == job
+		assert results[0][1] in game.legal_moves()
+	finally:
+		bridge.shutdown()
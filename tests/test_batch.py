@@ -0,0 +1,34 @@
+"""Batch-Engine gegen die Regeln von engine.AzulGame"""
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch import BatchAzul
+from engine import AzulGame, GamePhase
+
+
+def test_no_tiles_left_ends_without_bonus():
+	"""Ohne Fliesen in Beutel und Ablage bleibt AzulGame ohne Endwertung stehen, BatchAzul auch"""
+	game = AzulGame(2, random.Random(1))
+	for factory in game.factories:  # Rundenende: Auslage leer
+		factory.clear()
+	game.bag_counts = [0] * 5
+	game.discard_counts = [0] * 5
+	game.bag_total = game.discard_total = 0
+	for row in range(5):
+		game.players[0].place_wall_tile(row, (0 - row) % 5)  # Spalte 0 voll: 7 Bonuspunkte
+	game._start_tiling_phase()
+	assert game.phase != GamePhase.GAME_END and not game.legal_moves()
+	assert [p.score for p in game.players] == [0, 0]
+
+	batch = BatchAzul(1, 2, seed=1)
+	batch._sources[:] = 0
+	batch._on_table[:] = 0
+	batch._bag[:] = 0
+	batch._discard[:] = 0
+	batch._wall[0, :, 0] = True
+	batch._end_round(np.arange(1))
+	assert batch.done.all()
+	assert batch.score.tolist() == [[0, 0]]
@@ -0,0 +1,118 @@
+"""Endspiel-Löser gegen vollständige Suche ohne Schnitte und Tabelle"""
+import random
+
+import pytest
+
+from alphabeta import AlphaBetaPlayer
+from endgame import EndgameSolver, score_margins
+from engine import AzulGame, GamePhase
+from mcts import rollout_move
+from transposition import TranspositionTable
+
+
+def late_position(num_players: int, seed: int, tiles: int = 8) -> AzulGame:
+	"""Stellung einer Playout-Partie ab Runde 3 mit höchstens tiles Fliesen in der Auslage"""
+	rng = random.Random(seed)
+	game = AzulGame(num_players, random.Random(seed))
+	while game.phase != GamePhase.GAME_END and game.legal_moves():
+		if game.round >= 3 and game.center_total + sum(f.total for f in game.factories) <= tiles:
+			return game
+		game.apply(rollout_move(game, rng))
+	raise AssertionError("keine späte Stellung")
+
+
+def root_value(game: AzulGame, scores) -> int:
+	return score_margins(scores)[game.current_player]
+
+
+def leaf_scores(game: AzulGame, start_round: int):
+	"""Punktzahlen am Ende der Runde wie im Löser, None solange die Runde läuft"""
+	if game.phase == GamePhase.GAME_END:
+		return [p.score for p in game.players]
+	if game.round != start_round:
+		if not game.legal_moves():
+			return [p.score for p in game.players]
+		return [p.score + p.end_game_bonus for p in game.players]
+	if not game.legal_moves():
+		return [p.score for p in game.players]
+	return None
+
+
+def minimax(game: AzulGame, root: int, start_round: int) -> int:
+	"""Paranoider Wert für root: Abstand zum besten Gegner, alle Gegner gegen root"""
+	scores = leaf_scores(game, start_round)
+	if scores is not None:
+		return score_margins(scores)[root]
+	values = []
+	for move in game.legal_moves():
+		game.apply(move)
+		values.append(minimax(game, root, start_round))
+		game.undo(move)
+	return max(values) if game.current_player == root else min(values)
+
+
+def maxn(game: AzulGame, start_round: int):
+	"""(Punktzahlen, Zug) bei max-n mit den Gleichstandsregeln des Lösers"""
+	scores = leaf_scores(game, start_round)
+	if scores is not None:
+		return scores, None
+	player = game.current_player
+	best = None
+	for move in sorted(game.legal_moves()):
+		game.apply(move)
+		scores, _ = maxn(game, start_round)
+		game.undo(move)
+		value = score_margins(scores)[player], scores[player]
+		if best is None or value > best[0]:
+			best = value, scores, move
+	return best[1], best[2]
+
+
+@pytest.mark.parametrize("num_players, tiles", [(2, 8), (3, 7), (4, 7)])
+@pytest.mark.parametrize("seed", range(3))
+def test_paranoid_matches_minimax(num_players, tiles, seed):
+	game = late_position(num_players, seed, tiles)
+	root, start_round = game.current_player, game.round
+	result = EndgameSolver(max_nodes=None).solve(game)
+	expected = minimax(game, root, start_round)
+	assert root_value(game, result.scores) == expected
+	game.apply(result.move)
+	assert minimax(game, root, start_round) == expected
+
+
+@pytest.mark.parametrize("num_players", (3, 4))
+@pytest.mark.parametrize("seed", range(3))
+def test_maxn_matches_brute_force(num_players, seed):
+	game = late_position(num_players, seed, 7)
+	result = EndgameSolver(max_nodes=None, mode="maxn").solve(game)
+	assert (result.scores, result.move) == maxn(game, game.round)
+
+
+def test_shared_table_with_alphabeta():
+	for seed in range(8):  # Wurzelspieler 0 und 1
+		game = late_position(2, seed)
+		expected = EndgameSolver(max_nodes=None).solve(game)
+		table = TranspositionTable(1 << 12)
+
+		solver = EndgameSolver(max_nodes=None, table=table)
+		player = AlphaBetaPlayer(time_limit=60.0, max_depth=4, table=table)
+		assert solver.choose_move(game) in game.legal_moves()
+		assert player.choose_move(game) in game.legal_moves()
+		result = solver.solve(game)
+		assert player.choose_move(game) in game.legal_moves()
+		assert root_value(game, result.scores) == root_value(game, expected.scores)
+		assert result.exact == expected.exact
+
+
+def test_shared_table_paranoid_and_maxn():
+	for seed in range(3):
+		game = late_position(3, seed, tiles=6)
+		paranoid = EndgameSolver(max_nodes=None).solve(game)
+		maxn = EndgameSolver(max_nodes=None, mode="maxn").solve(game)
+
+		table = TranspositionTable(1 << 12)
+		for _ in range(2):
+			result = EndgameSolver(max_nodes=None, mode="maxn", table=table).solve(game)
+			assert result.scores == maxn.scores
+			result = EndgameSolver(max_nodes=None, table=table).solve(game)
+			assert root_value(game, result.scores) == root_value(game, paranoid.scores)
@@ -0,0 +1,56 @@
+"""Änderungsereignisse: ein Spiegel aus Startzustand und Diffs gleicht der Partie des Servers"""
+import random
+
+import pytest
+
+from engine import CENTER, COLORS, AzulGame, GamePhase, decode_events, encode_events
+from mcts import rollout_move
+from server import decode_diff, decode_state, encode_diff, encode_state
+
+
+def server_move(game: AzulGame, move):
+	"""Zug wie Server._play"""
+	source, c, line = move
+	if source == CENTER:
+		game.take_from_center(game.current_player, COLORS[c], line)
+	else:
+		game.take_from_factory(game.current_player, source, COLORS[c], line)
+
+
+@pytest.mark.parametrize("use_apply", (False, True))
+@pytest.mark.parametrize("num_players", (2, 3, 4))
+@pytest.mark.parametrize("seed", range(4))
+def test_mirror_follows_diffs(num_players, seed, use_apply):
+	game = AzulGame(num_players, random.Random(seed))
+	game.events = []
+	mirror = decode_state(encode_state(game), random.Random(seed + 1000))  # eigener, anderer Zufall
+	rng = random.Random(seed)
+	rounds = game.round
+	while game.phase != GamePhase.GAME_END and game.legal_moves():
+		move = rollout_move(game, rng)
+		if use_apply:
+			game.apply(move)
+		else:
+			server_move(game, move)
+		mirror.apply_events(decode_diff(encode_diff(game.events)))
+		game.events.clear()
+		assert mirror.to_bytes() == game.to_bytes()
+		assert mirror.zobrist_hash == game.zobrist_hash
+		assert mirror.legal_moves() == game.legal_moves()
+	assert game.round > rounds
+	assert [p.score for p in mirror.players] == [p.score for p in game.players]
+
+
+def test_encode_round_trip():
+	game = AzulGame(3, random.Random(2))
+	game.events = []
+	rng = random.Random(2)
+	while game.phase != GamePhase.GAME_END and game.legal_moves():
+		game.apply(rollout_move(game, rng))
+	assert decode_events(encode_events(game.events)) == game.events
+
+
+@pytest.mark.parametrize("data", [b"\xff", b"\x00"])
+def test_decode_invalid(data):
+	with pytest.raises(ValueError):
+		decode_events(data)
@@ -0,0 +1,8 @@
+"""Kalter Import der Engine: Zeitbudget und keine GUI-Abhängigkeit"""
+from bench import IMPORT_BUDGET_MS, import_time_ms
+
+
+def test_engine_import_budget():
+	own, total, tkinter = import_time_ms()
+	assert not tkinter, "engine zieht tkinter nach"
+	assert own <= IMPORT_BUDGET_MS, f"Import {own:.1f} ms über dem Budget von {IMPORT_BUDGET_MS:.0f} ms"
@@ -0,0 +1,133 @@
+"""Gepackter Spielzustand: AzulGame.to_bytes/from_bytes und PackedState"""
+import random
+
+import pytest
+
+from engine import AzulGame, GamePhase, PackedState
+from mcts import rollout_move
+
+PLAYER_COUNTS = (2, 3, 4)
+
+
+def positions(num_players: int, seed: int):
+	"""Alle Stellungen einer Playout-Partie, von der Startstellung bis zum Ende"""
+	game = AzulGame(num_players, random.Random(seed))
+	rng = random.Random(seed)
+	yield game
+	while game.phase != GamePhase.GAME_END and game.legal_moves():
+		game.apply(rollout_move(game, rng))
+		yield game
+
+
+@pytest.mark.parametrize("num_players, size", [(2, 90), (3, 122), (4, 154)])
+def test_fixed_size(num_players, size):
+	for game in positions(num_players, 1):
+		assert len(game.to_bytes()) == size
+
+
+@pytest.mark.parametrize("num_players", PLAYER_COUNTS)
+@pytest.mark.parametrize("seed", range(5))
+def test_round_trip(num_players, seed):
+	for game in positions(num_players, seed):
+		data = game.to_bytes()
+		copy = AzulGame.from_bytes(data)
+		assert copy.to_bytes() == data
+		assert copy.zobrist_hash == game.zobrist_hash
+		assert copy.canonical_hash == game.canonical_hash
+		assert copy.canonical_key() == game.canonical_key()
+		assert copy.legal_moves() == game.legal_moves()
+
+
+@pytest.mark.parametrize("num_players", PLAYER_COUNTS)
+def test_round_trip_continues_identically(num_players):
+	game = AzulGame(num_players, random.Random(3))
+	rng = random.Random(3)
+	for _ in range(12):  # über das erste Rundenende hinaus
+		game.apply(rollout_move(game, rng))
+	copy = AzulGame.from_bytes(bytearray(game.to_bytes()), random.Random(9))
+	game.rng = random.Random(9)
+	while game.phase != GamePhase.GAME_END and game.legal_moves():
+		move = rollout_move(game, rng)
+		game.apply(move)
+		copy.apply(move)
+		assert copy.to_bytes() == game.to_bytes()
+
+
+def test_pack_into():
+	game = AzulGame(3, random.Random(2))
+	buffer = bytearray(200)
+	game.pack_into(buffer, 10)
+	assert bytes(buffer[10:10 + 122]) == game.to_bytes()
+	assert AzulGame.from_bytes(memoryview(buffer)[10:132]).to_bytes() == game.to_bytes()
+
+
+@pytest.mark.parametrize("num_players", PLAYER_COUNTS)
+def test_packed_state_fields(num_players):
+	for game in positions(num_players, 4):
+		state = PackedState(game.to_bytes())
+		assert state.num_players == num_players
+		assert state.current_player == game.current_player
+		assert state.phase == game.phase
+		assert state.first_player_marker_taken == game.first_player_marker_taken
+		assert state.round == game.round
+		assert state.center_counts == game.center_counts
+		assert state.bag_counts == game.bag_counts
+		assert state.discard_counts == game.discard_counts
+		for i, factory in enumerate(game.factories):
+			assert state.factory_counts(i) == factory.counts
+		for p, player in enumerate(game.players):
+			assert state.wall_bits(p) == player.wall_bits
+			assert state.score(p) == player.score
+			assert state.line_colors(p) == player.line_colors
+			assert state.line_counts(p) == player.line_counts
+			assert state.floor_counts(p) == player.floor_counts
+			assert state.has_first_player_marker(p) == player.has_first_player_marker
+		assert state.to_game().to_bytes() == game.to_bytes()
+		assert bytes(state) == game.to_bytes()
+		assert len(state) == len(game.to_bytes())
+
+
+def test_packed_state_index_errors():
+	state = PackedState(AzulGame(2, random.Random(1)).to_bytes())
+	with pytest.raises(IndexError):
+		state.factory_counts(5)
+	with pytest.raises(IndexError):
+		state.score(2)
+
+
+def test_packed_state_equality_and_hash():
+	game = AzulGame(2, random.Random(5))
+	a = PackedState(game.to_bytes())
+	b = PackedState(bytearray(game.to_bytes()))
+	assert a == b
+	assert hash(a) == hash(b)
+	assert len({a, b}) == 1
+
+	game.apply(game.legal_moves()[0])
+	c = PackedState(game.to_bytes())
+	assert a != c
+	assert a != bytes(a)  # nur PackedStates untereinander
+	assert len({a, b, c}) == 2
+
+
+def with_byte(data: bytes, i: int, value: int) -> bytes:
+	data = bytearray(data)
+	data[i] = value
+	return bytes(data)
+
+
+START = AzulGame(2, random.Random(1)).to_bytes()
+
+
+@pytest.mark.parametrize("data", [
+	b"", b"\x02" * 89, b"\x02" * 91, b"\x05" + bytes(89),
+	with_byte(START, 1, 2),  # Spieler am Zug außerhalb von 0-1
+	with_byte(START, 1, 7),
+	with_byte(START, 2, len(GamePhase)),  # Phase außerhalb von GamePhase
+	with_byte(START, 2, 255),
+])
+def test_invalid_buffers(data):
+	with pytest.raises(ValueError):
+		AzulGame.from_bytes(data)
+	with pytest.raises(ValueError):
+		PackedState(data)
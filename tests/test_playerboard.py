@@ -0,0 +1,193 @@
+"""Bitboard-PlayerBoard gegen die ursprüngliche listenbasierte Spielerablage"""
+import random
+from typing import List
+
+import pytest
+
+from engine import COLORS, PlayerBoard, Tile, TileColor, WallPattern
+
+
+class ListPlayerBoard:
+	"""Die Spielerablage vor der Umstellung auf Bitboards (Referenz, unverändert übernommen)"""
+
+	def __init__(self):
+		self.pattern_lines = [[] for _ in range(5)]  # 5 Musterreihen (1-5 Plätze)
+		self.wall = [[None for _ in range(5)] for _ in range(5)]  # 5x5 Wand
+		self.floor_line = []  # Bodenreihe
+		self.score = 0
+		self.has_first_player_marker = False
+
+	def can_add_to_pattern_line(self, line_idx: int, color: TileColor) -> bool:
+		if line_idx < 0 or line_idx >= 5:
+			return False
+
+		pattern_line = self.pattern_lines[line_idx]
+		max_tiles = line_idx + 1
+
+		if len(pattern_line) >= max_tiles:
+			return False
+
+		if pattern_line and pattern_line[0].color != color:
+			return False
+
+		wall_row = self.wall[line_idx]
+		wall_colors = [WallPattern.PATTERN[line_idx][i] for i, tile in enumerate(wall_row) if tile is not None]
+		if color in wall_colors:
+			return False
+
+		return True
+
+	def add_to_pattern_line(self, line_idx: int, tiles: List[Tile]) -> List[Tile]:
+		if not tiles:
+			return []
+
+		max_tiles = line_idx + 1
+		current_tiles = len(self.pattern_lines[line_idx])
+		space_left = max_tiles - current_tiles
+
+		tiles_to_add = tiles[:space_left]
+		overflow = tiles[space_left:]
+
+		self.pattern_lines[line_idx].extend(tiles_to_add)
+		return overflow
+
+	def add_to_floor_line(self, tiles: List[Tile]):
+		self.floor_line.extend(tiles)
+
+	def score_floor_line(self):
+		penalties = [-1, -1, -2, -2, -2, -3, -3]
+
+		for i, tile in enumerate(self.floor_line[:7]):
+			if i < len(penalties):
+				self.score = max(0, self.score + penalties[i])
+
+		if self.has_first_player_marker:
+			self.score = max(0, self.score - 1)
+
+	def move_complete_lines_to_wall(self) -> List[Tile]:
+		removed_tiles = []
+
+		for i in range(5):
+			line = self.pattern_lines[i]
+			if len(line) == i + 1:
+				tile = line[-1]
+
+				for j in range(5):
+					if WallPattern.PATTERN[i][j] == tile.color:
+						self.wall[i][j] = tile
+						self.score += self._calculate_tile_score(i, j)
+						break
+
+				removed_tiles.extend(line[:-1])
+				self.pattern_lines[i] = []
+
+		return removed_tiles
+
+	def _calculate_tile_score(self, row: int, col: int) -> int:
+		score = 0
+
+		h_start = col
+		while h_start > 0 and self.wall[row][h_start - 1]:
+			h_start -= 1
+
+		h_end = col
+		while h_end < 4 and self.wall[row][h_end + 1]:
+			h_end += 1
+
+		h_count = h_end - h_start + 1
+		if h_count > 1:
+			score += h_count
+
+		v_start = row
+		while v_start > 0 and self.wall[v_start - 1][col]:
+			v_start -= 1
+
+		v_end = row
+		while v_end < 4 and self.wall[v_end + 1][col]:
+			v_end += 1
+
+		v_count = v_end - v_start + 1
+		if v_count > 1:
+			score += v_count
+
+		if h_count == 1 and v_count == 1:
+			score = 1
+
+		return score
+
+	def calculate_end_game_bonus(self) -> int:
+		bonus = 0
+
+		for row in self.wall:
+			if all(tile is not None for tile in row):
+				bonus += 2
+
+		for col in range(5):
+			if all(self.wall[row][col] is not None for row in range(5)):
+				bonus += 7
+
+		for color in TileColor:
+			count = 0
+			for row in range(5):
+				for col in range(5):
+					if self.wall[row][col] and WallPattern.PATTERN[row][col] == color:
+						count += 1
+			if count == 5:
+				bonus += 10
+
+		return bonus
+
+	def has_complete_row(self) -> bool:
+		return any(all(tile is not None for tile in row) for row in self.wall)
+
+
+def colors(tiles: List[Tile]) -> List[TileColor]:
+	return sorted((tile.color for tile in tiles), key=COLORS.index)
+
+
+def assert_same(board: PlayerBoard, reference: ListPlayerBoard):
+	for line in range(-1, 6):
+		for color in COLORS:
+			assert board.can_add_to_pattern_line(line, color) == reference.can_add_to_pattern_line(line, color)
+	assert [colors(line) for line in board.pattern_lines] == [colors(line) for line in reference.pattern_lines]
+	assert [[tile is not None for tile in row] for row in board.wall] == \
+	       [[tile is not None for tile in row] for row in reference.wall]
+	for row in range(5):
+		for col in range(5):
+			assert board._calculate_tile_score(row, col) == reference._calculate_tile_score(row, col)
+	assert colors(board.floor_line) == colors(reference.floor_line)
+	assert board.score == reference.score
+	assert board.calculate_end_game_bonus() == reference.calculate_end_game_bonus()
+	assert board.has_complete_row() == reference.has_complete_row()
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_games_match_list_board(seed):
+	rng = random.Random(seed)
+	board, reference = PlayerBoard(), ListPlayerBoard()
+	for _ in range(30):  # Runden, bis eine Wandreihe voll ist
+		for _ in range(rng.randint(2, 6)):  # Züge der Runde
+			color = rng.choice(COLORS)
+			tiles = [Tile(color)] * rng.randint(1, 5)
+			line = rng.randrange(5)
+			if rng.random() < 0.8 and reference.can_add_to_pattern_line(line, color):
+				assert colors(board.add_to_pattern_line(line, tiles)) == \
+				       colors(reference.add_to_pattern_line(line, list(tiles)))
+			else:
+				board.add_to_floor_line(tiles)
+				reference.add_to_floor_line(list(tiles))
+			assert_same(board, reference)
+
+		marker = rng.random() < 0.3
+		board.has_first_player_marker = reference.has_first_player_marker = marker
+		assert colors(board.move_complete_lines_to_wall()) == colors(reference.move_complete_lines_to_wall())
+		board.score_floor_line()
+		reference.score_floor_line()
+		assert_same(board, reference)
+
+		board.clear_floor_line()
+		reference.floor_line = []
+		board.has_first_player_marker = reference.has_first_player_marker = False
+		if reference.has_complete_row():
+			break
+	assert_same(board, reference)
@@ -0,0 +1,50 @@
+"""Aufgezeichnete Partien: Nachspielen mit vorgegebenen Füllungen"""
+import random
+
+import pytest
+
+from engine import AzulGame, GamePhase
+from mcts import rollout_move
+from records import GameRecord, GameRecorder
+
+
+def record_game(num_players: int, seed: int) -> GameRecord:
+	game = AzulGame(num_players, random.Random(seed))
+	recorder = GameRecorder(game, seed)
+	rng = random.Random(seed)
+	while game.phase != GamePhase.GAME_END and game.legal_moves():
+		move = rollout_move(game, rng)
+		game.apply(move)
+		recorder.record(move)
+	return recorder.finish()
+
+
+@pytest.mark.parametrize("num_players", (2, 3, 4))
+@pytest.mark.parametrize("seed", range(3))
+def test_undo_rewinds_fills(num_players, seed):
+	"""undo() über ein Rundenende holt die Füllung der Runde nicht ein zweites Mal ab"""
+	record = record_game(num_players, seed)
+	assert len(record.fills) > 1
+	reference = AzulGame(num_players, fills=record.fills)
+	game = AzulGame(num_players, fills=record.fills)
+	for move in record.moves:
+		reference.apply(move)
+		game.apply(move)
+		game.undo(move)
+		game.apply(move)
+		assert game.to_bytes() == reference.to_bytes()
+	assert [p.score for p in game.players] == record.scores
+
+
+def test_clone_keeps_fill_position():
+	record = record_game(2, 1)
+	game = AzulGame(2, fills=record.fills)
+	moves = iter(record.moves)
+	while game.round == 1:
+		game.apply(next(moves))
+	copy = game.clone()
+	for move in moves:
+		game.apply(move)
+		copy.apply(move)
+	assert copy.to_bytes() == game.to_bytes()
+	assert [p.score for p in copy.players] == record.scores
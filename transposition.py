@@ -0,0 +1,90 @@
+"""Größenbeschränkte Transpositionstabelle für Suchverfahren auf AzulGame.
+
+Schlüssel sind Zobrist-Hashes (AzulGame.zobrist_hash). Die Tabelle hat eine feste
+Anzahl von Buckets mit je zwei Plätzen: der erste bevorzugt tiefere Suchen (und
+wird ersetzt, wenn der Eintrag aus einer älteren Suche stammt), der zweite wird
+immer überschrieben. Mehrere Suchspieler können dieselbe Tabelle nutzen, wenn
+jeder seine Schlüssel in einem eigenen Raum hält (AlphaBetaPlayer: canonical_hash,
+EndgameSolver: canonical_hash mit eigenem Salz), denn die Art des Werts legt der
+Suchspieler fest.
+"""
+from typing import Any, Optional, Tuple
+
+from engine import Move
+
+# Art des gespeicherten Werts
+EXACT = 0
+LOWER_BOUND = 1  # Wert >= value (Beta-Schnitt)
+UPPER_BOUND = 2  # Wert <= value (kein Zug hat Alpha verbessert)
+
+# Eintrag: (Schlüssel, Tiefe, Wert, Art, bester Zug, Alter); Wert je nach Suchspieler,
+# z.B. float bei AlphaBetaPlayer, ein Tupel mit Punktzahlen bei EndgameSolver
+Entry = Tuple[int, int, Any, int, Optional[Move], int]
+
+
+class TranspositionTable:
+	"""Transpositionstabelle mit höchstens max_entries Einträgen"""
+
+	def __init__(self, max_entries: int = 1 << 18):
+		buckets = 1
+		while buckets * 2 <= max(1, max_entries // 2):
+			buckets *= 2
+		self._mask = buckets - 1
+		self._slots = [None] * (2 * buckets)
+		self.age = 0
+		self.hits = 0
+		self.probes = 0
+
+	@property
+	def capacity(self) -> int:
+		return len(self._slots)
+
+	def __len__(self) -> int:
+		return sum(1 for entry in self._slots if entry is not None)
+
+	def new_search(self):
+		"""Markiert vorhandene Einträge als veraltet, damit sie bevorzugt ersetzt werden"""
+		self.age += 1
+
+	def clear(self):
+		self._slots = [None] * len(self._slots)
+		self.hits = self.probes = 0
+
+	def lookup(self, key: int) -> Optional[Entry]:
+		"""Sucht den Eintrag zum Schlüssel, None wenn nicht vorhanden"""
+		self.probes += 1
+		i = (key & self._mask) << 1
+		slots = self._slots
+		entry = slots[i]
+		if entry is not None and entry[0] == key:
+			self.hits += 1
+			return entry
+		entry = slots[i + 1]
+		if entry is not None and entry[0] == key:
+			self.hits += 1
+			return entry
+		return None
+
+	def store(self, key: int, depth: int, value: Any, flag: int = EXACT, move: Optional[Move] = None):
+		"""Speichert ein Suchergebnis; depth ist die verbleibende Suchtiefe"""
+		i = (key & self._mask) << 1
+		slots = self._slots
+		first = slots[i]
+
+		# Ohne neuen Zug den bekannten besten Zug derselben Stellung behalten
+		if move is None:
+			for old in (first, slots[i + 1]):
+				if old is not None and old[0] == key:
+					move = old[4]
+					break
+		entry = (key, depth, value, flag, move, self.age)
+
+		if first is None or first[0] == key or depth >= first[1] or first[5] != self.age:
+			# Verdrängten Eintrag im zweiten Platz behalten, falls er zu einer anderen Stellung gehört
+			if first is not None and first[0] != key:
+				slots[i + 1] = first
+			elif slots[i + 1] is not None and slots[i + 1][0] == key:
+				slots[i + 1] = None
+			slots[i] = entry
+		else:
+			slots[i + 1] = entry